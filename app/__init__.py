@@ -1,15 +1,20 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from config import Config
+from config import get_config
 
 # Inicialização do SQLAlchemy como uma extensão do Flask
 db = SQLAlchemy()
 
-def create_app():
+def create_app(config_class=None):
     # Função para criar e configurar a aplicação Flask.
+    # Sem config_class, o perfil é escolhido pela variável de ambiente APP_CONFIG
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class or get_config())
+    
+    # Logs estruturados gravados em segundo plano, com amostragem das requisições GET
+    from app.utils.log import init_logging
+    init_logging(app)
     
     # Configuração do CORS para desenvolvimento
     # Permite requisições do frontend em localhost:3000
@@ -17,23 +22,71 @@ def create_app():
          resources={r"/*": {
              "origins": ["http://localhost:3000"],
              "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-             "allow_headers": ["Content-Type", "Authorization"],
+             "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+             "expose_headers": ["Idempotent-Replayed"],
              "supports_credentials": True
          }})
     
     # Inicialização das extensões
     db.init_app(app)
     
+    # Serialização JSON (orjson, quando disponível)
+    from app.utils.json_provider import init_json
+    init_json(app)
+    
+    # PRAGMAs do SQLite aplicados a cada nova conexão (chaves estrangeiras e, no perfil sqlite, WAL)
+    from app.utils.database import init_database
+    init_database(app)
+    
+    # Instrumentação opcional de SQL e latência por requisição
+    from app.utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    # Versões das coleções, ETags e cache de respostas serializadas
+    from app.utils.cache import init_cache
+    init_cache(app)
+    
+    # Cache dos níveis de carteira usados na validação das atribuições
+    from app.utils.license_cache import init_license_cache
+    init_license_cache(app)
+    
+    # Change log e publicação das alterações para o feed /events
+    from app.utils.events import init_events
+    init_events(app)
+    
+    # Rollup diário de utilização, mantido a cada escrita de atribuições
+    from app.utils.rollups import init_rollups
+    init_rollups(app)
+    
+    # Chaves Idempotency-Key marcadas como aplicadas no commit das rotas
+    from app.utils.idempotency import init_idempotency
+    init_idempotency(app)
+    
+    # Compressão gzip/brotli das respostas, negociada por Accept-Encoding
+    from app.utils.compression import init_compression
+    init_compression(app)
+    
     # Registro dos blueprints
     # Organiza as rotas em módulos separados
-    from app.routes import drivers, trucks, assignments
+    from app.routes import drivers, trucks, assignments, admin, exports, availability, schedule, events, reports
     app.register_blueprint(drivers.drivers_bp)
     app.register_blueprint(trucks.trucks_bp)
     app.register_blueprint(assignments.assignments_bp)
+    app.register_blueprint(admin.admin_bp)
+    app.register_blueprint(exports.exports_bp)
+    app.register_blueprint(availability.availability_bp)
+    app.register_blueprint(schedule.schedule_bp)
+    app.register_blueprint(events.events_bp)
+    app.register_blueprint(reports.reports_bp)
+    
+    # Comandos de manutenção da CLI (flask <comando>)
+    from app.commands import register_commands
+    register_commands(app)
     
-    # Criação das tabelas no banco de dados
-    with app.app_context():
-        db.create_all()
+    # Verificação da versão do esquema (uma consulta); com AUTO_MIGRATE, aplica
+    # as migrações pendentes (ver app.migrations e `flask upgrade-db`)
+    from app.migrations import init_schema
+    init_schema(app)
     
     # Configuração para aceitar rotas com ou sem barra no final
     app.url_map.strict_slashes = False
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+import click
+from app import db
+
+def register_commands(app):
+    """
+    Registra os comandos de manutenção na CLI do Flask (`flask <comando>`).
+
+    Args:
+        app (Flask): Aplicação onde os comandos serão registrados
+    """
+
+    @app.cli.command("prune-events")
+    @click.option("--days", default=7, show_default=True, help="Mantém os eventos mais recentes que este número de dias.")
+    def prune_events(days):
+        # Remove do change log os eventos antigos, que já não precisam ser reenviados.
+        from app.models import ChangeEvent
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        deleted = ChangeEvent.query.filter(ChangeEvent.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        click.echo(f"{deleted} events removed")
+
+    @app.cli.command("prune-idempotency-keys")
+    def prune_idempotency_keys_command():
+        # Remove as chaves de idempotência expiradas ou acima do limite configurado.
+        from app.utils.idempotency import prune_idempotency_keys
+        removed = prune_idempotency_keys(app.config["IDEMPOTENCY_TTL_SECONDS"], app.config["IDEMPOTENCY_MAX_KEYS"])
+        click.echo(f"{removed} idempotency keys removed")
+
+    @app.cli.command("archive-assignments")
+    @click.option("--days", type=click.IntRange(min=1), default=None,
+                  help="Arquiva as atribuições mais antigas que este número de dias (padrão: ARCHIVE_HORIZON_DAYS).")
+    @click.option("--batch-size", type=click.IntRange(min=1), default=None,
+                  help="Atribuições movidas por comando (padrão: ARCHIVE_BATCH_SIZE).")
+    def archive_assignments_command(days, batch_size):
+        # Move as atribuições passadas para a tabela de arquivo, em uma transação.
+        from app.utils.archive import archive_assignments, archive_cutoff
+        cutoff = archive_cutoff(days or app.config["ARCHIVE_HORIZON_DAYS"])
+        run = archive_assignments(cutoff, batch_size or app.config["ARCHIVE_BATCH_SIZE"])
+        click.echo(f"{run.archived} assignments archived before {cutoff.isoformat()}")
+
+    @app.cli.command("rebuild-utilization")
+    def rebuild_utilization_command():
+        # Recalcula o rollup diário de utilização a partir das atribuições (carga inicial).
+        from app.utils.rollups import rebuild_utilization
+        rows = rebuild_utilization()
+        click.echo(f"{rows} utilization rows rebuilt")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        # Cria (se ausentes) e reconstrói os índices de busca por nome e placa.
+        from app.utils.search import rebuild_search_indexes
+        indexes = rebuild_search_indexes()
+        click.echo(f"{len(indexes)} search indexes rebuilt")
+
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        # Aplica as migrações pendentes do esquema (ou cria as tabelas em um banco vazio).
+        from app.migrations import latest_version, upgrade
+        applied = upgrade(db.engine)
+        app.extensions["schema_outdated"] = False
+        click.echo(f"{len(applied)} migrations applied; schema at version {latest_version()}")
+
+    @app.cli.command("schema-version")
+    def schema_version_command():
+        # Mostra a versão do esquema gravada no banco e a esperada pelo código.
+        from app.migrations import current_version, latest_version
+        with db.engine.connect() as conn:
+            version = current_version(conn)
+        click.echo(f"database: {version if version is not None else 'unversioned'}, code: {latest_version()}")
@@ -0,0 +1,311 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from app import db, models  # models: registra as tabelas em db.metadata
+
+# Versão do esquema: uma linha por migração aplicada. Fica fora de db.metadata,
+# de modo que db.drop_all()/db.create_all() não a alteram
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Migrações em ordem de versão: (versão, descrição, função). Cada função recebe a
+# conexão da transação da migração. As primeiras levam os bancos criados pelo
+# antigo db.create_all() (sem tabela de versão) ao esquema atual e por isso
+# verificam o que já existe antes de alterar
+MIGRATIONS = []
+
+# Chave do advisory lock do PostgreSQL que serializa as migrações entre processos
+_PG_LOCK_KEY = 7342001
+
+def migration(version, description):
+    # Registra a função decorada como a migração `version`
+    def decorator(upgrade):
+        MIGRATIONS.append((version, description, upgrade))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return upgrade
+    return decorator
+
+def latest_version():
+    # Versão esperada pelo código
+    return MIGRATIONS[-1][0]
+
+def _add_column(conn, table, name):
+    # ALTER TABLE ... ADD COLUMN com a definição da coluna no modelo
+    definition = CreateColumn(table.c[name]).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+
+def _rebuild_table(conn, table, values):
+    """
+    Recria uma tabela do SQLite com a definição atual do modelo, copiando as
+    linhas: o SQLite não altera restrições nem chaves estrangeiras de uma tabela
+    existente (ALTER TABLE limitado).
+
+    Linhas que referenciam motoristas ou caminhões inexistentes (gravadas antes
+    das chaves estrangeiras serem verificadas) não são copiadas.
+
+    Args:
+        conn (Connection): Conexão da migração
+        table (Table): Tabela do modelo
+        values (dict): Expressão SQL de cada coluna, lida da tabela antiga
+    """
+    if conn.dialect.name != "sqlite":
+        raise RuntimeError(
+            f"Table {table.name} predates versioned migrations; automatic upgrade is only supported on SQLite"
+        )
+    old = f"{table.name}_old"
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {old}"))
+    # Índices e gatilhos acompanham a tabela renomeada, mas mantêm os nomes, que
+    # a nova tabela volta a usar
+    for kind, name in conn.execute(text(
+        "SELECT type, name FROM sqlite_master WHERE tbl_name = :old AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ), {"old": old}).all():
+        conn.execute(text(f"DROP {kind.upper()} {name}"))
+    table.create(conn)
+    columns = ", ".join(values)
+    try:
+        conn.execute(text(
+            f"INSERT INTO {table.name} ({columns}) SELECT {', '.join(values.values())} FROM {old} "
+            f"WHERE driver_id IN (SELECT id FROM driver) AND truck_id IN (SELECT id FROM truck)"
+        ))
+    except IntegrityError as error:
+        raise RuntimeError(
+            f"Existing rows of {table.name} violate the current constraints (e.g. overlapping "
+            f"assignments of the same driver or truck); fix them and run the upgrade again: {error.orig}"
+        ) from error
+    conn.execute(text(f"DROP TABLE {old}"))
+
+@migration(1, "Esquema inicial: motoristas, caminhões e atribuições")
+def _initial(conn):
+    # Tabelas criadas pelo db.create_all() da versão original
+    for name in ("driver", "truck"):
+        db.metadata.tables[name].create(conn, checkfirst=True)
+
+@migration(2, "Remoção lógica de motoristas e caminhões (deleted_at)")
+def _soft_delete(conn):
+    inspector = inspect(conn)
+    for name in ("driver", "truck"):
+        if "deleted_at" not in {column["name"] for column in inspector.get_columns(name)}:
+            _add_column(conn, db.metadata.tables[name], "deleted_at")
+
+@migration(3, "Atribuições com período (end_date), restrições únicas e ON DELETE CASCADE")
+def _assignment_period(conn):
+    from app.models import Assignment
+    table = Assignment.__table__
+    inspector = inspect(conn)
+    if not inspector.has_table(table.name):
+        table.create(conn)
+        return
+    columns = {column["name"] for column in inspector.get_columns(table.name)}
+    constraints = {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+    cascade = all(
+        (key.get("options") or {}).get("ondelete", "").upper() == "CASCADE"
+        for key in inspector.get_foreign_keys(table.name)
+    )
+    if "end_date" in columns and {"uq_assignment_driver_date", "uq_assignment_truck_date"} <= constraints and cascade:
+        return
+    _rebuild_table(conn, table, {
+        "id": "id",
+        "driver_id": "driver_id",
+        "truck_id": "truck_id",
+        "date": "date",
+        "end_date": "end_date" if "end_date" in columns else "date",
+    })
+
+@migration(4, "Change log, arquivo de atribuições, idempotência e rollup de utilização")
+def _operational_tables(conn):
+    from app.models import ChangeEvent, ArchivedAssignment, ArchiveRun, IdempotencyKey, LicenseUtilization
+    from app.utils.rollups import utilization_rows
+    inspector = inspect(conn)
+    for model in (ChangeEvent, ArchiveRun, IdempotencyKey):
+        model.__table__.create(conn, checkfirst=True)
+
+    archive = ArchivedAssignment.__table__
+    if not inspector.has_table(archive.name):
+        archive.create(conn)
+    elif "end_date" not in {column["name"] for column in inspector.get_columns(archive.name)}:
+        _rebuild_table(conn, archive, {
+            "id": "id",
+            "driver_id": "driver_id",
+            "truck_id": "truck_id",
+            "date": "date",
+            "end_date": "date",
+            "archived_at": "archived_at",
+        })
+
+    # Carga inicial do rollup a partir das atribuições existentes
+    rollup = LicenseUtilization.__table__
+    if not inspector.has_table(rollup.name):
+        rollup.create(conn)
+        rows = utilization_rows(conn)
+        if rows:
+            conn.execute(insert(rollup), rows)
+
+@migration(5, "Índices das listagens e índices de busca por nome e placa")
+def _indexes(conn):
+    from app.models.search_index import build_search_indexes
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    build_search_indexes(conn)
+
+@migration(6, "Contador de geração do cache de carteiras")
+def _cache_generation(conn):
+    from app.models import CacheGeneration
+    CacheGeneration.__table__.create(conn, checkfirst=True)
+
+@migration(7, "IDs de atribuições não reutilizados após o arquivamento (AUTOINCREMENT no SQLite)")
+def _assignment_autoincrement(conn):
+    # No PostgreSQL a sequência do id nunca reutiliza valores
+    if conn.dialect.name != "sqlite":
+        return
+    from app.models import Assignment
+    table = Assignment.__table__
+    definition = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {"name": table.name}).scalar()
+    if "AUTOINCREMENT" not in definition.upper():
+        _rebuild_table(conn, table, {name: name for name in ("id", "driver_id", "truck_id", "date", "end_date")})
+    # A sequência continua a partir do maior ID já usado, inclusive no arquivo
+    last = conn.execute(text(
+        "SELECT max(id) FROM (SELECT max(id) AS id FROM assignment UNION ALL SELECT max(id) FROM assignment_archive)"
+    )).scalar()
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+    if last is not None:
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": table.name, "seq": last})
+
+@migration(8, "Classes de carteira registradas nas atribuições, usadas pelo rollup de utilização")
+def _assignment_licenses(conn):
+    from app.models import Assignment, ArchivedAssignment
+    inspector = inspect(conn)
+    for table in (Assignment.__table__, ArchivedAssignment.__table__):
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for name in ("driver_license", "truck_license"):
+            if name not in columns:
+                _add_column(conn, table, name)
+        # Atribuições existentes recebem as carteiras atuais, as mesmas já contadas no rollup
+        conn.execute(text(
+            f"UPDATE {table.name} SET driver_license = "
+            f"(SELECT license_type FROM driver WHERE driver.id = {table.name}.driver_id) "
+            f"WHERE driver_license IS NULL"
+        ))
+        conn.execute(text(
+            f"UPDATE {table.name} SET truck_license = "
+            f"(SELECT min_license_type FROM truck WHERE truck.id = {table.name}.truck_id) "
+            f"WHERE truck_license IS NULL"
+        ))
+
+def current_version(conn):
+    """
+    Versão do esquema gravada no banco.
+
+    Args:
+        conn (Connection): Conexão com o banco
+
+    Returns:
+        int: Última migração aplicada, ou None em um banco novo ou criado antes
+             das migrações versionadas
+    """
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar()
+    except (OperationalError, ProgrammingError):
+        # Tabela de versão ausente
+        conn.rollback()
+        return None
+
+def upgrade(engine):
+    """
+    Aplica as migrações pendentes em uma única transação.
+
+    Em um banco vazio, as tabelas são criadas diretamente a partir dos modelos e
+    todas as migrações são apenas registradas. A transação é exclusiva (BEGIN
+    IMMEDIATE no SQLite, advisory lock no PostgreSQL): processos iniciados ao
+    mesmo tempo aguardam o primeiro e não repetem as migrações já aplicadas.
+
+    Args:
+        engine (Engine): Engine do banco a migrar
+
+    Returns:
+        list: Versões aplicadas (vazia se o esquema já estava atualizado)
+    """
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+        schema_version.create(conn, checkfirst=True)
+        version = conn.execute(select(func.max(schema_version.c.version))).scalar()
+        fresh = version is None and not inspect(conn).has_table("driver")
+        if fresh:
+            db.metadata.create_all(conn)
+
+        applied = []
+        for number, description, migrate in MIGRATIONS:
+            if version is not None and number <= version:
+                continue
+            if not fresh:
+                migrate(conn)
+            conn.execute(insert(schema_version).values(
+                version=number, description=description, applied_at=datetime.utcnow()
+            ))
+            applied.append(number)
+        conn.commit()
+    return applied
+
+def _outdated_response(app):
+    # Enquanto o esquema estiver desatualizado, as requisições recebem 503. A
+    # versão é lida novamente a cada requisição, de modo que os processos voltam
+    # a atender assim que `flask upgrade-db` é executado, sem reinício
+    def check_schema_version():
+        from flask import jsonify
+        if app.extensions.get("schema_outdated"):
+            with db.engine.connect() as conn:
+                version = current_version(conn)
+            if version == latest_version():
+                app.extensions["schema_outdated"] = False
+                return None
+            return jsonify({
+                "error": f"Database schema is at version {version}, expected {latest_version()}. "
+                         "Run: flask upgrade-db"
+            }), 503
+        return None
+    return check_schema_version
+
+def init_schema(app):
+    """
+    Verifica a versão do esquema na inicialização, com uma única consulta, em
+    vez de inspecionar todas as tabelas (db.create_all()).
+
+    Com o esquema desatualizado, AUTO_MIGRATE aplica as migrações pendentes;
+    sem ele, o erro é registrado e as requisições recebem 503 até que o comando
+    `flask upgrade-db` seja executado. Ao final, as conexões abertas são
+    descartadas: processos criados por fork (ex.: gunicorn --preload) abrem as
+    suas próprias conexões.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    with app.app_context():
+        engine = db.engine
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    if version != latest_version():
+        if app.config["AUTO_MIGRATE"]:
+            applied = upgrade(engine)
+            if applied:
+                app.logger.info("Database schema upgraded to version %s (%s migrations)", latest_version(), len(applied))
+        else:
+            app.logger.error(
+                "Database schema is at version %s, expected %s; run `flask upgrade-db`", version, latest_version()
+            )
+            app.extensions["schema_outdated"] = True
+            app.before_request(_outdated_response(app))
+
+    # Um banco SQLite em memória existe apenas na conexão aberta (StaticPool)
+    if engine.url.database not in (None, "", ":memory:"):
+        engine.dispose()
@@ -1,5 +1,10 @@
 from app.models.driver import Driver
 from app.models.truck import Truck
 from app.models.assignment import Assignment
+from app.models.change_event import ChangeEvent
+from app.models.assignment_archive import ArchivedAssignment, ArchiveRun
+from app.models.idempotency_key import IdempotencyKey
+from app.models.utilization import LicenseUtilization
+from app.models.cache_generation import CacheGeneration
 
-__all__ = ['Driver', 'Truck', 'Assignment'] 
\ No newline at end of file
+__all__ = ['Driver', 'Truck', 'Assignment', 'ChangeEvent', 'ArchivedAssignment', 'ArchiveRun', 'IdempotencyKey', 'LicenseUtilization', 'CacheGeneration'] 
\ No newline at end of file
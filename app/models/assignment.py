@@ -1,19 +1,125 @@
+from sqlalchemy import DDL, event
 from app import db
 
+def _same_day(context):
+    # Sem end_date, a atribuição cobre apenas o dia de início
+    return context.get_current_parameters()["date"]
+
 class Assignment(db.Model):
+    # Uma atribuição ocupa o motorista e o caminhão de `date` (início) até
+    # `end_date`, inclusive. Os períodos de um mesmo motorista ou caminhão não se
+    # sobrepõem: no SQLite, gatilhos verificam a regra em cada escrita com uma
+    # única busca no índice e, no PostgreSQL, restrições de exclusão sobre
+    # daterange (ver OVERLAP_TRIGGER abaixo). As restrições únicas de
+    # (driver_id, date) e (truck_id, date) são os índices ordenados pelo início
+    # usados nessa busca e também atendem às buscas por driver_id/truck_id
+    # isoladas (ex.: exclusão em cascata). No SQLite, AUTOINCREMENT impede que os
+    # IDs das atribuições movidas para assignment_archive sejam reutilizados.
+    __table_args__ = (
+        db.UniqueConstraint('driver_id', 'date', name='uq_assignment_driver_date'),
+        db.UniqueConstraint('truck_id', 'date', name='uq_assignment_truck_date'),
+        db.CheckConstraint('end_date >= date', name='ck_assignment_period'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    driver_id = db.Column(db.Integer, db.ForeignKey('driver.id'), nullable=False)
-    truck_id = db.Column(db.Integer, db.ForeignKey('truck.id'), nullable=False)
-    # Salva a data no formato YYYY-MM-DD
-    date = db.Column(db.String(10), nullable=False)
+    # ON DELETE CASCADE: o banco remove as atribuições junto com o motorista ou
+    # caminhão, sem carregá-las na sessão (passive_deletes nas relações abaixo)
+    driver_id = db.Column(db.Integer, db.ForeignKey('driver.id', ondelete='CASCADE'), nullable=False)
+    truck_id = db.Column(db.Integer, db.ForeignKey('truck.id', ondelete='CASCADE'), nullable=False)
+    # Tipo DATE nativo; o índice atende às consultas por intervalo de datas.
+    # Como um período tem no máximo MAX_ASSIGNMENT_DAYS dias, as atribuições que
+    # tocam um intervalo são lidas por uma faixa limitada deste índice
+    date = db.Column(db.Date, nullable=False, index=True)
+    end_date = db.Column(db.Date, nullable=False, default=_same_day)
+    # Classes de carteira do motorista e do caminhão quando a atribuição foi
+    # gravada: a classe em que seus dias são contados no rollup de utilização
+    # (ver app.utils.rollups). Uma mudança de carteira posterior não as altera
+    driver_license = db.Column(db.String(1))
+    truck_license = db.Column(db.String(1))
 
-    driver = db.relationship('Driver', backref=db.backref('assignments', cascade="all, delete-orphan"))
-    truck = db.relationship('Truck', backref=db.backref('assignments', cascade="all, delete-orphan"))
+    driver = db.relationship('Driver', backref=db.backref('assignments', cascade="all, delete-orphan", passive_deletes=True))
+    truck = db.relationship('Truck', backref=db.backref('assignments', cascade="all, delete-orphan", passive_deletes=True))
 
-    def to_dict(self):
-        return {
+    def to_dict(self, expand=("driver", "truck")):
+        # Somente as relações listadas em `expand` são incorporadas; as demais
+        # aparecem apenas pelo ID, sem disparar o carregamento lazy.
+        data = {
             "id": self.id,
-            "driver": self.driver.to_dict(),
-            "truck": self.truck.to_dict(),
-            "date": self.date,
-        } 
\ No newline at end of file
+            "driver_id": self.driver_id,
+            "truck_id": self.truck_id,
+            "date": self.date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+        }
+        if "driver" in expand:
+            data["driver"] = self.driver.to_dict()
+        if "truck" in expand:
+            data["truck"] = self.truck.to_dict()
+        return data
+
+    @staticmethod
+    def serialize_row(row, expand=("driver", "truck")):
+        # Mesmo formato de to_dict a partir de uma linha de assignment_rows_select():
+        # id, driver_id, truck_id, date, end_date, archived e, conforme `expand`, as
+        # colunas do motorista e do caminhão. Lida por posição, mais rápido que por nome.
+        assignment_id, driver_id, truck_id, day, end_day, archived, *related = row
+        data = {
+            "id": assignment_id,
+            "driver_id": driver_id,
+            "truck_id": truck_id,
+            "date": day.isoformat(),
+            "end_date": end_day.isoformat(),
+        }
+        if archived:
+            data["archived"] = True
+        if "driver" in expand:
+            name, license_type, deleted_at, *related = related
+            data["driver"] = {"id": driver_id, "name": name, "license_type": license_type}
+            if deleted_at is not None:
+                data["driver"]["deleted_at"] = deleted_at.isoformat()
+        if "truck" in expand:
+            plate, min_license_type, deleted_at = related
+            data["truck"] = {"id": truck_id, "plate": plate, "min_license_type": min_license_type}
+            if deleted_at is not None:
+                data["truck"]["deleted_at"] = deleted_at.isoformat()
+        return data
+
+# Verificação de sobreposição no SQLite. Como os períodos já gravados de um
+# motorista (ou caminhão) são disjuntos, basta o de maior início até o fim do novo
+# período: há conflito se ele termina a partir do início do novo. É uma única busca
+# no índice único (driver_id, date), O(log n) independentemente do calendário.
+# RAISE(ABORT) falha como violação de restrição (IntegrityError), com o nome da
+# restrição na mensagem, como as restrições únicas.
+OVERLAP_TRIGGER = """
+CREATE TRIGGER assignment_overlap_{event} BEFORE {event} ON assignment
+BEGIN
+    SELECT RAISE(ABORT, 'uq_assignment_driver_period: overlapping assignment')
+    WHERE (
+        SELECT end_date FROM assignment
+        WHERE driver_id = NEW.driver_id AND date <= NEW.end_date {exclude}
+        ORDER BY date DESC LIMIT 1
+    ) >= NEW.date;
+    SELECT RAISE(ABORT, 'uq_assignment_truck_period: overlapping assignment')
+    WHERE (
+        SELECT end_date FROM assignment
+        WHERE truck_id = NEW.truck_id AND date <= NEW.end_date {exclude}
+        ORDER BY date DESC LIMIT 1
+    ) >= NEW.date;
+END
+"""
+
+for ddl in (
+    DDL(OVERLAP_TRIGGER.format(event="INSERT", exclude="")).execute_if(dialect="sqlite"),
+    DDL(OVERLAP_TRIGGER.format(event="UPDATE", exclude="AND id <> NEW.id")).execute_if(dialect="sqlite"),
+    # No PostgreSQL, restrições de exclusão (índices GiST) com a mesma semântica
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+    DDL(
+        "ALTER TABLE assignment ADD CONSTRAINT uq_assignment_driver_period "
+        "EXCLUDE USING gist (driver_id WITH =, daterange(date, end_date, '[]') WITH &&)"
+    ).execute_if(dialect="postgresql"),
+    DDL(
+        "ALTER TABLE assignment ADD CONSTRAINT uq_assignment_truck_period "
+        "EXCLUDE USING gist (truck_id WITH =, daterange(date, end_date, '[]') WITH &&)"
+    ).execute_if(dialect="postgresql"),
+):
+    event.listen(Assignment.__table__, "after_create", ddl)
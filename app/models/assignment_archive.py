@@ -0,0 +1,59 @@
+from datetime import datetime
+from app import db
+
+class ArchivedAssignment(db.Model):
+    # Atribuições passadas, movidas da tabela assignment pelo arquivamento. Mantêm
+    # o id original, de modo que uma atribuição tem o mesmo id antes e depois de
+    # arquivada. Sem restrições únicas: as linhas chegam já validadas e não mudam.
+    __tablename__ = 'assignment_archive'
+    __table_args__ = (
+        db.Index('ix_assignment_archive_driver_date', 'driver_id', 'date'),
+        db.Index('ix_assignment_archive_truck_date', 'truck_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    driver_id = db.Column(db.Integer, db.ForeignKey('driver.id', ondelete='CASCADE'), nullable=False)
+    truck_id = db.Column(db.Integer, db.ForeignKey('truck.id', ondelete='CASCADE'), nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
+    end_date = db.Column(db.Date, nullable=False)
+    # Classes de carteira registradas na atribuição (ver Assignment)
+    driver_license = db.Column(db.String(1))
+    truck_license = db.Column(db.String(1))
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    driver = db.relationship('Driver')
+    truck = db.relationship('Truck')
+
+    def to_dict(self, expand=("driver", "truck")):
+        # Mesmo formato de Assignment.to_dict, com a indicação "archived"
+        data = {
+            "id": self.id,
+            "driver_id": self.driver_id,
+            "truck_id": self.truck_id,
+            "date": self.date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "archived": True,
+        }
+        if "driver" in expand:
+            data["driver"] = self.driver.to_dict()
+        if "truck" in expand:
+            data["truck"] = self.truck.to_dict()
+        return data
+
+class ArchiveRun(db.Model):
+    # Execuções do arquivamento. A maior data de corte é o limite abaixo do qual
+    # as datas são somente leitura (novas atribuições são recusadas).
+    __tablename__ = 'archive_run'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cutoff = db.Column(db.Date, nullable=False)
+    archived = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "cutoff": self.cutoff.isoformat(),
+            "archived": self.archived,
+            "created_at": self.created_at.isoformat(),
+        }
@@ -0,0 +1,11 @@
+from app import db
+
+class CacheGeneration(db.Model):
+    # Contadores de geração dos caches em memória compartilhados pelos processos.
+    # Cada escrita que torna um cache desatualizado incrementa o contador na mesma
+    # transação; os processos comparam o valor lido com o da última verificação
+    # (ver app.utils.license_cache e app.utils.cache).
+    __tablename__ = 'cache_generation'
+
+    name = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
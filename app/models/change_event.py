@@ -0,0 +1,22 @@
+from datetime import datetime
+from app import db
+
+class ChangeEvent(db.Model):
+    # Registro persistente das alterações (change log) publicado em /events.
+    # O id é o número de sequência usado como Last-Event-ID.
+    id = db.Column(db.Integer, primary_key=True)
+    collection = db.Column(db.String(20), nullable=False)  # drivers, trucks ou assignments
+    action = db.Column(db.String(10), nullable=False)  # created, updated ou deleted
+    entity_id = db.Column(db.Integer, nullable=False)
+    # Representação JSON da entidade no momento da alteração
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "collection": self.collection,
+            "action": self.action,
+            "entity_id": self.entity_id,
+            "payload": self.payload,
+        }
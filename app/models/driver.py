@@ -1,13 +1,38 @@
 from app import db
+from app.models.search_index import register_search_index
 
 class Driver(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    license_type = db.Column(db.String(1), nullable=False)  # A, B, C, D or E
+    # Índice B-tree: filtro por classe de carteira nas listagens, em ordem de id
+    license_type = db.Column(db.String(1), nullable=False, index=True)  # A, B, C, D or E
+    # Remoção lógica (DELETE ?soft=true): preserva o histórico de atribuições
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def columns(cls):
+        # Colunas lidas pelas listagens com select(), sem instanciar o modelo
+        return (cls.id, cls.name, cls.license_type, cls.deleted_at)
+
+    @staticmethod
+    def serialize(row):
+        # Aceita uma instância ou uma linha de select(*Driver.columns())
+        data = {
+            "id": row.id,
+            "name": row.name,
+            "license_type": row.license_type,
+        }
+        if row.deleted_at is not None:
+            data["deleted_at"] = row.deleted_at.isoformat()
+        return data
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "license_type": self.license_type,
-        } 
\ No newline at end of file
+        return self.serialize(self)
+
+# Busca parcial por nome (?q=): índice trigram no SQLite para trechos do texto
+# e índice de lower(name) para a busca pelo início
+DRIVER_SEARCH_INDEX = register_search_index(Driver.__table__, "name")
+db.Index("ix_driver_name_lower", db.func.lower(Driver.name))
+# Filtro por classe de carteira (?license_type=), também combinado com a busca pelo
+# início: a faixa de lower(name) é lida em ordem dentro da classe
+db.Index("ix_driver_license_type_name", Driver.license_type, db.func.lower(Driver.name))
@@ -0,0 +1,19 @@
+from datetime import datetime
+from app import db
+
+class IdempotencyKey(db.Model):
+    # Chaves Idempotency-Key recebidas em POST/PUT e a resposta original de cada uma.
+    # status nulo indica que a requisição original ainda está em andamento, e 0
+    # que suas alterações foram confirmadas mas a resposta ainda não foi gravada.
+    __tablename__ = 'idempotency_key'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False, unique=True)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    # Hash do método, da URL e do corpo, para recusar a mesma chave em outra requisição
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.Integer)
+    body = db.Column(db.LargeBinary)
+    mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,81 @@
+import sqlite3
+from sqlalchemy import DDL, event, text
+
+# Índices de busca textual registrados: nome do índice -> (tabela, coluna)
+SEARCH_INDEXES = {}
+
+# Tabela FTS5 com o tokenizador trigram (SQLite 3.34+): cada trecho de três
+# caracteres do texto é indexado, de modo que buscas por qualquer parte do nome
+# ou da placa, sem diferenciar maiúsculas, são atendidas pelo índice. A tabela
+# não guarda cópia do texto (content=), e os gatilhos a mantêm sincronizada.
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+    "{column}, content='{table}', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {index}(rowid, {column}) VALUES (NEW.id, NEW.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {index}({index}, rowid, {column}) VALUES ('delete', OLD.id, OLD.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column} ON {table} BEGIN "
+    "INSERT INTO {index}({index}, rowid, {column}) VALUES ('delete', OLD.id, OLD.{column}); "
+    "INSERT INTO {index}(rowid, {column}) VALUES (NEW.id, NEW.{column}); END",
+)
+
+def supports_search_index(dialect):
+    # O tokenizador trigram existe a partir do SQLite 3.34
+    return dialect.name == "sqlite" and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+def _supported(ddl, target, bind, **kw):
+    return supports_search_index(bind.dialect)
+
+def search_index_ddl(index):
+    """
+    Comandos que criam o índice de busca e seus gatilhos (idempotentes).
+
+    Args:
+        index (str): Nome do índice registrado por register_search_index
+
+    Returns:
+        list: Comandos SQL
+    """
+    table, column = SEARCH_INDEXES[index]
+    return [statement.format(index=index, table=table, column=column) for statement in SEARCH_INDEX_DDL]
+
+def register_search_index(table, column):
+    """
+    Cria, junto com a tabela, um índice trigram para buscas parciais na coluna.
+
+    Nos bancos sem suporte (outros dialetos ou SQLite antigo), nada é criado e as
+    buscas usam LIKE (ver app.utils.search).
+
+    Args:
+        table (Table): Tabela do modelo (Model.__table__)
+        column (str): Nome da coluna indexada
+
+    Returns:
+        str: Nome do índice (tabela FTS5)
+    """
+    index = f"{table.name}_search"
+    SEARCH_INDEXES[index] = (table.name, column)
+    for statement in search_index_ddl(index):
+        event.listen(table, "after_create", DDL(statement).execute_if(callable_=_supported))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {index}").execute_if(callable_=_supported))
+    return index
+
+def build_search_indexes(connection):
+    """
+    Cria os índices de busca ausentes (ex.: em um banco anterior a eles) e os
+    reconstrói a partir das tabelas indexadas.
+
+    Args:
+        connection (Connection): Conexão onde os comandos são executados
+
+    Returns:
+        list: Nomes dos índices reconstruídos (vazia se o banco não tem suporte)
+    """
+    if not supports_search_index(connection.dialect):
+        return []
+    for index in SEARCH_INDEXES:
+        for statement in search_index_ddl(index):
+            connection.execute(text(statement))
+        connection.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+    return list(SEARCH_INDEXES)
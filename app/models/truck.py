@@ -1,13 +1,38 @@
 from app import db
+from app.models.search_index import register_search_index
 
 class Truck(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     plate = db.Column(db.String(20), nullable=False, unique=True)
-    min_license_type = db.Column(db.String(1), nullable=False)  # A, B, C, D or E
+    # Índice B-tree: filtro por classe de carteira nas listagens, em ordem de id
+    min_license_type = db.Column(db.String(1), nullable=False, index=True)  # A, B, C, D or E
+    # Remoção lógica (DELETE ?soft=true): preserva o histórico de atribuições
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def columns(cls):
+        # Colunas lidas pelas listagens com select(), sem instanciar o modelo
+        return (cls.id, cls.plate, cls.min_license_type, cls.deleted_at)
+
+    @staticmethod
+    def serialize(row):
+        # Aceita uma instância ou uma linha de select(*Truck.columns())
+        data = {
+            "id": row.id,
+            "plate": row.plate,
+            "min_license_type": row.min_license_type,
+        }
+        if row.deleted_at is not None:
+            data["deleted_at"] = row.deleted_at.isoformat()
+        return data
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "plate": self.plate,
-            "min_license_type": self.min_license_type,
-        } 
\ No newline at end of file
+        return self.serialize(self)
+
+# Busca parcial por placa (?plate=): índice trigram no SQLite para trechos do texto
+# e índice de lower(plate) para a busca pelo início
+TRUCK_SEARCH_INDEX = register_search_index(Truck.__table__, "plate")
+db.Index("ix_truck_plate_lower", db.func.lower(Truck.plate))
+# Filtro por classe de carteira (?min_license_type=), também combinado com a busca pelo
+# início: a faixa de lower(plate) é lida em ordem dentro da classe
+db.Index("ix_truck_min_license_type_plate", Truck.min_license_type, db.func.lower(Truck.plate))
@@ -0,0 +1,14 @@
+from app import db
+
+class LicenseUtilization(db.Model):
+    # Rollup diário da utilização por classe de carteira, mantido a cada escrita
+    # de atribuições (app.utils.rollups). Conta as atribuições ativas e arquivadas
+    # em cada dia do seu período: trucks pela carteira mínima exigida pelo caminhão
+    # e drivers pela carteira do motorista. Os relatórios leem no máximo uma linha
+    # por dia e classe.
+    __tablename__ = 'license_utilization_daily'
+
+    date = db.Column(db.Date, primary_key=True)
+    license_type = db.Column(db.String(1), primary_key=True)
+    trucks = db.Column(db.Integer, nullable=False, default=0)
+    drivers = db.Column(db.Integer, nullable=False, default=0)
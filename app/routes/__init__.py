@@ -1,3 +1,3 @@
-from app.routes import drivers, trucks, assignments
+from app.routes import drivers, trucks, assignments, admin, exports, availability, schedule, metrics, events, reports
 
-__all__ = ['drivers', 'trucks', 'assignments'] 
\ No newline at end of file
+__all__ = ['drivers', 'trucks', 'assignments', 'admin', 'exports', 'availability', 'schedule', 'metrics', 'events', 'reports'] 
\ No newline at end of file
@@ -0,0 +1,59 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.models import ArchiveRun
+from app.utils.archive import archive_assignments, archive_cutoff
+from app.utils.helpers import invalid_assignments_query
+from app.utils.license_cache import license_cache
+
+# Blueprint para rotas administrativas (auditorias e manutenção)
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+@admin_bp.route('/audit/assignments', methods=['GET'])
+def audit_assignments():
+    # Auditoria completa: lista todas as atribuições com carteira incompatível.
+    # Executada como uma única consulta no banco, indicada para verificações noturnas.
+    current_app.logger.info("Running full assignment license audit")
+    invalid = invalid_assignments_query().all()
+    return jsonify({
+        "valid": not invalid,
+        "invalid_count": len(invalid),
+        "invalid_assignments": [
+            {
+                "id": row.id,
+                "driver_id": row.driver_id,
+                "truck_id": row.truck_id,
+                "date": row.date.isoformat(),
+                "end_date": row.end_date.isoformat(),
+                "license_type": row.license_type,
+                "min_license_type": row.min_license_type,
+            }
+            for row in invalid
+        ],
+    }), 200
+
+@admin_bp.route('/archive/assignments', methods=['POST'])
+def archive_past_assignments():
+    # Move para o arquivo as atribuições mais antigas que o horizonte informado
+    # ("horizon_days") ou ARCHIVE_HORIZON_DAYS, em uma transação; para volumes
+    # grandes, prefira o comando `flask archive-assignments` fora do servidor.
+    data = request.get_json(silent=True) or {}
+    horizon_days = data.get("horizon_days", current_app.config["ARCHIVE_HORIZON_DAYS"])
+    if not isinstance(horizon_days, int) or isinstance(horizon_days, bool) or horizon_days < 1:
+        current_app.logger.error("Invalid horizon_days")
+        return jsonify({"error": "horizon_days must be a positive integer"}), 400
+
+    cutoff = archive_cutoff(horizon_days)
+    current_app.logger.info("Archiving assignments before %s", cutoff)
+    run = archive_assignments(cutoff, current_app.config["ARCHIVE_BATCH_SIZE"])
+    return jsonify(run.to_dict()), 200
+
+@admin_bp.route('/archive/runs', methods=['GET'])
+def get_archive_runs():
+    # Lista as execuções do arquivamento, da mais recente para a mais antiga.
+    runs = ArchiveRun.query.order_by(ArchiveRun.id.desc()).all()
+    return jsonify([run.to_dict() for run in runs]), 200
+
+@admin_bp.route('/cache/licenses', methods=['GET'])
+def get_license_cache_stats():
+    # Estatísticas do cache de carteiras deste processo: entradas, acertos,
+    # faltas e a geração conhecida.
+    return jsonify(license_cache.stats()), 200
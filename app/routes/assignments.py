@@ -1,125 +1,404 @@
-from flask import Blueprint, request, jsonify, current_app
+from collections import defaultdict
+from flask import Blueprint, request, jsonify, current_app, abort
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from app import db
-from app.models import Driver, Truck, Assignment
-from app.utils.helpers import is_license_valid, parse_date
+from app.models import Driver, Truck, Assignment, ArchivedAssignment
+from app.utils.bulk import parse_bulk_request, commit_bulk
+from app.utils.cache import cached_response
+from app.utils.events import record_change
+from app.utils.archive import ARCHIVED_DATE_ERROR, archive_limit_for, is_archived_date, writes_archived_dates
+from app.utils.helpers import (
+    is_license_valid, parse_date, parse_date_range, parse_period, parse_expand, parse_flag, overlapping,
+    assignment_rows_select,
+)
+from app.utils.idempotency import idempotent
+from app.utils.license_cache import license_types
+from app.utils.pagination import parse_page_args, keyset_page, merge_pages, page_body
 
 # Blueprint para agrupar todas as rotas relacionadas a atribuições
 # Facilita a organização e manutenção do código
 assignments_bp = Blueprint('assignments', __name__, url_prefix='/assignments')
 
+def _load_options(expand, model=Assignment):
+    # Carrega motorista e caminhão na mesma consulta (JOIN) apenas quando serão
+    # incorporados na resposta, evitando o padrão N+1 do carregamento lazy.
+    relations = {"driver": model.driver, "truck": model.truck}
+    return [joinedload(relations[name]) for name in expand]
+
+def _conflict_error(error):
+    # Traduz a violação das restrições de sobreposição (uq_assignment_*_period) e
+    # das restrições únicas de (driver_id, date) e (truck_id, date) na mesma
+    # mensagem que as validações de conflito retornavam.
+    message = str(error.orig)
+    if "uq_assignment_driver" in message or "assignment.driver_id" in message:
+        return "The driver is already assigned to a truck on this date"
+    if "uq_assignment_truck" in message or "assignment.truck_id" in message:
+        return "The truck is already assigned to a driver on this date"
+    return None
+
+def _commit_or_conflict():
+    # Faz o commit da sessão; em caso de conflito no mesmo dia, desfaz a transação
+    # e retorna a resposta de erro correspondente.
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        message = _conflict_error(e)
+        if message is None:
+            raise
+        current_app.logger.error(message)
+        return jsonify({"error": message}), 400
+    return None
+
 @assignments_bp.route('/', methods=['GET'])
+@cached_response('assignments', 'drivers', 'trucks')
 def get_assignments():
     # Lista todas as atribuições cadastradas.
+    # Com ?include_archived=true, inclui as atribuições arquivadas.
     current_app.logger.info("Fetching all assignments")
-    assignments = Assignment.query.all()
-    return jsonify([assignment.to_dict() for assignment in assignments]), 200
+    expand = parse_expand(request.args.get("expand"))
+    if expand is None:
+        current_app.logger.error("Invalid expand parameter")
+        return jsonify({"error": "Invalid expand parameter. Use driver, truck or none"}), 400
+
+    # Filtros opcionais: intervalo de datas (inclusivo; atribuições cujo período
+    # toca o intervalo), motorista e caminhão. Atendidos pelos índices de date,
+    # (driver_id, date) e (truck_id, date).
+    date_from, date_to, error = parse_date_range(request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    filters = {}
+    for param in ("driver_id", "truck_id"):
+        if param in request.args:
+            filters[param] = request.args.get(param, type=int)
+            if filters[param] is None:
+                current_app.logger.error("Invalid %s parameter", param)
+                return jsonify({"error": f"Invalid {param} parameter"}), 400
+
+    paginated, limit, after, error = parse_page_args(request.args, cursor_types=(parse_date, int))
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    def build_statement(model):
+        # Colunas lidas direto do select(), sem instanciar objetos ORM
+        statement = assignment_rows_select(model, expand).where(*overlapping(model, date_from, date_to))
+        for param, value in filters.items():
+            statement = statement.where(getattr(model, param) == value)
+        return statement
+
+    # As atribuições arquivadas ficam em outra tabela; as duas são lidas pela
+    # mesma chave (date, id) e intercaladas, sem alterar as consultas do dia a dia
+    models = [Assignment]
+    if parse_flag(request.args, "include_archived"):
+        models.append(ArchivedAssignment)
+
+    if paginated:
+        # Paginação por cursor ordenada por (date, id), lida em ordem pelo índice de date
+        rows, has_more = merge_pages(
+            [keyset_page(build_statement(model), [model.date, model.id], after, limit) for model in models],
+            lambda row: (row.date, row.id),
+            limit,
+        )
+        return jsonify(page_body(
+            rows,
+            has_more,
+            lambda row: [row.date.isoformat(), row.id],
+            lambda row: Assignment.serialize_row(row, expand),
+        )), 200
+
+    if len(models) == 1:
+        rows = db.session.execute(build_statement(Assignment)).all()
+    else:
+        rows = sorted(
+            (row for model in models for row in db.session.execute(build_statement(model))),
+            key=lambda row: (row.date, row.id),
+        )
+    return jsonify([Assignment.serialize_row(row, expand) for row in rows]), 200
 
 @assignments_bp.route('/<int:assignment_id>', methods=['GET'])
+@cached_response('assignments', 'drivers', 'trucks')
 def get_assignment(assignment_id):
     # Recupera os dados de uma atribuição específica.
-    current_app.logger.info(f"Fetching assignment with ID {assignment_id}")
-    assignment = Assignment.query.get_or_404(assignment_id)
-    return jsonify(assignment.to_dict()), 200
+    current_app.logger.info("Fetching assignment with ID %s", assignment_id)
+    expand = parse_expand(request.args.get("expand"))
+    if expand is None:
+        current_app.logger.error("Invalid expand parameter")
+        return jsonify({"error": "Invalid expand parameter. Use driver, truck or none"}), 400
+
+    assignment = Assignment.query.options(*_load_options(expand)).get(assignment_id)
+    if assignment is None and parse_flag(request.args, "include_archived"):
+        assignment = ArchivedAssignment.query.options(*_load_options(expand, ArchivedAssignment)).get(assignment_id)
+    if assignment is None:
+        abort(404)
+    return jsonify(assignment.to_dict(expand)), 200
 
 @assignments_bp.route('/', methods=['POST'])
+@idempotent
 def create_assignment():
     # Cria uma nova atribuição.
     data = request.get_json()
     driver_id = data.get("driver_id")
     truck_id = data.get("truck_id")
-    date_str = data.get("date")  # Formato esperado "YYYY-MM-DD"
 
-    if not driver_id or not truck_id or not date_str:
+    if not driver_id or not truck_id or not data.get("date"):
         current_app.logger.error("driver_id, truck_id and date are required")
         return jsonify({"error": "driver_id, truck_id and date are required"}), 400
 
-    if not parse_date(date_str):
-        current_app.logger.error("Invalid date format. Use YYYY-MM-DD")
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    # Período de "date" até "end_date" (formato "YYYY-MM-DD"; padrão: um único dia)
+    date, end_date, error = parse_period(data)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
 
-    driver = Driver.query.get(driver_id)
-    truck = Truck.query.get(truck_id)
+    # Datas arquivadas são somente leitura (comparação sem consulta para datas futuras)
+    if is_archived_date(date):
+        current_app.logger.error(ARCHIVED_DATE_ERROR)
+        return jsonify({"error": ARCHIVED_DATE_ERROR}), 400
 
-    if not driver or not truck:
+    # Carteiras lidas do cache (app.utils.license_cache): nos acertos, a única
+    # leitura é o contador de geração, na transação da escrita. Motoristas e
+    # caminhões removidos logicamente não recebem atribuições
+    driver_license, truck_license = license_types(driver_id, truck_id)
+    if driver_license is None or truck_license is None:
         current_app.logger.error("Driver or Truck not found")
         return jsonify({"error": "Driver or Truck not found"}), 404
 
-    # Validação: O motorista não pode ter outra atribuição no mesmo dia
-    driver_assignment = Assignment.query.filter_by(driver_id=driver_id, date=date_str).first()
-    if driver_assignment:
-        current_app.logger.error("The driver is already assigned to a truck on this date")
-        return jsonify({"error": "The driver is already assigned to a truck on this date"}), 400
-
-    # Validação: O caminhão não pode ter outra atribuição no mesmo dia
-    truck_assignment = Assignment.query.filter_by(truck_id=truck_id, date=date_str).first()
-    if truck_assignment:
-        current_app.logger.error("The truck is already assigned to a driver on this date")
-        return jsonify({"error": "The truck is already assigned to a driver on this date"}), 400
-
     # Validação: Verifica se a carteira do motorista é compatível com o caminhão
-    if not is_license_valid(driver.license_type, truck.min_license_type):
+    if not is_license_valid(driver_license, truck_license):
         current_app.logger.error("The driver's license type is not compatible with the truck")
         return jsonify({"error": "The driver's license type is not compatible with the truck"}), 400
 
-    assignment = Assignment(driver_id=driver_id, truck_id=truck_id, date=date_str)
+    # Validação: o motorista e o caminhão não podem ter outra atribuição no período.
+    # Garantida pelas restrições de sobreposição do banco, sem consultas prévias.
+    # As carteiras já lidas são registradas na atribuição para o rollup de utilização
+    assignment = Assignment(
+        driver_id=driver_id, truck_id=truck_id, date=date, end_date=end_date,
+        driver_license=driver_license, truck_license=truck_license,
+    )
     db.session.add(assignment)
-    db.session.commit()
-    current_app.logger.info(f"Assignment created with ID {assignment.id}")
+    record_change("assignments", "created", assignment)
+    error = _commit_or_conflict()
+    if error:
+        return error
+    current_app.logger.info("Assignment created with ID %s", assignment.id)
     return jsonify(assignment.to_dict()), 201
 
 @assignments_bp.route('/<int:assignment_id>', methods=['PUT'])
+@idempotent
 def update_assignment(assignment_id):
     # Atualiza os dados de uma atribuição existente.
-    current_app.logger.info(f"Updating assignment with ID {assignment_id}")
+    current_app.logger.info("Updating assignment with ID %s", assignment_id)
     assignment = Assignment.query.get_or_404(assignment_id)
     data = request.get_json()
     driver_id = data.get("driver_id", assignment.driver_id)
     truck_id = data.get("truck_id", assignment.truck_id)
-    date_str = data.get("date", assignment.date)
+    # Mudar apenas "date" desloca o período, preservando a duração
+    date, end_date, error = parse_period(data, (assignment.date, assignment.end_date))
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+    # Uma atribuição em andamento no arquivamento continua editável, sem mover o
+    # início para datas arquivadas
+    if writes_archived_dates(archive_limit_for((date, end_date)), date, end_date, assignment.date):
+        current_app.logger.error(ARCHIVED_DATE_ERROR)
+        return jsonify({"error": ARCHIVED_DATE_ERROR}), 400
 
-    if not parse_date(date_str):
-        current_app.logger.error("Invalid date format. Use YYYY-MM-DD")
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-
-    driver = Driver.query.get(driver_id)
-    truck = Truck.query.get(truck_id)
-    if not driver or not truck:
+    # Carteiras lidas do cache (app.utils.license_cache): nos acertos, a única
+    # leitura é o contador de geração, na transação da escrita. Motoristas e
+    # caminhões removidos logicamente não recebem atribuições
+    driver_license, truck_license = license_types(driver_id, truck_id)
+    if driver_license is None or truck_license is None:
         current_app.logger.error("Driver or Truck not found")
         return jsonify({"error": "Driver or Truck not found"}), 404
 
-    # Validação: se houver mudança de motorista ou data, verifica se o motorista já tem uma atribuição nesse dia
-    if (driver_id != assignment.driver_id or date_str != assignment.date):
-        driver_assignment = Assignment.query.filter_by(driver_id=driver_id, date=date_str).first()
-        if driver_assignment and driver_assignment.id != assignment.id:
-            current_app.logger.error("The driver is already assigned to a truck on this date")
-            return jsonify({"error": "The driver is already assigned to a truck on this date"}), 400
-
-    # Validaçao: se houver mudança de caminhão ou data, verifica se o caminhão já tem uma atribuição nesse dia
-    if (truck_id != assignment.truck_id or date_str != assignment.date):
-        truck_assignment = Assignment.query.filter_by(truck_id=truck_id, date=date_str).first()
-        if truck_assignment and truck_assignment.id != assignment.id:
-            current_app.logger.error("The truck is already assigned to a driver on this date")
-            return jsonify({"error": "The truck is already assigned to a driver on this date"}), 400
-
     # Validação: Verifica se a carteira do motorista é compatível com o caminhão
-    if not is_license_valid(driver.license_type, truck.min_license_type):
+    if not is_license_valid(driver_license, truck_license):
         current_app.logger.error("The driver's license type is not compatible with the truck")
         return jsonify({"error": "The driver's license type is not compatible with the truck"}), 400
 
     assignment.driver_id = driver_id
     assignment.truck_id = truck_id
-    assignment.date = date_str
+    assignment.date = date
+    assignment.end_date = end_date
+    assignment.driver_license = driver_license
+    assignment.truck_license = truck_license
 
-    db.session.commit()
-    current_app.logger.info(f"Assignment with ID {assignment.id} updated successfully")
+    # Validação: conflitos de motorista ou caminhão no período são detectados
+    # pelas restrições de sobreposição no commit
+    record_change("assignments", "updated", assignment)
+    error = _commit_or_conflict()
+    if error:
+        return error
+    current_app.logger.info("Assignment with ID %s updated successfully", assignment.id)
     return jsonify(assignment.to_dict())
 
 @assignments_bp.route('/<int:assignment_id>', methods=['DELETE'])
 def delete_assignment(assignment_id):
     # Remove uma atribuição do sistema.
-    current_app.logger.info(f"Deleting assignment with ID {assignment_id}")
+    current_app.logger.info("Deleting assignment with ID %s", assignment_id)
     assignment = Assignment.query.get_or_404(assignment_id)
     db.session.delete(assignment)
+    record_change("assignments", "deleted", assignment)
     db.session.commit()
-    current_app.logger.info(f"Assignment with ID {assignment_id} deleted successfully")
-    return jsonify({"message": "Assignment successfully deleted."}) 
\ No newline at end of file
+    current_app.logger.info("Assignment with ID %s deleted successfully", assignment_id)
+    return jsonify({"message": "Assignment successfully deleted."}) 
+
+def _check_batch(entries):
+    # Valida um lote de atribuições com consultas em conjunto: licenças dos
+    # motoristas e caminhões envolvidos e atribuições já existentes que tocam os
+    # mesmos períodos, além de conflitos entre os próprios itens do lote.
+    # `entries` mapeia índice -> (atribuição alterada ou None, driver_id, truck_id, início, fim).
+    # Retorna os erros por índice e as carteiras lidas de motoristas e caminhões.
+    driver_ids = {driver_id for _, driver_id, _, _, _ in entries.values()}
+    truck_ids = {truck_id for _, _, truck_id, _, _ in entries.values()}
+    licenses = dict(db.session.query(Driver.id, Driver.license_type).filter(
+        Driver.id.in_(driver_ids), Driver.deleted_at.is_(None)
+    ))
+    min_licenses = dict(db.session.query(Truck.id, Truck.min_license_type).filter(
+        Truck.id.in_(truck_ids), Truck.deleted_at.is_(None)
+    ))
+
+    # Períodos já ocupados por motorista e por caminhão, limitados ao intervalo do
+    # lote, com o ID da atribuição que os ocupa. Uma atribuição alterada no lote
+    # libera o período original somente depois de o seu item ser validado: se ele
+    # for recusado, o período continua ocupado para os itens seguintes
+    busy_drivers, busy_trucks = defaultdict(list), defaultdict(list)
+    if entries:
+        existing = db.session.query(
+            Assignment.id, Assignment.driver_id, Assignment.truck_id, Assignment.date, Assignment.end_date
+        ).filter(
+            or_(Assignment.driver_id.in_(driver_ids), Assignment.truck_id.in_(truck_ids)),
+            *overlapping(
+                Assignment,
+                min(start for _, _, _, start, _ in entries.values()),
+                max(end for _, _, _, _, end in entries.values()),
+            ),
+        )
+        for row in existing:
+            busy_drivers[row.driver_id].append((row.date, row.end_date, row.id))
+            busy_trucks[row.truck_id].append((row.date, row.end_date, row.id))
+
+    def overlaps(periods, start, end, own):
+        # O período original da própria atribuição não conta como conflito
+        return any(
+            other_start <= end and start <= other_end and (own is None or owner != own)
+            for other_start, other_end, owner in periods
+        )
+
+    def release(periods, own):
+        periods[:] = [period for period in periods if period[2] != own]
+
+    archived_limit = archive_limit_for(start for _, _, _, start, _ in entries.values())
+
+    errors = {}
+    for index in sorted(entries):
+        assignment, driver_id, truck_id, start, end = entries[index]
+        own = assignment.id if assignment is not None else None
+        if driver_id not in licenses or truck_id not in min_licenses:
+            errors[index] = "Driver or Truck not found"
+        elif writes_archived_dates(archived_limit, start, end, assignment.date if assignment is not None else None):
+            errors[index] = ARCHIVED_DATE_ERROR
+        elif overlaps(busy_drivers[driver_id], start, end, own):
+            errors[index] = "The driver is already assigned to a truck on this date"
+        elif overlaps(busy_trucks[truck_id], start, end, own):
+            errors[index] = "The truck is already assigned to a driver on this date"
+        elif not is_license_valid(licenses[driver_id], min_licenses[truck_id]):
+            errors[index] = "The driver's license type is not compatible with the truck"
+        else:
+            if own is not None:
+                release(busy_drivers[assignment.driver_id], own)
+                release(busy_trucks[assignment.truck_id], own)
+            busy_drivers[driver_id].append((start, end, own))
+            busy_trucks[truck_id].append((start, end, own))
+    return errors, licenses, min_licenses
+
+def _serialize_bulk(assignment):
+    return assignment.to_dict(expand=())
+
+@assignments_bp.route('/bulk', methods=['POST'])
+@idempotent
+def create_assignments_bulk():
+    # Cria várias atribuições em uma única transação.
+    items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    entries, errors = {}, {}
+    for index, item in enumerate(items):
+        if not item.get("driver_id") or not item.get("truck_id") or not item.get("date"):
+            errors[index] = "driver_id, truck_id and date are required"
+            continue
+        start, end, error = parse_period(item)
+        if error:
+            errors[index] = error
+        else:
+            entries[index] = (None, item["driver_id"], item["truck_id"], start, end)
+
+    checked, licenses, min_licenses = _check_batch(entries)
+    errors.update(checked)
+    objects = {
+        index: Assignment(
+            driver_id=driver_id, truck_id=truck_id, date=start, end_date=end,
+            driver_license=licenses[driver_id], truck_license=min_licenses[truck_id],
+        )
+        for index, (_, driver_id, truck_id, start, end) in entries.items()
+        if index not in errors
+    }
+    current_app.logger.info("Bulk creating %s assignments (%s invalid)", len(objects), len(errors))
+    return commit_bulk("assignments", "created", objects, errors, atomic, _serialize_bulk)
+
+@assignments_bp.route('/bulk', methods=['PUT'])
+@idempotent
+def update_assignments_bulk():
+    # Atualiza várias atribuições em uma única transação.
+    items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    ids = {item.get("id") for item in items if isinstance(item.get("id"), int)}
+    assignments = {assignment.id: assignment for assignment in Assignment.query.filter(Assignment.id.in_(ids))}
+
+    entries, errors = {}, {}
+    seen = set()
+    for index, item in enumerate(items):
+        assignment = assignments.get(item.get("id"))
+        if assignment is None:
+            errors[index] = "Assignment not found"
+            continue
+        if assignment.id in seen:
+            errors[index] = "Assignment repeated in the batch"
+            continue
+        start, end, error = parse_period(item, (assignment.date, assignment.end_date))
+        if error:
+            errors[index] = error
+        else:
+            seen.add(assignment.id)
+            entries[index] = (
+                assignment,
+                item.get("driver_id", assignment.driver_id),
+                item.get("truck_id", assignment.truck_id),
+                start,
+                end,
+            )
+
+    checked, licenses, min_licenses = _check_batch(entries)
+    errors.update(checked)
+    objects = {}
+    for index, (assignment, driver_id, truck_id, start, end) in entries.items():
+        if index not in errors:
+            assignment.driver_id = driver_id
+            assignment.truck_id = truck_id
+            assignment.date = start
+            assignment.end_date = end
+            assignment.driver_license = licenses[driver_id]
+            assignment.truck_license = min_licenses[truck_id]
+            objects[index] = assignment
+    current_app.logger.info("Bulk updating %s assignments (%s invalid)", len(objects), len(errors))
+    return commit_bulk("assignments", "updated", objects, errors, atomic, _serialize_bulk)
@@ -0,0 +1,72 @@
+from flask import Blueprint, request, jsonify, current_app
+from app import db
+from app.models import Driver, Truck, Assignment
+from app.utils.cache import cached_response
+from app.utils.helpers import license_rank, licenses_at_least, licenses_at_most, overlapping, parse_date_range
+
+# Blueprint para consultas de disponibilidade de motoristas e caminhões
+availability_bp = Blueprint('availability', __name__, url_prefix='/availability')
+
+def _free_drivers(date_from, date_to, min_license_type=None):
+    # Motoristas ativos sem atribuição que toque o intervalo (anti-join via NOT EXISTS, atendido
+    # pelo índice único de (driver_id, date)), com carteira suficiente, se informada.
+    busy = db.select(Assignment.id).where(
+        Assignment.driver_id == Driver.id, *overlapping(Assignment, date_from, date_to)
+    )
+    query = Driver.query.filter(Driver.deleted_at.is_(None), ~busy.exists())
+    if min_license_type:
+        query = query.filter(Driver.license_type.in_(licenses_at_least(min_license_type)))
+    # Menor carteira suficiente primeiro, preservando motoristas de nível mais alto
+    return query.order_by(license_rank(Driver.license_type), Driver.id).all()
+
+def _free_trucks(date_from, date_to, license_type=None):
+    # Caminhões ativos sem atribuição que toque o intervalo, que o motorista pode dirigir, se informado.
+    busy = db.select(Assignment.id).where(
+        Assignment.truck_id == Truck.id, *overlapping(Assignment, date_from, date_to)
+    )
+    query = Truck.query.filter(Truck.deleted_at.is_(None), ~busy.exists())
+    if license_type:
+        query = query.filter(Truck.min_license_type.in_(licenses_at_most(license_type)))
+    # Caminhões mais exigentes primeiro, aproveitando a carteira do motorista
+    return query.order_by(license_rank(Truck.min_license_type).desc(), Truck.id).all()
+
+@availability_bp.route('/', methods=['GET'])
+@cached_response('assignments', 'drivers', 'trucks')
+def get_availability():
+    # Lista motoristas e/ou caminhões livres em uma data (?date=) ou em todos os
+    # dias de um intervalo (?from=&to=). Com ?truck_id=, retorna os motoristas
+    # livres que podem dirigir o caminhão; com ?driver_id=, os caminhões livres
+    # que o motorista pode dirigir.
+    if "date" in request.args:
+        date_from, date_to, error = parse_date_range(request.args, start="date", end="date")
+    else:
+        date_from, date_to, error = parse_date_range(request.args)
+        if not error and not (date_from and date_to):
+            error = "date or from and to are required"
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    truck_id = request.args.get("truck_id", type=int)
+    driver_id = request.args.get("driver_id", type=int)
+    if ("truck_id" in request.args and truck_id is None) or ("driver_id" in request.args and driver_id is None):
+        current_app.logger.error("Invalid truck_id or driver_id parameter")
+        return jsonify({"error": "Invalid truck_id or driver_id parameter"}), 400
+    if truck_id is not None and driver_id is not None:
+        current_app.logger.error("truck_id and driver_id are mutually exclusive")
+        return jsonify({"error": "Use either truck_id or driver_id"}), 400
+
+    current_app.logger.info("Fetching availability from %s to %s", date_from, date_to)
+    result = {"from": date_from.isoformat(), "to": date_to.isoformat()}
+    if truck_id is not None:
+        truck = Truck.query.filter_by(id=truck_id, deleted_at=None).first_or_404()
+        result["truck"] = truck.to_dict()
+        result["drivers"] = [d.to_dict() for d in _free_drivers(date_from, date_to, truck.min_license_type)]
+    elif driver_id is not None:
+        driver = Driver.query.filter_by(id=driver_id, deleted_at=None).first_or_404()
+        result["driver"] = driver.to_dict()
+        result["trucks"] = [t.to_dict() for t in _free_trucks(date_from, date_to, driver.license_type)]
+    else:
+        result["drivers"] = [d.to_dict() for d in _free_drivers(date_from, date_to)]
+        result["trucks"] = [t.to_dict() for t in _free_trucks(date_from, date_to)]
+    return jsonify(result), 200
@@ -1,36 +1,84 @@
 from flask import Blueprint, request, jsonify, current_app
 from app import db
-from app.models import Driver
-from app.utils.helpers import LICENSE_ORDER, validate_assignments
+from app.models import Driver, Assignment, ArchivedAssignment
+from app.models.driver import DRIVER_SEARCH_INDEX
+from app.utils.bulk import parse_bulk_request, commit_bulk
+from app.utils.cache import cached_response, mark_changed
+from app.utils.events import record_change
+from app.utils.helpers import LICENSE_ORDER, validate_assignments, required_license_ranks, parse_flag, soft_delete
+from app.utils.idempotency import idempotent
+from app.utils.license_cache import invalidate_licenses
+from app.utils.pagination import parse_page_args, keyset_page, page_body
+from app.utils.rollups import discount_assignments
+from app.utils.search import search_cursor, search_page
 
 # Blueprint para agrupar todas as rotas relacionadas a motoristas
 drivers_bp = Blueprint('drivers', __name__, url_prefix='/drivers')
 
 @drivers_bp.route('/', methods=['GET'])
+@cached_response('drivers')
 def get_drivers():
     # Lista todos os motoristas cadastrados.
     try:
         current_app.logger.info("Fetching all drivers")
-        drivers = Driver.query.all()
+        # Busca parcial por nome (?q=), ordenada por relevância e sempre
+        # paginada; o cursor passa a ser a posição na ordem da busca
+        term = request.args.get('q', '').strip()
+        paginated, limit, after, error = parse_page_args(
+            request.args, cursor_types=(int, str, int) if term else (int,)
+        )
+        license_type = request.args.get('license_type')
+        if not error and license_type is not None and license_type not in LICENSE_ORDER:
+            error = 'Tipo de carteira inválido'
+        if error:
+            current_app.logger.error(error)
+            return jsonify({'error': error}), 400
+
+        # Motoristas removidos logicamente aparecem apenas com ?include_deleted=true
+        # As linhas são serializadas direto do select(), sem instanciar o modelo
+        statement = db.select(*Driver.columns())
+        if not parse_flag(request.args, 'include_deleted'):
+            statement = statement.where(Driver.deleted_at.is_(None))
+        if license_type:
+            statement = statement.where(Driver.license_type == license_type)
+
+        if term:
+            drivers, has_more = search_page(
+                statement, Driver, Driver.name, DRIVER_SEARCH_INDEX, term, after, limit or current_app.config['DEFAULT_PAGE_SIZE']
+            )
+            current_app.logger.info('Motoristas recuperados com sucesso')
+            return jsonify(page_body(drivers, has_more, search_cursor, Driver.serialize)), 200
+
+        if paginated:
+            # Paginação por cursor ordenada pela chave primária
+            drivers, has_more = keyset_page(statement, [Driver.id], after, limit)
+            current_app.logger.info('Motoristas recuperados com sucesso')
+            return jsonify(page_body(drivers, has_more, lambda d: [d.id], Driver.serialize)), 200
+
+        drivers = db.session.execute(statement).all()
         current_app.logger.info('Motoristas recuperados com sucesso')
-        return jsonify([driver.to_dict() for driver in drivers]), 200
+        return jsonify([Driver.serialize(row) for row in drivers]), 200
     except Exception as e:
-        current_app.logger.error(f'Erro ao recuperar motoristas: {str(e)}')
+        current_app.logger.error('Erro ao recuperar motoristas: %s', e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @drivers_bp.route('/<int:driver_id>', methods=['GET'])
+@cached_response('drivers')
 def get_driver(driver_id):
     # Recupera os dados de um motorista específico.
     try:
-        current_app.logger.info(f"Fetching driver with ID {driver_id}")
+        current_app.logger.info("Fetching driver with ID %s", driver_id)
         driver = Driver.query.get_or_404(driver_id)
-        current_app.logger.info(f'Motorista {driver_id} recuperado com sucesso')
+        if driver.deleted_at is not None and not parse_flag(request.args, 'include_deleted'):
+            return jsonify({'error': 'Motorista não encontrado'}), 404
+        current_app.logger.info('Motorista %s recuperado com sucesso', driver_id)
         return jsonify(driver.to_dict()), 200
     except Exception as e:
-        current_app.logger.error(f'Erro ao recuperar motorista {driver_id}: {str(e)}')
+        current_app.logger.error('Erro ao recuperar motorista %s: %s', driver_id, e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @drivers_bp.route('/', methods=['POST'])
+@idempotent
 def create_driver():
     # Cria um novo motorista.
     try:
@@ -52,22 +100,26 @@ def create_driver():
         )
         
         db.session.add(driver)
+        record_change('drivers', 'created', driver)
         db.session.commit()
         
-        current_app.logger.info(f"Driver created with ID {driver.id}")
+        current_app.logger.info("Driver created with ID %s", driver.id)
         return jsonify(driver.to_dict()), 201
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Erro ao criar motorista: {str(e)}')
+        current_app.logger.error('Erro ao criar motorista: %s', e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @drivers_bp.route('/<int:driver_id>', methods=['PUT'])
+@idempotent
 def update_driver(driver_id):
     # Atualiza os dados de um motorista existente.
     try:
-        current_app.logger.info(f"Updating driver with ID {driver_id}")
+        current_app.logger.info("Updating driver with ID %s", driver_id)
         driver = Driver.query.get_or_404(driver_id)
+        if driver.deleted_at is not None:
+            return jsonify({'error': 'Motorista não encontrado'}), 404
         data = request.get_json()
         
         if 'name' in data:
@@ -78,37 +130,136 @@ def update_driver(driver_id):
                 current_app.logger.error("Invalid license type")
                 return jsonify({"error": "Invalid license type"}), 400
             driver.license_type = data['license_type']
+            invalidate_licenses('drivers', driver.id)
+
+            # Valida, antes do commit, apenas as atribuições deste motorista
+            valid, message = validate_assignments(driver_id=driver.id)
+            if not valid:
+                db.session.rollback()
+                current_app.logger.error("Assignment validation failed: %s", message)
+                return jsonify({"error": message}), 400
             
+        record_change('drivers', 'updated', driver)
         db.session.commit()
-        
-        # Validate assignments after updating driver
-        valid, message = validate_assignments()
-        if not valid:
-            db.session.rollback()
-            current_app.logger.error(f"Assignment validation failed: {message}")
-            return jsonify({"error": message}), 400
-
-        current_app.logger.info(f"Driver with ID {driver.id} updated successfully")
+
+        current_app.logger.info("Driver with ID %s updated successfully", driver.id)
         return jsonify(driver.to_dict()), 200
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Erro ao atualizar motorista {driver_id}: {str(e)}')
+        current_app.logger.error('Erro ao atualizar motorista %s: %s', driver_id, e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @drivers_bp.route('/<int:driver_id>', methods=['DELETE'])
 def delete_driver(driver_id):
     # Remove um motorista do sistema.
     try:
-        current_app.logger.info(f"Deleting driver with ID {driver_id}")
-        driver = Driver.query.get_or_404(driver_id)
-        db.session.delete(driver)
+        current_app.logger.info("Deleting driver with ID %s", driver_id)
+        if parse_flag(request.args, 'soft'):
+            # Remoção lógica: mantém o histórico e libera as atribuições futuras
+            driver = soft_delete(Driver, driver_id, Assignment.driver_id)
+            if driver is None:
+                return jsonify({'error': 'Motorista não encontrado'}), 404
+            record_change('drivers', 'deleted', driver)
+        else:
+            driver = Driver.query.get_or_404(driver_id)
+            # Desconta do rollup de utilização as atribuições ativas e arquivadas,
+            # removidas a seguir pelo banco
+            discount_assignments(Assignment, Assignment.driver_id == driver_id)
+            discount_assignments(ArchivedAssignment, ArchivedAssignment.driver_id == driver_id)
+            # Remove as atribuições em um único DELETE, sem carregá-las na sessão
+            # (o ON DELETE CASCADE do banco cobre as demais remoções)
+            Assignment.query.filter_by(driver_id=driver_id).delete(synchronize_session=False)
+            db.session.delete(driver)
+            # Um único evento, com "cascade", indica também a remoção das atribuições:
+            # o custo não depende da quantidade de atribuições
+            record_change('drivers', 'deleted', dict(driver.to_dict(), cascade=True))
+        mark_changed('assignments')
+        invalidate_licenses('drivers', driver_id)
         db.session.commit()
         
-        current_app.logger.info(f"Driver with ID {driver_id} deleted successfully")
+        current_app.logger.info("Driver with ID %s deleted successfully", driver_id)
         return jsonify({"message": "Driver successfully deleted."}), 200
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Erro ao remover motorista {driver_id}: {str(e)}')
-        return jsonify({'error': 'Erro interno do servidor'}), 500 
\ No newline at end of file
+        current_app.logger.error('Erro ao remover motorista %s: %s', driver_id, e)
+        return jsonify({'error': 'Erro interno do servidor'}), 500 
+
+@drivers_bp.route('/bulk', methods=['POST'])
+@idempotent
+def create_drivers_bulk():
+    # Cria vários motoristas em uma única transação.
+    try:
+        items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+        if error:
+            current_app.logger.error(error)
+            return jsonify({'error': error}), 400
+
+        objects, errors = {}, {}
+        for index, item in enumerate(items):
+            if not item.get('name') or 'license_type' not in item:
+                errors[index] = 'Nome e tipo de carteira são obrigatórios'
+            elif item['license_type'] not in LICENSE_ORDER:
+                errors[index] = 'Tipo de carteira inválido'
+            else:
+                objects[index] = Driver(name=item['name'], license_type=item['license_type'])
+
+        current_app.logger.info("Bulk creating %s drivers (%s invalid)", len(objects), len(errors))
+        return commit_bulk('drivers', 'created', objects, errors, atomic, Driver.to_dict)
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error('Erro ao criar motoristas em lote: %s', e)
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@drivers_bp.route('/bulk', methods=['PUT'])
+@idempotent
+def update_drivers_bulk():
+    # Atualiza vários motoristas em uma única transação.
+    try:
+        items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+        if error:
+            current_app.logger.error(error)
+            return jsonify({'error': error}), 400
+
+        # Carrega todos os motoristas do lote e, para os que mudam de carteira,
+        # o nível exigido pelas suas atribuições: duas consultas para o lote inteiro
+        ids = {item.get('id') for item in items if isinstance(item.get('id'), int)}
+        drivers = {
+            driver.id: driver
+            for driver in Driver.query.filter(Driver.id.in_(ids), Driver.deleted_at.is_(None))
+        }
+        required = required_license_ranks(
+            item['id'] for item in items if 'license_type' in item and item.get('id') in drivers
+        )
+
+        objects, errors, seen = {}, {}, set()
+        for index, item in enumerate(items):
+            driver = drivers.get(item.get('id'))
+            license_type = item.get('license_type')
+            if driver is None:
+                errors[index] = 'Motorista não encontrado'
+            elif driver.id in seen:
+                errors[index] = 'Motorista repetido no lote'
+            elif 'name' in item and not item['name']:
+                errors[index] = 'Nome inválido'
+            elif 'license_type' in item and license_type not in LICENSE_ORDER:
+                errors[index] = 'Tipo de carteira inválido'
+            elif 'license_type' in item and LICENSE_ORDER[license_type] < required.get(driver.id, 0):
+                errors[index] = "The new license type is not compatible with the driver's assignments"
+            else:
+                seen.add(driver.id)
+                driver.name = item.get('name', driver.name)
+                if 'license_type' in item:
+                    driver.license_type = license_type
+                    invalidate_licenses('drivers', driver.id)
+                objects[index] = driver
+
+        current_app.logger.info("Bulk updating %s drivers (%s invalid)", len(objects), len(errors))
+        return commit_bulk('drivers', 'updated', objects, errors, atomic, Driver.to_dict)
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error('Erro ao atualizar motoristas em lote: %s', e)
+        return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -0,0 +1,100 @@
+import time
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from app import db
+from app.models import ChangeEvent
+from app.utils import events
+
+# Blueprint do feed de alterações em tempo real (Server-Sent Events)
+events_bp = Blueprint('events', __name__, url_prefix='/events')
+
+COLLECTIONS = ("drivers", "trucks", "assignments")
+
+def _replay_from_log(seq, limit):
+    # Alterações anteriores ao buffer em memória são lidas do change log, em lotes
+    rows = ChangeEvent.query.filter(ChangeEvent.id > seq).order_by(ChangeEvent.id).limit(limit).all()
+    items = [row.to_dict() for row in rows]
+    # Libera a conexão: o stream pode ficar aberto por muito tempo
+    db.session.close()
+    return items
+
+def _stream(seq, collections, config):
+    hub = events.event_hub
+    window = config["EVENTS_REORDER_WINDOW"]
+    heartbeat = config["EVENTS_HEARTBEAT_SECONDS"]
+    deadline = time.monotonic() + config["EVENTS_MAX_STREAM_SECONDS"]
+    # No PostgreSQL a sequência é atribuída no INSERT: uma transação pode confirmar
+    # uma sequência menor depois de outra já enviada. O assinante lê a partir de
+    # `seq`, mantida `window` sequências abaixo da maior enviada, e ignora as já
+    # enviadas acima dela
+    delivered = set()
+    # Intervalo de reconexão sugerido ao EventSource do navegador
+    yield "retry: 3000\n\n"
+    last_sent = time.monotonic()
+    while True:
+        version = hub.version
+        items, complete = hub.since(seq)
+        if not complete:
+            items = _replay_from_log(seq, config["EVENTS_BUFFER_SIZE"])
+        items = [item for item in items if item["id"] not in delivered]
+        for item in items:
+            delivered.add(item["id"])
+            if item["collection"] in collections:
+                yield events.format_event(item)
+                last_sent = time.monotonic()
+        if items:
+            seq = max(seq, max(delivered) - window)
+            delivered = {event_id for event_id in delivered if event_id > seq}
+        if not complete and items:
+            continue
+
+        # A conexão é encerrada periodicamente; o cliente reconecta com o Last-Event-ID
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if now - last_sent >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        # Acorda a cada publicação ou a cada intervalo de leitura do change log
+        timeout = min(config["EVENTS_POLL_SECONDS"], last_sent + heartbeat - now, deadline - now)
+        hub.wait(version, timeout)
+        hub.poll(config["EVENTS_POLL_SECONDS"], window)
+
+@events_bp.route('/', methods=['GET'])
+def get_events():
+    # Feed de alterações (criação, atualização e remoção) de motoristas, caminhões
+    # e atribuições. Retoma a partir do cabeçalho Last-Event-ID (ou ?last_event_id=)
+    # e pode ser filtrado por ?collections=drivers,trucks.
+    collections = set(COLLECTIONS)
+    if "collections" in request.args:
+        collections = {name.strip() for name in request.args["collections"].split(",") if name.strip()}
+        if not collections or not collections <= set(COLLECTIONS):
+            current_app.logger.error("Invalid collections parameter")
+            return jsonify({"error": "Invalid collections. Use drivers, trucks or assignments"}), 400
+
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    hub = events.event_hub
+    hub.ensure_started()
+    if last_event_id is None:
+        seq = hub.head
+    else:
+        try:
+            seq = int(last_event_id)
+        except ValueError:
+            current_app.logger.error("Invalid Last-Event-ID")
+            return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    # Limita os assinantes simultâneos para não esgotar os workers
+    if not hub.subscribe(current_app.config["EVENTS_MAX_SUBSCRIBERS"]):
+        current_app.logger.error("Too many event subscribers")
+        return jsonify({"error": "Too many subscribers. Retry later"}), 503
+
+    current_app.logger.info("Event subscriber connected from sequence %s", seq)
+    response = Response(
+        stream_with_context(_stream(seq, collections, current_app.config)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # A vaga é liberada quando o servidor fecha a resposta, mesmo que o stream não
+    # tenha começado (requisições HEAD, clientes desconectados antes do primeiro envio)
+    response.call_on_close(hub.unsubscribe)
+    return response
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from app import db
+from app.models import Driver, Truck, Assignment, ArchivedAssignment
+from app.utils.helpers import overlapping, parse_date_range, parse_flag
+
+# Blueprint para exportação em streaming (NDJSON ou CSV) das tabelas
+exports_bp = Blueprint('exports', __name__, url_prefix='/export')
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _format_value(value):
+    # Datas são exportadas no formato ISO (YYYY-MM-DD)
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def _stream_rows(statement, fields, fmt):
+    # Executa a consulta com cursor no servidor, lendo as linhas em lotes de
+    # EXPORT_BATCH_SIZE sem criar objetos ORM, e emite cada lote assim que lido.
+    # A memória usada não depende do tamanho da tabela.
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue()
+
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        if fmt == "csv":
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([[_format_value(value) for value in row] for row in rows])
+            yield buffer.getvalue()
+        else:
+            yield "".join(
+                json.dumps(dict(zip(fields, map(_format_value, row))), ensure_ascii=False) + "\n"
+                for row in rows
+            )
+
+def _export_response(name, statement, fields):
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        current_app.logger.error("Invalid export format")
+        return jsonify({"error": "Invalid format. Use ndjson or csv"}), 400
+
+    current_app.logger.info("Exporting %s as %s", name, fmt)
+    return Response(
+        stream_with_context(_stream_rows(statement, fields, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"},
+    )
+
+@exports_bp.route('/drivers', methods=['GET'])
+def export_drivers():
+    # Exporta todos os motoristas; os removidos logicamente, com ?include_deleted=true.
+    if parse_flag(request.args, "include_deleted"):
+        statement = db.select(Driver.id, Driver.name, Driver.license_type, Driver.deleted_at).order_by(Driver.id)
+        return _export_response("drivers", statement, ["id", "name", "license_type", "deleted_at"])
+    statement = (
+        db.select(Driver.id, Driver.name, Driver.license_type)
+        .where(Driver.deleted_at.is_(None))
+        .order_by(Driver.id)
+    )
+    return _export_response("drivers", statement, ["id", "name", "license_type"])
+
+@exports_bp.route('/trucks', methods=['GET'])
+def export_trucks():
+    # Exporta todos os caminhões; os removidos logicamente, com ?include_deleted=true.
+    if parse_flag(request.args, "include_deleted"):
+        statement = db.select(Truck.id, Truck.plate, Truck.min_license_type, Truck.deleted_at).order_by(Truck.id)
+        return _export_response("trucks", statement, ["id", "plate", "min_license_type", "deleted_at"])
+    statement = (
+        db.select(Truck.id, Truck.plate, Truck.min_license_type)
+        .where(Truck.deleted_at.is_(None))
+        .order_by(Truck.id)
+    )
+    return _export_response("trucks", statement, ["id", "plate", "min_license_type"])
+
+@exports_bp.route('/assignments', methods=['GET'])
+def export_assignments():
+    # Exporta as atribuições com os dados do motorista e do caminhão em colunas,
+    # opcionalmente limitadas às que tocam um intervalo de datas (?from=&to=) e incluindo as
+    # arquivadas (?include_archived=true).
+    date_from, date_to, error = parse_date_range(request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    def build_statement(model):
+        statement = (
+            db.select(
+                model.id,
+                model.date,
+                model.end_date,
+                model.driver_id,
+                Driver.name,
+                Driver.license_type,
+                model.truck_id,
+                Truck.plate,
+                Truck.min_license_type,
+            )
+            .join(Driver, model.driver_id == Driver.id)
+            .join(Truck, model.truck_id == Truck.id)
+        )
+        return statement.where(*overlapping(model, date_from, date_to))
+
+    if parse_flag(request.args, "include_archived"):
+        # Atribuições arquivadas e atuais em uma única consulta (UNION ALL)
+        combined = db.union_all(build_statement(ArchivedAssignment), build_statement(Assignment)).subquery()
+        statement = db.select(combined).order_by(combined.c.date, combined.c.id)
+    else:
+        statement = build_statement(Assignment).order_by(Assignment.date, Assignment.id)
+
+    fields = [
+        "id", "date", "end_date", "driver_id", "driver_name", "driver_license_type",
+        "truck_id", "truck_plate", "truck_min_license_type",
+    ]
+    return _export_response("assignments", statement, fields)
@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, current_app
+from app.utils.instrumentation import route_metrics
+from app.utils.license_cache import license_cache
+
+# Blueprint da rota de métricas (registrada apenas com SQL_INSTRUMENTATION ativo)
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+@metrics_bp.route('/', methods=['GET'])
+def get_metrics():
+    # Exporta latência e consultas por rota no formato texto do Prometheus.
+    body = route_metrics.render()
+    handler = current_app.extensions.get("log_handler")
+    if handler is not None:
+        body += (
+            "# HELP log_records_dropped_total Log records dropped because the log queue was full.\n"
+            "# TYPE log_records_dropped_total counter\n"
+            f"log_records_dropped_total {handler.dropped}\n"
+        )
+    stats = license_cache.stats()
+    body += (
+        "# HELP license_cache_hits_total License lookups served from the in-process cache.\n"
+        "# TYPE license_cache_hits_total counter\n"
+        f"license_cache_hits_total {stats['hits']}\n"
+        "# HELP license_cache_misses_total License lookups read from the database.\n"
+        "# TYPE license_cache_misses_total counter\n"
+        f"license_cache_misses_total {stats['misses']}\n"
+        "# HELP license_cache_entries Licenses currently cached.\n"
+        "# TYPE license_cache_entries gauge\n"
+        f"license_cache_entries {stats['entries']}\n"
+    )
+    return Response(body, mimetype="text/plain; version=0.0.4")
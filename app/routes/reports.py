@@ -0,0 +1,181 @@
+from datetime import timedelta
+from flask import Blueprint, request, jsonify, current_app
+from app import db
+from app.models import Driver, Truck, Assignment, ArchivedAssignment, LicenseUtilization
+from app.utils.cache import cached_response
+from app.utils.helpers import LICENSE_ORDER, overlapping, parse_date_range
+
+# Blueprint para os relatórios de utilização da frota
+reports_bp = Blueprint('reports', __name__, url_prefix='/reports')
+
+# Agrupamentos aceitos em ?period=
+REPORT_PERIODS = ("day", "week", "month")
+
+def _period_end(start, period):
+    # Último dia do período iniciado em `start`
+    if period == "week":
+        return start + timedelta(days=6)
+    if period == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start
+
+def _period_start(day, period):
+    # Início do período que contém o dia (semanas começam na segunda-feira)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+def _buckets(date_from, date_to, period):
+    # Períodos do intervalo: início do período -> (primeiro, último dia dentro do intervalo)
+    buckets = {}
+    day = date_from
+    while day <= date_to:
+        start = _period_start(day, period)
+        last = min(_period_end(start, period), date_to)
+        buckets[start] = (day, last)
+        day = last + timedelta(days=1)
+    return buckets
+
+def _parse_report_args(args):
+    # Intervalo obrigatório (limitado a REPORT_MAX_DAYS) e agrupamento
+    date_from, date_to, error = parse_date_range(args)
+    if not error and not (date_from and date_to):
+        error = "from and to are required"
+    if error:
+        return None, None, None, error
+    max_days = current_app.config["REPORT_MAX_DAYS"]
+    if (date_to - date_from).days + 1 > max_days:
+        return None, None, None, f"The range must cover at most {max_days} days"
+    period = args.get("period", "day")
+    if period not in REPORT_PERIODS:
+        return None, None, None, "Invalid period. Use day, week or month"
+    return date_from, date_to, period, None
+
+def _ratio(assigned, capacity):
+    return round(assigned / capacity, 4) if capacity else None
+
+def _bucket_dict(start, first, last):
+    return {
+        "period": start.isoformat(),
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "days": (last - first).days + 1,
+    }
+
+@reports_bp.route('/utilization', methods=['GET'])
+@cached_response('assignments', 'drivers', 'trucks')
+def get_license_utilization():
+    # Utilização por classe de carteira em cada período do intervalo (?from=&to=,
+    # ?period=day|week|month, ?license_type= opcional). Lida do rollup diário: no
+    # máximo uma linha por dia e classe, independentemente do volume de atribuições.
+    # A capacidade é a frota ativa atual de cada classe multiplicada pelos dias.
+    date_from, date_to, period, error = _parse_report_args(request.args)
+    license_type = request.args.get("license_type")
+    if not error and license_type is not None and license_type not in LICENSE_ORDER:
+        error = "Invalid license type"
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    current_app.logger.info("Building utilization report from %s to %s by %s", date_from, date_to, period)
+    licenses = [license_type] if license_type else list(LICENSE_ORDER)
+    statement = db.select(
+        LicenseUtilization.date, LicenseUtilization.license_type, LicenseUtilization.trucks, LicenseUtilization.drivers
+    ).where(
+        LicenseUtilization.date >= date_from,
+        LicenseUtilization.date <= date_to,
+        LicenseUtilization.license_type.in_(licenses),
+    )
+    totals = {}
+    for day, license, trucks, drivers in db.session.execute(statement):
+        total = totals.setdefault((_period_start(day, period), license), [0, 0])
+        total[0] += trucks
+        total[1] += drivers
+
+    # Frota ativa por classe: caminhões pela carteira mínima, motoristas pela carteira
+    truck_fleet = dict(db.session.execute(
+        db.select(Truck.min_license_type, db.func.count()).where(Truck.deleted_at.is_(None)).group_by(Truck.min_license_type)
+    ).all())
+    driver_fleet = dict(db.session.execute(
+        db.select(Driver.license_type, db.func.count()).where(Driver.deleted_at.is_(None)).group_by(Driver.license_type)
+    ).all())
+
+    items = []
+    for start, (first, last) in _buckets(date_from, date_to, period).items():
+        days = (last - first).days + 1
+        for license in licenses:
+            trucks, drivers = totals.get((start, license), (0, 0))
+            items.append({
+                **_bucket_dict(start, first, last),
+                "license_type": license,
+                "trucks": {
+                    "assigned": trucks,
+                    "fleet": truck_fleet.get(license, 0),
+                    "utilization": _ratio(trucks, truck_fleet.get(license, 0) * days),
+                },
+                "drivers": {
+                    "assigned": drivers,
+                    "fleet": driver_fleet.get(license, 0),
+                    "utilization": _ratio(drivers, driver_fleet.get(license, 0) * days),
+                },
+            })
+    return jsonify({"from": date_from.isoformat(), "to": date_to.isoformat(), "period": period, "items": items}), 200
+
+def _entity_utilization(name, entity, foreign_key, archived_key):
+    # Dias com atribuição de um motorista ou caminhão em cada período. Os períodos
+    # de uma mesma entidade não se sobrepõem, de modo que a leitura pelos índices
+    # (id, date) das tabelas ativa e de arquivo custa no máximo uma linha por dia.
+    date_from, date_to, period, error = _parse_report_args(request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    statement = db.union_all(
+        db.select(Assignment.date, Assignment.end_date).where(
+            foreign_key == entity.id, *overlapping(Assignment, date_from, date_to)
+        ),
+        db.select(ArchivedAssignment.date, ArchivedAssignment.end_date).where(
+            archived_key == entity.id, *overlapping(ArchivedAssignment, date_from, date_to)
+        ),
+    )
+    assigned = {}
+    for start, end in db.session.execute(statement):
+        # Conta os dias do período dentro do intervalo, em cada agrupamento que toca
+        day, end = max(start, date_from), min(end, date_to)
+        while day <= end:
+            bucket = _period_start(day, period)
+            last = min(_period_end(bucket, period), end)
+            assigned[bucket] = assigned.get(bucket, 0) + (last - day).days + 1
+            day = last + timedelta(days=1)
+
+    items = []
+    for start, (first, last) in _buckets(date_from, date_to, period).items():
+        item = _bucket_dict(start, first, last)
+        item["assigned"] = assigned.get(start, 0)
+        item["utilization"] = _ratio(item["assigned"], item["days"])
+        items.append(item)
+    return jsonify({
+        name: entity.to_dict(),
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "period": period,
+        "items": items,
+    }), 200
+
+@reports_bp.route('/utilization/trucks/<int:truck_id>', methods=['GET'])
+@cached_response('assignments', 'trucks')
+def get_truck_utilization(truck_id):
+    # Utilização de um caminhão (inclusive removido logicamente) em cada período.
+    truck = Truck.query.filter_by(id=truck_id).first_or_404()
+    current_app.logger.info("Building utilization report for truck %s", truck_id)
+    return _entity_utilization("truck", truck, Assignment.truck_id, ArchivedAssignment.truck_id)
+
+@reports_bp.route('/utilization/drivers/<int:driver_id>', methods=['GET'])
+@cached_response('assignments', 'drivers')
+def get_driver_utilization(driver_id):
+    # Utilização de um motorista (inclusive removido logicamente) em cada período.
+    driver = Driver.query.filter_by(id=driver_id).first_or_404()
+    current_app.logger.info("Building utilization report for driver %s", driver_id)
+    return _entity_utilization("driver", driver, Assignment.driver_id, ArchivedAssignment.driver_id)
@@ -0,0 +1,108 @@
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Driver, Truck, Assignment
+from app.utils.archive import ARCHIVED_DATE_ERROR, is_archived_date
+from app.utils.events import record_change
+from app.utils.helpers import overlapping, parse_date_range
+from app.utils.idempotency import idempotent
+from app.utils.scheduler import date_range, plan_schedule
+
+# Blueprint para o planejamento automático de escalas
+schedule_bp = Blueprint('schedule', __name__, url_prefix='/schedule')
+
+@schedule_bp.route('/', methods=['POST'])
+@idempotent
+def create_schedule():
+    # Planeja atribuições sem conflitos para cobrir os caminhões informados em
+    # todos os dias do intervalo. Por padrão apenas retorna o plano (dry_run);
+    # com "dry_run": false, grava as atribuições em uma única transação.
+    data = request.get_json(silent=True) or {}
+    date_from, date_to, error = parse_date_range(data)
+    if not error and not (date_from and date_to):
+        error = "from and to are required"
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    if is_archived_date(date_from):
+        current_app.logger.error(ARCHIVED_DATE_ERROR)
+        return jsonify({"error": ARCHIVED_DATE_ERROR}), 400
+
+    max_days = current_app.config["SCHEDULE_MAX_DAYS"]
+    if (date_to - date_from).days + 1 > max_days:
+        current_app.logger.error("Schedule range too long")
+        return jsonify({"error": f"The range must cover at most {max_days} days"}), 400
+
+    truck_ids = data.get("truck_ids")
+    driver_ids = data.get("driver_ids")
+    if any(ids is not None and not isinstance(ids, list) for ids in (truck_ids, driver_ids)):
+        current_app.logger.error("truck_ids and driver_ids must be lists")
+        return jsonify({"error": "truck_ids and driver_ids must be lists"}), 400
+    dry_run = data.get("dry_run", True) is not False
+
+    # Três consultas carregam todo o necessário: caminhões, motoristas e as
+    # atribuições já existentes no intervalo
+    # Motoristas e caminhões removidos logicamente ficam fora do plano
+    trucks_query = db.session.query(Truck.id, Truck.min_license_type).filter(Truck.deleted_at.is_(None))
+    if truck_ids is not None:
+        trucks_query = trucks_query.filter(Truck.id.in_(truck_ids))
+    drivers_query = db.session.query(Driver.id, Driver.license_type).filter(Driver.deleted_at.is_(None))
+    if driver_ids is not None:
+        drivers_query = drivers_query.filter(Driver.id.in_(driver_ids))
+    trucks = trucks_query.all()
+    drivers = drivers_query.all()
+
+    # Atribuições que tocam o intervalo ocupam cada um dos seus dias dentro dele
+    existing = db.session.query(
+        Assignment.driver_id, Assignment.truck_id, Assignment.date, Assignment.end_date
+    ).filter(*overlapping(Assignment, date_from, date_to))
+    busy_drivers, busy_trucks = set(), set()
+    for row in existing:
+        for day in date_range(max(row.date, date_from), min(row.end_date, date_to)):
+            busy_drivers.add((row.driver_id, day))
+            busy_trucks.add((row.truck_id, day))
+
+    plan, uncovered = plan_schedule(
+        date_range(date_from, date_to), trucks, drivers, busy_drivers, busy_trucks
+    )
+    current_app.logger.info(
+        "Schedule planned from %s to %s: %s assignments, %s uncovered (dry_run=%s)",
+        date_from, date_to, len(plan), len(uncovered), dry_run,
+    )
+
+    # As carteiras já lidas são registradas nas atribuições para o rollup de utilização
+    driver_licenses, truck_licenses = dict(drivers), dict(trucks)
+    assignments = [
+        Assignment(
+            driver_id=driver_id, truck_id=truck_id, date=day,
+            driver_license=driver_licenses[driver_id], truck_license=truck_licenses[truck_id],
+        )
+        for day, driver_id, truck_id in plan
+    ]
+    if not dry_run and assignments:
+        db.session.add_all(assignments)
+        try:
+            db.session.flush()
+            planned = [assignment.to_dict(expand=()) for assignment in assignments]
+            for assignment in assignments:
+                record_change("assignments", "created", assignment)
+            db.session.commit()
+        except IntegrityError:
+            # Outro despachante gravou atribuições no intervalo durante o planejamento
+            db.session.rollback()
+            current_app.logger.error("Schedule conflicts with concurrent changes")
+            return jsonify({"error": "The schedule conflicts with concurrent changes. Retry the request"}), 409
+    else:
+        planned = [
+            {"driver_id": driver_id, "truck_id": truck_id, "date": day.isoformat()}
+            for day, driver_id, truck_id in plan
+        ]
+
+    return jsonify({
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "dry_run": dry_run,
+        "assignments": planned,
+        "uncovered": [{"truck_id": truck_id, "date": day.isoformat()} for day, truck_id in uncovered],
+    }), 200 if dry_run else 201
@@ -1,36 +1,84 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, abort
 from app import db
-from app.models import Truck
-from app.utils.helpers import LICENSE_ORDER, validate_assignments
+from app.models import Truck, Assignment, ArchivedAssignment
+from app.models.truck import TRUCK_SEARCH_INDEX
+from app.utils.bulk import parse_bulk_request, commit_bulk
+from app.utils.cache import cached_response, mark_changed
+from app.utils.events import record_change
+from app.utils.helpers import LICENSE_ORDER, validate_assignments, assigned_license_ranks, parse_flag, soft_delete
+from app.utils.idempotency import idempotent
+from app.utils.license_cache import invalidate_licenses
+from app.utils.pagination import parse_page_args, keyset_page, page_body
+from app.utils.rollups import discount_assignments
+from app.utils.search import search_cursor, search_page
 
 # Blueprint para agrupar todas as rotas relacionadas a caminhões
 trucks_bp = Blueprint('trucks', __name__, url_prefix='/trucks')
 
 @trucks_bp.route('/', methods=['GET'])
+@cached_response('trucks')
 def get_trucks():
     # Lista todos os caminhões cadastrados.
     current_app.logger.info("Fetching all trucks")
     try:
-        trucks = Truck.query.all()
+        # Busca parcial por placa (?plate=), ordenada por relevância e sempre
+        # paginada; o cursor passa a ser a posição na ordem da busca
+        term = request.args.get('plate', '').strip()
+        paginated, limit, after, error = parse_page_args(
+            request.args, cursor_types=(int, str, int) if term else (int,)
+        )
+        min_license_type = request.args.get('min_license_type')
+        if not error and min_license_type is not None and min_license_type not in LICENSE_ORDER:
+            error = 'Tipo de carteira inválido'
+        if error:
+            current_app.logger.error(error)
+            return jsonify({'error': error}), 400
+
+        # Caminhões removidos logicamente aparecem apenas com ?include_deleted=true
+        # As linhas são serializadas direto do select(), sem instanciar o modelo
+        statement = db.select(*Truck.columns())
+        if not parse_flag(request.args, 'include_deleted'):
+            statement = statement.where(Truck.deleted_at.is_(None))
+        if min_license_type:
+            statement = statement.where(Truck.min_license_type == min_license_type)
+
+        if term:
+            trucks, has_more = search_page(
+                statement, Truck, Truck.plate, TRUCK_SEARCH_INDEX, term, after, limit or current_app.config['DEFAULT_PAGE_SIZE']
+            )
+            current_app.logger.info('Caminhões recuperados com sucesso')
+            return jsonify(page_body(trucks, has_more, search_cursor, Truck.serialize)), 200
+
+        if paginated:
+            # Paginação por cursor ordenada pela chave primária
+            trucks, has_more = keyset_page(statement, [Truck.id], after, limit)
+            current_app.logger.info('Caminhões recuperados com sucesso')
+            return jsonify(page_body(trucks, has_more, lambda t: [t.id], Truck.serialize)), 200
+
+        trucks = db.session.execute(statement).all()
         current_app.logger.info('Caminhões recuperados com sucesso')
-        return jsonify([truck.to_dict() for truck in trucks]), 200
+        return jsonify([Truck.serialize(row) for row in trucks]), 200
     except Exception as e:
-        current_app.logger.error(f'Erro ao recuperar caminhões: {str(e)}')
+        current_app.logger.error('Erro ao recuperar caminhões: %s', e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @trucks_bp.route('/<int:truck_id>', methods=['GET'])
+@cached_response('trucks')
 def get_truck(truck_id):
     # Recupera os dados de um caminhão específico.
-    current_app.logger.info(f"Fetching truck with ID {truck_id}")
+    current_app.logger.info("Fetching truck with ID %s", truck_id)
     try:
         truck = Truck.query.get_or_404(truck_id)
-        current_app.logger.info(f'Caminhão {truck_id} recuperado com sucesso')
+        if truck.deleted_at is not None and not parse_flag(request.args, 'include_deleted'):
+            return jsonify({'error': 'Caminhão não encontrado'}), 404
+        current_app.logger.info('Caminhão %s recuperado com sucesso', truck_id)
         return jsonify(truck.to_dict()), 200
     except Exception as e:
-        current_app.logger.error(f'Erro ao recuperar caminhão {truck_id}: {str(e)}')
+        current_app.logger.error('Erro ao recuperar caminhão %s: %s', truck_id, e)
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @trucks_bp.route('/', methods=['POST'])
+@idempotent
 def create_truck():
     # Cria um novo caminhão.
     data = request.get_json()
@@ -49,16 +97,18 @@ def create_truck():
 
     truck = Truck(plate=plate, min_license_type=min_license_type)
     db.session.add(truck)
+    record_change("trucks", "created", truck)
     db.session.commit()
-    current_app.logger.info(f"Truck created with ID {truck.id}")
+    current_app.logger.info("Truck created with ID %s", truck.id)
     return jsonify(truck.to_dict()), 201
 
 @trucks_bp.route('/<int:truck_id>', methods=['PUT'])
+@idempotent
 def update_truck(truck_id):
     # Atualiza os dados de um caminhão existente.
     
-    current_app.logger.info(f"Updating truck with ID {truck_id}")
-    truck = Truck.query.get_or_404(truck_id)
+    current_app.logger.info("Updating truck with ID %s", truck_id)
+    truck = Truck.query.filter_by(id=truck_id, deleted_at=None).first_or_404()
     data = request.get_json()
     plate = data.get("plate")
     min_license_type = data.get("min_license_type")
@@ -75,25 +125,123 @@ def update_truck(truck_id):
             current_app.logger.error("Invalid min_license_type")
             return jsonify({"error": "Invalid min_license_type"}), 400
         truck.min_license_type = min_license_type
+        invalidate_licenses("trucks", truck.id)
 
-    db.session.commit()
+        # Valida, antes do commit, apenas as atribuições deste caminhão
+        valid, message = validate_assignments(truck_id=truck.id)
+        if not valid:
+            db.session.rollback()
+            current_app.logger.error("Assignment validation failed: %s", message)
+            return jsonify({"error": message}), 400
 
-    # Valida as atribuições após a atualização do caminhão
-    valid, message = validate_assignments()
-    if not valid:
-        db.session.rollback()
-        current_app.logger.error(f"Assignment validation failed: {message}")
-        return jsonify({"error": message}), 400
+    record_change("trucks", "updated", truck)
+    db.session.commit()
 
-    current_app.logger.info(f"Truck with ID {truck.id} updated successfully")
+    current_app.logger.info("Truck with ID %s updated successfully", truck.id)
     return jsonify(truck.to_dict())
 
 @trucks_bp.route('/<int:truck_id>', methods=['DELETE'])
 def delete_truck(truck_id):
     # Remove um caminhão do sistema.
-    current_app.logger.info(f"Deleting truck with ID {truck_id}")
-    truck = Truck.query.get_or_404(truck_id)
-    db.session.delete(truck)
+    current_app.logger.info("Deleting truck with ID %s", truck_id)
+    if parse_flag(request.args, "soft"):
+        # Remoção lógica: mantém o histórico e libera as atribuições futuras
+        truck = soft_delete(Truck, truck_id, Assignment.truck_id)
+        if truck is None:
+            abort(404)
+        record_change("trucks", "deleted", truck)
+    else:
+        truck = Truck.query.get_or_404(truck_id)
+        # Desconta do rollup de utilização as atribuições ativas e arquivadas,
+        # removidas a seguir pelo banco
+        discount_assignments(Assignment, Assignment.truck_id == truck_id)
+        discount_assignments(ArchivedAssignment, ArchivedAssignment.truck_id == truck_id)
+        # Remove as atribuições em um único DELETE, sem carregá-las na sessão
+        # (o ON DELETE CASCADE do banco cobre as demais remoções)
+        Assignment.query.filter_by(truck_id=truck_id).delete(synchronize_session=False)
+        db.session.delete(truck)
+        # Um único evento, com "cascade", indica também a remoção das atribuições:
+        # o custo não depende da quantidade de atribuições
+        record_change("trucks", "deleted", dict(truck.to_dict(), cascade=True))
+    mark_changed("assignments")
+    invalidate_licenses("trucks", truck_id)
     db.session.commit()
-    current_app.logger.info(f"Truck with ID {truck_id} deleted successfully")
-    return jsonify({"message": "Truck successfully deleted."}) 
\ No newline at end of file
+    current_app.logger.info("Truck with ID %s deleted successfully", truck_id)
+    return jsonify({"message": "Truck successfully deleted."}) 
+
+@trucks_bp.route('/bulk', methods=['POST'])
+@idempotent
+def create_trucks_bulk():
+    # Cria vários caminhões em uma única transação.
+    items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    # Placas já cadastradas, verificadas em uma única consulta para o lote inteiro
+    plates = {item.get("plate") for item in items if item.get("plate")}
+    taken = {plate for (plate,) in db.session.query(Truck.plate).filter(Truck.plate.in_(plates))}
+
+    objects, errors = {}, {}
+    for index, item in enumerate(items):
+        plate = item.get("plate")
+        min_license_type = item.get("min_license_type")
+        if not plate or not min_license_type or min_license_type not in LICENSE_ORDER:
+            errors[index] = "Invalid data for the truck"
+        elif plate in taken:
+            errors[index] = "A truck with this plate already exists"
+        else:
+            # Placas repetidas dentro do lote: apenas a primeira ocorrência é aceita
+            taken.add(plate)
+            objects[index] = Truck(plate=plate, min_license_type=min_license_type)
+
+    current_app.logger.info("Bulk creating %s trucks (%s invalid)", len(objects), len(errors))
+    return commit_bulk("trucks", "created", objects, errors, atomic, Truck.to_dict)
+
+@trucks_bp.route('/bulk', methods=['PUT'])
+@idempotent
+def update_trucks_bulk():
+    # Atualiza vários caminhões em uma única transação.
+    items, atomic, error = parse_bulk_request(request.get_json(silent=True), request.args)
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": error}), 400
+
+    # Caminhões do lote, donos atuais das novas placas e o nível de carteira dos
+    # motoristas já atribuídos: três consultas para o lote inteiro
+    ids = {item.get("id") for item in items if isinstance(item.get("id"), int)}
+    trucks = {truck.id: truck for truck in Truck.query.filter(Truck.id.in_(ids), Truck.deleted_at.is_(None))}
+    plates = {item.get("plate") for item in items if item.get("plate")}
+    owners = dict(db.session.query(Truck.plate, Truck.id).filter(Truck.plate.in_(plates)))
+    allowed = assigned_license_ranks(
+        item["id"] for item in items if item.get("min_license_type") and item.get("id") in trucks
+    )
+
+    objects, errors, seen = {}, {}, set()
+    for index, item in enumerate(items):
+        truck = trucks.get(item.get("id"))
+        plate = item.get("plate")
+        min_license_type = item.get("min_license_type")
+        if truck is None:
+            errors[index] = "Truck not found"
+        elif truck.id in seen:
+            errors[index] = "Truck repeated in the batch"
+        elif plate and owners.get(plate, truck.id) != truck.id:
+            errors[index] = "A truck with this plate already exists"
+        elif min_license_type and min_license_type not in LICENSE_ORDER:
+            errors[index] = "Invalid min_license_type"
+        elif min_license_type and LICENSE_ORDER[min_license_type] > allowed.get(truck.id, len(LICENSE_ORDER)):
+            errors[index] = "The new min_license_type is not compatible with the truck's assignments"
+        else:
+            seen.add(truck.id)
+            if plate:
+                owners.pop(truck.plate, None)
+                owners[plate] = truck.id
+                truck.plate = plate
+            if min_license_type:
+                truck.min_license_type = min_license_type
+                invalidate_licenses("trucks", truck.id)
+            objects[index] = truck
+
+    current_app.logger.info("Bulk updating %s trucks (%s invalid)", len(objects), len(errors))
+    return commit_bulk("trucks", "updated", objects, errors, atomic, Truck.to_dict)
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, insert, literal
+from app import db
+from app.models import Assignment, ArchivedAssignment, ArchiveRun
+from app.utils.cache import mark_changed
+
+# Mensagem das escritas recusadas em datas já arquivadas
+ARCHIVED_DATE_ERROR = "The date is archived and read-only"
+
+def archive_cutoff(horizon_days):
+    """
+    Data de corte do arquivamento: atribuições anteriores a ela são arquivadas.
+
+    Exemplo:
+        >>> archive_cutoff(365)  # em 2025-04-03
+        datetime.date(2024, 4, 3)
+    """
+    return date.today() - timedelta(days=horizon_days)
+
+def archive_assignments(cutoff, batch_size):
+    """
+    Move para assignment_archive as atribuições encerradas antes de `cutoff`, em lotes.
+
+    O registro da execução e a movimentação ocorrem em uma única transação: uma
+    falha desfaz tudo, sem deixar uma execução registrada sem as atribuições
+    movidas, e as escritas em datas anteriores ao corte passam a ser recusadas
+    apenas com o arquivamento confirmado. Cada lote é copiado e removido com um
+    INSERT ... SELECT e um DELETE, o que limita o tamanho de cada comando.
+
+    Args:
+        cutoff (date): Data de corte (exclusiva)
+        batch_size (int): Quantidade de atribuições movidas por comando
+
+    Returns:
+        ArchiveRun: Execução registrada, com a quantidade de atribuições arquivadas
+    """
+    run = ArchiveRun(cutoff=cutoff, archived=0)
+    db.session.add(run)
+    archived_at = datetime.utcnow()
+    try:
+        while True:
+            # Lê o próximo lote pelo índice de date; períodos que terminam a partir
+            # do corte continuam ativos. No PostgreSQL as linhas ficam bloqueadas
+            # até o commit, sem alterações concorrentes entre a cópia e a remoção
+            ids = [
+                assignment_id
+                for (assignment_id,) in db.session.query(Assignment.id)
+                .filter(Assignment.date < cutoff, Assignment.end_date < cutoff)
+                .order_by(Assignment.date, Assignment.id)
+                .limit(batch_size)
+                .with_for_update()
+            ]
+            if not ids:
+                break
+            columns = db.select(
+                Assignment.id, Assignment.driver_id, Assignment.truck_id, Assignment.date, Assignment.end_date,
+                Assignment.driver_license, Assignment.truck_license, literal(archived_at),
+            ).where(Assignment.id.in_(ids))
+            db.session.execute(insert(ArchivedAssignment).from_select(
+                ["id", "driver_id", "truck_id", "date", "end_date", "driver_license", "truck_license", "archived_at"],
+                columns,
+            ))
+            db.session.execute(delete(Assignment).where(Assignment.id.in_(ids)))
+            run.archived += len(ids)
+        if run.archived:
+            mark_changed("assignments")
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return run
+
+def archived_before():
+    """
+    Retorna o limite das datas arquivadas (somente leitura), ou None se o
+    arquivamento nunca foi executado.
+    """
+    return db.session.query(db.func.max(ArchiveRun.cutoff)).scalar()
+
+def is_archived_date(day):
+    """
+    Verifica se uma data já foi arquivada e, portanto, não aceita escritas.
+
+    Datas a partir de hoje nunca são arquivadas e são respondidas sem consultar
+    o banco; datas passadas exigem uma leitura do limite de arquivamento.
+    """
+    if day >= date.today():
+        return False
+    limit = archived_before()
+    return limit is not None and day < limit
+
+def writes_archived_dates(limit, start, end, original_start=None):
+    """
+    Verifica se uma atribuição com o período [start, end] escreveria em datas
+    arquivadas, dado o limite do arquivamento (archived_before()).
+
+    Uma nova atribuição, ou uma cujo início foi alterado, não pode começar antes
+    do limite. Uma atribuição existente que já começava antes dele (em andamento
+    quando o arquivamento foi executado) pode ser alterada mantendo o início,
+    desde que o período não termine antes do limite.
+
+    Exemplo:
+        >>> writes_archived_dates(date(2024, 1, 1), date(2023, 12, 20), date(2024, 1, 5), date(2023, 12, 20))
+        False
+    """
+    if limit is None:
+        return False
+    if original_start is None or start != original_start:
+        return start < limit
+    return end < limit
+
+def archive_limit_for(days):
+    """
+    Limite das datas arquivadas para validar um lote de datas, ou None quando
+    nenhuma delas é passada (sem consulta ao banco) ou nada foi arquivado.
+    """
+    today = date.today()
+    if all(day >= today for day in days):
+        return None
+    return archived_before()
@@ -0,0 +1,86 @@
+from flask import current_app, jsonify
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.utils.events import record_change
+
+# Modos das rotas em lote:
+# - atomic: tudo ou nada; qualquer item inválido cancela o lote inteiro
+# - partial: grava os itens válidos e reporta os inválidos
+BULK_MODES = ("atomic", "partial")
+
+def parse_bulk_request(data, args):
+    """
+    Lê o corpo de uma requisição em lote.
+
+    Aceita uma lista de itens ou um objeto {"items": [...], "mode": "..."}.
+    O modo também pode ser informado por ?mode= (padrão "atomic").
+
+    Args:
+        data: Corpo JSON da requisição
+        args (MultiDict): Parâmetros da query string (request.args)
+
+    Returns:
+        tuple: (itens, atomic, erro) - erro é uma mensagem quando o corpo for inválido
+    """
+    mode = args.get("mode", "atomic")
+    items = data
+    if isinstance(data, dict):
+        items = data.get("items")
+        mode = data.get("mode", mode)
+
+    if mode not in BULK_MODES:
+        return None, None, "Invalid mode. Use atomic or partial"
+    if not isinstance(items, list) or not items:
+        return None, None, "A non-empty list of items is required"
+
+    max_items = current_app.config["BULK_MAX_ITEMS"]
+    if len(items) > max_items:
+        return None, None, f"A batch accepts at most {max_items} items"
+    if not all(isinstance(item, dict) for item in items):
+        return None, None, "Every item must be an object"
+    return items, mode == "atomic", None
+
+def commit_bulk(collection, action, objects, errors, atomic, serialize):
+    """
+    Grava os itens válidos de um lote em uma única transação e monta a resposta.
+
+    Args:
+        collection (str): Coleção alterada ("drivers", "trucks" ou "assignments")
+        action (str): "created" ou "updated"
+        objects (dict): Índice do item -> objeto do modelo (novo ou alterado), apenas
+                        para os itens válidos
+        errors (dict): Índice do item -> mensagem de erro
+        atomic (bool): Se o lote é tudo ou nada
+        serialize (callable): Converte um objeto gravado em dicionário
+
+    Returns:
+        tuple: (resposta JSON, status HTTP)
+    """
+    # Cada item gravado retorna 201 na criação e 200 na atualização
+    success_status = 201 if action == "created" else 200
+    if errors and (atomic or not objects):
+        db.session.rollback()
+        results = [
+            {"index": index, "status": 400, "error": message}
+            for index, message in sorted(errors.items())
+        ]
+        return jsonify({"mode": "atomic" if atomic else "partial", "saved": 0, "results": results}), 400
+
+    try:
+        # O flush atribui os IDs; a serialização antes do commit evita recarregar cada objeto
+        db.session.add_all(objects.values())
+        db.session.flush()
+        saved = {index: serialize(obj) for index, obj in objects.items()}
+        for obj in objects.values():
+            record_change(collection, action, obj)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        current_app.logger.error("Bulk write conflicted with concurrent changes: %s", e.orig)
+        return jsonify({"error": "The batch conflicts with concurrent changes. Retry the request"}), 409
+
+    results = [{"index": index, "status": success_status, "data": data} for index, data in saved.items()]
+    results += [{"index": index, "status": 400, "error": message} for index, message in errors.items()]
+    results.sort(key=lambda result: result["index"])
+    status = 207 if errors else success_status
+    return jsonify({"mode": "atomic" if atomic else "partial", "saved": len(saved), "results": results}), status
@@ -0,0 +1,184 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import event, select
+from app import db
+from app.models import CacheGeneration
+from app.utils.compression import CONTENT_CODINGS, etag_for
+from app.utils.database import upsert
+
+# Prefixo dos contadores de geração (tabela cache_generation) das coleções
+GENERATION_PREFIX = "collections."
+
+def collection_versions(collections):
+    """
+    Versões das coleções, lidas dos contadores de geração compartilhados por
+    todos os processos (uma consulta pela chave primária).
+
+    As versões fazem parte das chaves do cache e das ETags: uma escrita confirmada
+    em qualquer processo torna inalcançáveis todas as respostas que dependem da
+    coleção alterada.
+
+    Args:
+        collections (tuple): Nomes das coleções
+
+    Returns:
+        tuple: Versão de cada coleção, na mesma ordem (0 se nunca alterada)
+    """
+    table = CacheGeneration.__table__
+    names = [GENERATION_PREFIX + name for name in collections]
+    found = dict(db.session.execute(
+        select(table.c.name, table.c.generation).where(table.c.name.in_(names))
+    ).all())
+    return tuple(found.get(name, 0) for name in names)
+
+class ResponseCache:
+    """
+    Cache LRU em memória das respostas serializadas, com tamanho limitado.
+
+    Cada entrada guarda o corpo já codificado, o status e as coleções das quais
+    depende, para que possa ser descartada quando uma delas for alterada. As
+    variantes comprimidas do corpo (gzip, br) são acrescentadas à entrada pela
+    compressão das respostas na primeira vez em que são pedidas.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collections):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry["depends"] & collections]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Cache de respostas do processo
+response_cache = ResponseCache(max_entries=0)
+
+def mark_changed(*collections):
+    """
+    Marca coleções como alteradas na transação atual.
+
+    As versões são incrementadas no commit, na mesma transação, e as respostas
+    do processo que dependem das coleções são descartadas após o commit; em caso
+    de rollback a marcação é descartada.
+
+    Args:
+        *collections (str): Nomes das coleções ("drivers", "trucks", "assignments")
+    """
+    db.session.info.setdefault("changed_collections", set()).update(collections)
+
+def _before_commit(session):
+    changed = session.info.get("changed_collections")
+    if not changed or response_cache.max_entries <= 0:
+        return
+    # Um único comando para todas as coleções, em ordem fixa (as transações
+    # concorrentes bloqueiam as linhas na mesma ordem)
+    table = CacheGeneration.__table__
+    statement = upsert(session, table).values([
+        {"name": GENERATION_PREFIX + name, "generation": 1} for name in sorted(changed)
+    ])
+    session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.name], set_={"generation": table.c.generation + 1}
+    ))
+
+def _after_commit(session):
+    changed = session.info.pop("changed_collections", None)
+    if changed:
+        response_cache.invalidate(changed)
+
+def _after_rollback(session):
+    session.info.pop("changed_collections", None)
+
+def cached_response(*collections):
+    """
+    Decorador para rotas GET com ETag forte, respostas 304 e cache das respostas.
+
+    A chave do cache é a URL (caminho e parâmetros) e as versões das coleções das
+    quais a resposta depende, lidas do banco a cada requisição. Com If-None-Match
+    igual à ETag atual, a resposta 304 é devolvida apenas com essa leitura, sem
+    executar a consulta da rota nem serializar JSON; em um acerto no cache, o
+    corpo já serializado é reutilizado.
+
+    Args:
+        *collections (str): Coleções cujo conteúdo aparece na resposta
+    """
+    depends = frozenset(collections)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if response_cache.max_entries <= 0:
+                return view(*args, **kwargs)
+
+            current = collection_versions(collections)
+            key = (request.path, tuple(sorted(request.args.items(multi=True))), current)
+            digest = hashlib.sha1(repr(key).encode()).hexdigest()
+            etag = digest[:32]
+
+            # A ETag de uma representação comprimida tem o sufixo da codificação
+            for candidate in (etag, *(etag_for(etag, coding) for coding in CONTENT_CODINGS)):
+                if request.if_none_match.contains(candidate):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(candidate)
+                    response.vary.add("Accept-Encoding")
+                    return response
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                response = current_app.response_class(entry["body"], status=entry["status"], mimetype=entry["mimetype"])
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = {
+                    "body": response.get_data(),
+                    "status": response.status_code,
+                    "mimetype": response.mimetype,
+                    "depends": depends,
+                }
+                response_cache.set(key, entry)
+            # Permite que a compressão reutilize (e guarde) as variantes da entrada
+            response.cache_entry = entry
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+def init_cache(app):
+    """
+    Configura o cache de respostas (RESPONSE_CACHE_SIZE entradas; 0 desativa o
+    cache e as ETags) e a atualização das versões em cada commit.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    response_cache.max_entries = app.config["RESPONSE_CACHE_SIZE"]
+    response_cache.clear()
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
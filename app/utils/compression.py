@@ -0,0 +1,123 @@
+import gzip
+import zlib
+from flask import request
+
+# Dependência opcional: sem o pacote brotli, apenas gzip é oferecido
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+# Codificações suportadas, em ordem de preferência quando o cliente aceita ambas
+CONTENT_CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Tipos de conteúdo comprimidos; o feed SSE (text/event-stream) fica de fora para
+# que cada evento chegue ao cliente assim que publicado
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+
+def compress(data, coding, level):
+    """
+    Comprime um corpo completo na codificação informada ("br" ou "gzip").
+
+    Args:
+        data (bytes): Corpo da resposta
+        coding (str): Codificação negociada
+        level (dict): Níveis de compressão (COMPRESSION_GZIP_LEVEL e COMPRESSION_BROTLI_QUALITY)
+    """
+    if coding == "br":
+        return brotli.compress(data, quality=level["br"])
+    return gzip.compress(data, compresslevel=level["gzip"], mtime=0)
+
+def compress_stream(chunks, coding, level):
+    """
+    Comprime uma resposta em streaming de forma incremental.
+
+    Cada bloco recebido é comprimido e descarregado (flush) em seguida, de modo
+    que o cliente recebe os dados à medida que são gerados, sem acumular a
+    resposta inteira em memória.
+    """
+    try:
+        if coding == "br":
+            compressor = brotli.Compressor(quality=level["br"])
+            for chunk in chunks:
+                data = compressor.process(chunk.encode() if isinstance(chunk, str) else chunk)
+                data += compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            # wbits=31: formato gzip (cabeçalho e CRC) sobre o deflate
+            compressor = zlib.compressobj(level["gzip"], zlib.DEFLATED, 31)
+            for chunk in chunks:
+                data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+                data += compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+    finally:
+        # Encerra o gerador original (ex.: stream_with_context) se o cliente desconectar
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+def etag_for(etag, coding):
+    # ETag forte da representação comprimida, distinta da versão sem compressão
+    return f"{etag}-{coding}"
+
+def _make_compress_response(app):
+    min_size = app.config["COMPRESSION_MIN_SIZE"]
+    level = {"gzip": app.config["COMPRESSION_GZIP_LEVEL"], "br": app.config["COMPRESSION_BROTLI_QUALITY"]}
+
+    def _compress_response(response):
+        if (
+            response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        # A representação depende de Accept-Encoding, mesmo quando não comprimida
+        response.vary.add("Accept-Encoding")
+        coding = request.accept_encodings.best_match(CONTENT_CODINGS)
+        if coding is None:
+            return response
+
+        if response.is_streamed:
+            # Tamanho desconhecido: comprime sempre, bloco a bloco
+            response.response = compress_stream(response.response, coding, level)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            # Respostas do cache (cached_response) guardam cada variante comprimida,
+            # de modo que a compressão é feita uma única vez por versão do conteúdo
+            entry = getattr(response, "cache_entry", None)
+            variants = entry.setdefault("encoded", {}) if entry is not None else {}
+            if coding not in variants:
+                variants[coding] = compress(body, coding, level)
+            response.set_data(variants[coding])
+
+        response.headers["Content-Encoding"] = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag_for(etag, coding), weak=weak)
+        return response
+
+    return _compress_response
+
+def init_compression(app):
+    """
+    Ativa a compressão das respostas (gzip e, se instalado, brotli), quando
+    COMPRESSION_ENABLED estiver ligado.
+
+    - Negocia a codificação pelo cabeçalho Accept-Encoding e adiciona Vary
+    - Ignora corpos menores que COMPRESSION_MIN_SIZE bytes
+    - Comprime exportações em streaming de forma incremental
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    if app.config["COMPRESSION_ENABLED"]:
+        app.after_request(_make_compress_response(app))
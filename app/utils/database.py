@@ -0,0 +1,52 @@
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+def _make_apply_pragmas(pragmas):
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return _apply_pragmas
+
+def init_database(app):
+    """
+    Aplica os PRAGMAs de SQLITE_PRAGMAS a cada conexão aberta pelo engine.
+
+    journal_mode=WAL fica gravado no arquivo do banco, mas foreign_keys,
+    synchronous, busy_timeout, mmap_size e cache_size valem apenas para a conexão
+    e por isso são aplicados no evento "connect". Sem efeito em outros bancos.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _make_apply_pragmas(pragmas))
+
+def upsert(session, table):
+    """
+    INSERT da tabela no dialeto do banco da sessão, com on_conflict_do_update()
+    e on_conflict_do_nothing() (INSERT ... ON CONFLICT, no SQLite e no
+    PostgreSQL).
+
+    Insere ou atualiza as linhas em um único comando: transações concorrentes
+    não disputam a inserção da mesma chave, como em um UPDATE seguido de INSERT.
+
+    Args:
+        session: Sessão onde o comando será executado
+        table (Table): Tabela de destino
+
+    Returns:
+        Insert: Comando a completar com values() e on_conflict_do_update()
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
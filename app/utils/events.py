@@ -0,0 +1,228 @@
+import json
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, select
+from app import db
+from app.models import Assignment, ChangeEvent
+from app.utils.cache import mark_changed
+
+class EventHub:
+    """
+    Buffer circular em memória das últimas alterações, compartilhado pelos assinantes de /events.
+
+    Os assinantes aguardam novas alterações em uma única Condition, sem consultar o
+    banco. Alterações mais antigas que o buffer, ou gravadas por outros processos,
+    são lidas do change log persistido (tabela change_event).
+    """
+
+    def __init__(self, size):
+        self._cond = threading.Condition()
+        self._poll_lock = threading.Lock()
+        self.reset(size)
+
+    def reset(self, size):
+        with self._cond:
+            self._events = deque(maxlen=size)
+            self._ids = set()
+            self._last_poll = 0.0
+            # Incrementado a cada publicação: acorda os assinantes também quando chega
+            # uma alteração com sequência menor que a maior já conhecida
+            self.version = 0
+            # Maior sequência conhecida e limite a partir do qual o buffer está completo
+            self.head = None
+            self.floor = None
+            self.subscribers = 0
+
+    def ensure_started(self):
+        # Inicializa a sequência a partir do change log (uma única vez por processo)
+        if self.head is None:
+            latest = db.session.query(db.func.max(ChangeEvent.id)).scalar() or 0
+            db.session.close()
+            with self._cond:
+                if self.head is None:
+                    self.head = self.floor = latest
+
+    def publish(self, events):
+        with self._cond:
+            for item in sorted(events, key=lambda e: e["id"]):
+                if item["id"] in self._ids or (self.floor is not None and item["id"] <= self.floor):
+                    continue
+                if len(self._events) == self._events.maxlen:
+                    dropped = self._events.popleft()
+                    self._ids.discard(dropped["id"])
+                    self.floor = dropped["id"]
+                # Commits concorrentes podem publicar fora de ordem; o buffer permanece ordenado
+                position = len(self._events)
+                while position and self._events[position - 1]["id"] > item["id"]:
+                    position -= 1
+                self._events.insert(position, item)
+                self._ids.add(item["id"])
+                self.head = max(self.head or 0, item["id"])
+            self.version += 1
+            self._cond.notify_all()
+
+    def subscribe(self, limit):
+        # Reserva uma vaga de assinante; False quando o limite foi atingido
+        with self._cond:
+            if self.subscribers >= limit:
+                return False
+            self.subscribers += 1
+            return True
+
+    def unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+
+    def since(self, seq):
+        """
+        Retorna as alterações do buffer posteriores a `seq`.
+
+        Returns:
+            tuple: (alterações, completo) - completo é False quando o buffer não
+                   cobre mais a sequência e o change log deve ser consultado
+        """
+        with self._cond:
+            if self.floor is None or seq < self.floor:
+                return [], False
+            return [item for item in self._events if item["id"] > seq], True
+
+    def wait(self, version, timeout):
+        # Bloqueia até uma publicação posterior a `version` ou o tempo esgotar
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+
+    def poll(self, interval, overlap):
+        # Lê do change log as alterações gravadas por outros processos, no máximo
+        # uma vez por intervalo para todo o processo (e não por assinante). As
+        # últimas `overlap` sequências são lidas novamente: no PostgreSQL a
+        # sequência é atribuída no INSERT, e uma transação pode confirmar uma
+        # sequência menor depois de outra já publicada
+        with self._poll_lock:
+            if time.monotonic() - self._last_poll < interval:
+                return
+            self._last_poll = time.monotonic()
+        rows = (
+            ChangeEvent.query.filter(ChangeEvent.id > max((self.head or 0) - overlap, 0))
+            .order_by(ChangeEvent.id)
+            .limit(self._events.maxlen)
+            .all()
+        )
+        events = [row.to_dict() for row in rows]
+        db.session.close()
+        self.publish(events)
+
+# Buffer de alterações do processo
+event_hub = EventHub(size=1000)
+
+def record_change(collection, action, obj):
+    """
+    Registra a alteração de uma entidade para o feed de eventos (/events).
+
+    O evento é gravado no change log na mesma transação da alteração e publicado
+    aos assinantes somente após o commit. Também marca a coleção como alterada
+    para o cache de respostas.
+
+    Args:
+        collection (str): Coleção da entidade ("drivers", "trucks" ou "assignments")
+        action (str): "created", "updated" ou "deleted"
+        obj: Instância do modelo alterada, ou os dados já serializados (dict)
+    """
+    mark_changed(collection)
+    db.session.info.setdefault("pending_changes", []).append((collection, action, obj))
+
+def record_deleted_assignments(*criteria):
+    """
+    Registra a remoção das atribuições que serão apagadas por um DELETE em massa
+    (fora da sessão), como na remoção lógica de motoristas e caminhões.
+
+    Deve ser chamada antes do DELETE, na mesma transação. As atribuições são
+    lidas em uma única consulta, apenas com as colunas publicadas no evento.
+
+    Args:
+        *criteria: Condições do DELETE (ex.: Assignment.driver_id == 1)
+    """
+    statement = select(
+        Assignment.id, Assignment.driver_id, Assignment.truck_id, Assignment.date, Assignment.end_date
+    ).where(*criteria)
+    for assignment_id, driver_id, truck_id, day, end_day in db.session.execute(statement):
+        record_change("assignments", "deleted", {
+            "id": assignment_id,
+            "driver_id": driver_id,
+            "truck_id": truck_id,
+            "date": day.isoformat(),
+            "end_date": end_day.isoformat(),
+        })
+
+def _serialize(collection, obj):
+    if isinstance(obj, dict):
+        return obj
+    # Atribuições são publicadas apenas com os IDs, sem carregar as relações
+    if collection == "assignments":
+        return obj.to_dict(expand=())
+    return obj.to_dict()
+
+def _before_commit(session):
+    pending = session.info.pop("pending_changes", None)
+    if not pending:
+        return
+    # O flush atribui os IDs das entidades criadas antes de montar os eventos
+    session.flush()
+    events = []
+    for collection, action, obj in pending:
+        data = _serialize(collection, obj)
+        events.append(ChangeEvent(
+            collection=collection,
+            action=action,
+            entity_id=data["id"],
+            payload=json.dumps(data, ensure_ascii=False),
+        ))
+    session.add_all(events)
+    session.info["change_events"] = events
+
+def _after_flush(session, flush_context):
+    # Após o flush final do commit os eventos já têm sequência; guarda os dados
+    # antes que o commit expire os objetos
+    events = session.info.get("change_events")
+    if events and all(item.id is not None for item in events):
+        session.info["published_events"] = [item.to_dict() for item in events]
+
+def _after_commit(session):
+    session.info.pop("change_events", None)
+    published = session.info.pop("published_events", None)
+    if published:
+        event_hub.publish(published)
+
+def _after_rollback(session):
+    for key in ("pending_changes", "change_events", "published_events"):
+        session.info.pop(key, None)
+
+def format_event(item):
+    """
+    Formata uma alteração como mensagem Server-Sent Events.
+
+    Exemplo:
+        id: 42
+        event: drivers.updated
+        data: {"collection": "drivers", "action": "updated", "id": 7, "data": {...}}
+    """
+    data = (
+        f'{{"collection": {json.dumps(item["collection"])}, "action": {json.dumps(item["action"])}, '
+        f'"id": {item["entity_id"]}, "data": {item["payload"]}}}'
+    )
+    return f"id: {item['id']}\nevent: {item['collection']}.{item['action']}\ndata: {data}\n\n"
+
+def init_events(app):
+    """
+    Configura o buffer de eventos (EVENTS_BUFFER_SIZE) e os ganchos da sessão que
+    gravam o change log e publicam as alterações após o commit.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    event_hub.reset(app.config["EVENTS_BUFFER_SIZE"])
+    if not event.contains(db.session, "before_commit", _before_commit):
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_flush", _after_flush)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
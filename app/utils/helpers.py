@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from flask import current_app
 from app import db
-from app.models import Driver, Truck, Assignment
+from app.models import Driver, Truck, Assignment, ArchivedAssignment
+from app.utils.events import record_change, record_deleted_assignments
+from app.utils.rollups import discount_assignments
 
 # Mapeamento dos níveis de carteira para comparação
 # Usa valores numéricos para facilitar a comparação de níveis
@@ -31,45 +34,364 @@ def is_license_valid(driver_license, truck_min_license):
     """
     return LICENSE_ORDER.get(driver_license, 0) >= LICENSE_ORDER.get(truck_min_license, 0)
 
+def licenses_at_least(license_type):
+    """
+    Lista os tipos de carteira de nível igual ou superior ao informado.
+    
+    Permite filtrar motoristas compatíveis com um caminhão usando IN sobre a
+    coluna de carteira, o que aproveita índices (ao contrário de comparar níveis).
+    
+    Exemplo:
+        >>> licenses_at_least("D")
+        ['D', 'E']
+    """
+    rank = LICENSE_ORDER.get(license_type, 0)
+    return [license for license, order in LICENSE_ORDER.items() if order >= rank]
+
+def licenses_at_most(license_type):
+    """
+    Lista os tipos de carteira de nível igual ou inferior ao informado.
+    
+    Exemplo:
+        >>> licenses_at_most("B")
+        ['A', 'B']
+    """
+    rank = LICENSE_ORDER.get(license_type, 0)
+    return [license for license, order in LICENSE_ORDER.items() if order <= rank]
+
 def parse_date(date_str):
     """
-    Valida se uma string está no formato de data correto (YYYY-MM-DD).
+    Converte uma string no formato de data (YYYY-MM-DD) para um objeto date.
     
     Args:
         date_str (str): String contendo a data a ser validada
     
     Returns:
-        bool: True se a data for válida, False caso contrário
+        date: Data correspondente, ou None se o formato for inválido
     
     Exemplo:
         >>> parse_date("2024-04-03")
+        datetime.date(2024, 4, 3)
+        >>> parse_date("03-04-2024") is None
         True
-        >>> parse_date("03-04-2024")
-        False
     """
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-        return True
-    except ValueError:
-        return False
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
 
-def validate_assignments():
+def parse_period(data, current=None):
     """
-    Valida todas as atribuições existentes no banco de dados.
-    Verifica se todas as atribuições atendem às regras de negócio.
+    Lê o período de uma atribuição: "date" (início) e "end_date" (fim, inclusive).
+    
+    Sem "end_date", uma nova atribuição cobre apenas o dia de início. Na alteração
+    de uma atribuição existente (`current`), os campos ausentes mantêm os valores
+    atuais e mudar apenas "date" desloca o período inteiro, preservando a duração.
+    O período tem no máximo MAX_ASSIGNMENT_DAYS dias.
+    
+    Args:
+        data (dict): Corpo da requisição (ou item de um lote)
+        current (tuple, optional): Período atual (início, fim) da atribuição alterada
+    
+    Returns:
+        tuple: (início, fim, erro) - erro é uma mensagem quando o período for inválido
+    
+    Exemplo:
+        >>> parse_period({"date": "2024-04-01", "end_date": "2024-04-14"})
+        (datetime.date(2024, 4, 1), datetime.date(2024, 4, 14), None)
+    """
+    start = parse_date(data["date"]) if "date" in data else None
+    end = parse_date(data["end_date"]) if "end_date" in data else None
+    if ("date" in data and not start) or ("end_date" in data and not end):
+        return None, None, "Invalid date format. Use YYYY-MM-DD"
+    if current is not None:
+        start = start or current[0]
+        end = end or start + (current[1] - current[0])
+    end = end or start
+    if end < start:
+        return None, None, "end_date must not be before date"
+    max_days = current_app.config["MAX_ASSIGNMENT_DAYS"]
+    if (end - start).days >= max_days:
+        return None, None, f"An assignment covers at most {max_days} days"
+    return start, end, None
+
+def parse_date_range(args, start="from", end="to"):
+    """
+    Lê um intervalo de datas opcional dos parâmetros da requisição.
+    
+    Args:
+        args (MultiDict): Parâmetros da query string (request.args)
+        start (str): Nome do parâmetro de data inicial
+        end (str): Nome do parâmetro de data final
+    
+    Returns:
+        tuple: (date_from, date_to, erro) - datas ausentes são None; erro é uma
+               mensagem quando alguma data for inválida ou o intervalo invertido
+    
+    Exemplo:
+        >>> parse_date_range({"from": "2024-04-01", "to": "2024-04-07"})
+        (datetime.date(2024, 4, 1), datetime.date(2024, 4, 7), None)
+    """
+    date_from = parse_date(args.get(start)) if start in args else None
+    date_to = parse_date(args.get(end)) if end in args else None
+    if (start in args and not date_from) or (end in args and not date_to):
+        return None, None, "Invalid date format. Use YYYY-MM-DD"
+    if date_from and date_to and date_from > date_to:
+        return None, None, f"'{start}' must not be after '{end}'"
+    return date_from, date_to, None
+
+def overlapping(model, date_from=None, date_to=None):
+    """
+    Critérios das atribuições cujo período toca o intervalo [date_from, date_to].
+    
+    Como nenhum período passa de MAX_ASSIGNMENT_DAYS dias, o início também é
+    limitado por baixo, e a busca lê apenas uma faixa do índice de date (ou dos
+    índices (driver_id, date) e (truck_id, date)), em vez de todas as atribuições
+    que começam antes do fim do intervalo.
+    
+    Args:
+        model: Assignment ou ArchivedAssignment
+        date_from (date, optional): Início do intervalo (inclusivo)
+        date_to (date, optional): Fim do intervalo (inclusivo)
+    
+    Returns:
+        list: Condições para where()/filter()
+    """
+    criteria = []
+    if date_to:
+        criteria.append(model.date <= date_to)
+    if date_from:
+        max_days = current_app.config["MAX_ASSIGNMENT_DAYS"]
+        criteria.append(model.date > date_from - timedelta(days=max_days))
+        criteria.append(model.end_date >= date_from)
+    return criteria
+
+def license_rank(column):
+    """
+    Expressão SQL que converte uma coluna de tipo de carteira no seu nível numérico.
+    
+    Args:
+        column: Coluna com o tipo de carteira (ex.: Driver.license_type)
+    
+    Returns:
+        Expressão CASE equivalente a LICENSE_ORDER.get(valor, 0)
+    """
+    return db.case(LICENSE_ORDER, value=column, else_=0)
+
+def invalid_assignments_query(driver_id=None, truck_id=None):
+    """
+    Monta a consulta das atribuições cuja carteira do motorista não atende ao caminhão.
+    
+    A comparação dos níveis é feita no próprio banco, em um único JOIN entre
+    atribuição, motorista e caminhão. Os filtros opcionais restringem a busca às
+    atribuições de um motorista ou caminhão específico.
+    
+    Args:
+        driver_id (int, optional): Restringe às atribuições deste motorista
+        truck_id (int, optional): Restringe às atribuições deste caminhão
+    
+    Returns:
+        Query: Linhas (id, driver_id, truck_id, date, end_date, license_type, min_license_type)
+    """
+    query = (
+        db.session.query(
+            Assignment.id,
+            Assignment.driver_id,
+            Assignment.truck_id,
+            Assignment.date,
+            Assignment.end_date,
+            Driver.license_type,
+            Truck.min_license_type,
+        )
+        .join(Driver, Assignment.driver_id == Driver.id)
+        .join(Truck, Assignment.truck_id == Truck.id)
+        .filter(license_rank(Driver.license_type) < license_rank(Truck.min_license_type))
+    )
+    if driver_id is not None:
+        query = query.filter(Assignment.driver_id == driver_id)
+    if truck_id is not None:
+        query = query.filter(Assignment.truck_id == truck_id)
+    return query.order_by(Assignment.id)
+
+def required_license_ranks(driver_ids):
+    """
+    Calcula, para cada motorista, o maior nível de carteira exigido pelos caminhões
+    das suas atribuições, em uma única consulta agrupada.
+    
+    Args:
+        driver_ids (iterable): IDs dos motoristas
+    
+    Returns:
+        dict: driver_id -> nível mínimo de carteira que o motorista precisa manter
+    """
+    rows = (
+        db.session.query(Assignment.driver_id, db.func.max(license_rank(Truck.min_license_type)))
+        .join(Truck, Assignment.truck_id == Truck.id)
+        .filter(Assignment.driver_id.in_(list(driver_ids)))
+        .group_by(Assignment.driver_id)
+        .all()
+    )
+    return dict(rows)
+
+def assigned_license_ranks(truck_ids):
+    """
+    Calcula, para cada caminhão, o menor nível de carteira entre os motoristas
+    das suas atribuições, em uma única consulta agrupada.
+    
+    Args:
+        truck_ids (iterable): IDs dos caminhões
+    
+    Returns:
+        dict: truck_id -> nível máximo que o caminhão pode passar a exigir
+    """
+    rows = (
+        db.session.query(Assignment.truck_id, db.func.min(license_rank(Driver.license_type)))
+        .join(Driver, Assignment.driver_id == Driver.id)
+        .filter(Assignment.truck_id.in_(list(truck_ids)))
+        .group_by(Assignment.truck_id)
+        .all()
+    )
+    return dict(rows)
+
+def validate_assignments(driver_id=None, truck_id=None):
+    """
+    Valida as atribuições existentes no banco de dados.
+    Verifica se as atribuições atendem à regra de compatibilidade de carteira.
+    
+    Quando driver_id ou truck_id é informado, apenas as atribuições desse
+    motorista ou caminhão são verificadas, de modo que o custo da validação
+    não cresce com o histórico total. Alterações pendentes na sessão são
+    enviadas (flush) antes da consulta, permitindo validar antes do commit.
+    
+    Args:
+        driver_id (int, optional): Motorista cujas atribuições serão verificadas
+        truck_id (int, optional): Caminhão cujas atribuições serão verificadas
     
     Returns:
         tuple: (bool, str) - (True se todas as atribuições forem válidas, 
                              mensagem de erro se encontrar uma atribuição inválida)
     
     Exemplo:
-        >>> validate_assignments()
+        >>> validate_assignments(driver_id=1)
         (True, "")
         >>> validate_assignments()
         (False, "Assignment ID 1 is invalid due to license incompatibility.")
     """
-    assignments = Assignment.query.all()
-    for assignment in assignments:
-        if not is_license_valid(assignment.driver.license_type, assignment.truck.min_license_type):
-            return False, f"Assignment ID {assignment.id} is invalid due to license incompatibility."
-    return True, "" 
\ No newline at end of file
+    db.session.flush()
+    invalid = invalid_assignments_query(driver_id=driver_id, truck_id=truck_id).first()
+    if invalid:
+        return False, f"Assignment ID {invalid.id} is invalid due to license incompatibility."
+    return True, ""
+
+# Relações de Assignment que podem ser incorporadas na resposta via ?expand=
+EXPANDABLE_RELATIONS = ("driver", "truck")
+
+def parse_expand(expand_str):
+    """
+    Interpreta o parâmetro ?expand= das rotas de atribuições.
+    
+    Args:
+        expand_str (str): Lista separada por vírgulas ("driver,truck"), "none" ou None
+    
+    Returns:
+        tuple: Relações a incorporar, ou None se houver uma relação desconhecida
+    
+    Exemplo:
+        >>> parse_expand(None)
+        ('driver', 'truck')
+        >>> parse_expand("none")
+        ()
+        >>> parse_expand("driver")
+        ('driver',)
+    """
+    if expand_str is None:
+        return EXPANDABLE_RELATIONS
+    if expand_str.strip().lower() in ("", "none"):
+        return ()
+    relations = tuple(dict.fromkeys(part.strip() for part in expand_str.split(",") if part.strip()))
+    if any(relation not in EXPANDABLE_RELATIONS for relation in relations):
+        return None
+    return relations
+
+def assignment_rows_select(model, expand):
+    """
+    Monta o select() das listagens de atribuições, serializado por Assignment.serialize_row.
+    
+    Lê apenas as colunas necessárias, sem instanciar objetos ORM; motorista e
+    caminhão entram por JOIN somente quando incorporados na resposta (?expand=).
+    
+    Args:
+        model: Assignment ou ArchivedAssignment
+        expand (tuple): Relações incorporadas ("driver", "truck")
+    
+    Returns:
+        Select: Consulta sem ordenação nem filtros
+    """
+    statement = db.select(
+        model.id,
+        model.driver_id,
+        model.truck_id,
+        model.date,
+        model.end_date,
+        db.literal(model is ArchivedAssignment).label("archived"),
+    )
+    if "driver" in expand:
+        statement = statement.join(Driver, model.driver_id == Driver.id).add_columns(
+            Driver.name.label("driver_name"),
+            Driver.license_type.label("driver_license_type"),
+            Driver.deleted_at.label("driver_deleted_at"),
+        )
+    if "truck" in expand:
+        statement = statement.join(Truck, model.truck_id == Truck.id).add_columns(
+            Truck.plate.label("truck_plate"),
+            Truck.min_license_type.label("truck_min_license_type"),
+            Truck.deleted_at.label("truck_deleted_at"),
+        )
+    return statement
+
+def parse_flag(args, name):
+    """
+    Interpreta um parâmetro booleano da query string (ex.: ?soft=true).
+    
+    Exemplo:
+        >>> parse_flag({"soft": "true"}, "soft")
+        True
+        >>> parse_flag({}, "soft")
+        False
+    """
+    return str(args.get(name, "")).lower() in ("1", "true", "yes")
+
+def soft_delete(model, entity_id, foreign_key):
+    """
+    Remove logicamente um motorista ou caminhão, com custo independente do histórico.
+    
+    Preenche deleted_at e remove apenas as atribuições a partir de hoje, que não
+    podem mais ser cumpridas; as atribuições passadas são preservadas e a que
+    estiver em andamento (no máximo uma, pois os períodos não se sobrepõem) é
+    encerrada ontem. As alterações das atribuições são registradas para o feed
+    de eventos.
+    
+    Args:
+        model: Driver ou Truck
+        entity_id (int): ID da entidade
+        foreign_key: Coluna de Assignment que referencia a entidade
+    
+    Returns:
+        A entidade removida, ou None se não existir ou já tiver sido removida
+    """
+    entity = model.query.filter_by(id=entity_id, deleted_at=None).first()
+    if entity is None:
+        return None
+    entity.deleted_at = datetime.utcnow()
+    today = date.today()
+    ongoing = Assignment.query.filter(
+        foreign_key == entity_id, *overlapping(Assignment, today, today), Assignment.date < today
+    ).first()
+    if ongoing is not None:
+        ongoing.end_date = today - timedelta(days=1)
+        record_change("assignments", "updated", ongoing)
+    criteria = (foreign_key == entity_id, Assignment.date >= today)
+    discount_assignments(Assignment, *criteria)
+    record_deleted_assignments(*criteria)
+    Assignment.query.filter(*criteria).delete(synchronize_session=False)
+    return entity
@@ -0,0 +1,185 @@
+import hashlib
+import itertools
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, request, jsonify, make_response
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import IdempotencyKey
+
+# Cabeçalho enviado pelo cliente e cabeçalho que marca as respostas reenviadas
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Status da chave cujas alterações já foram confirmadas, antes de a resposta ser gravada
+APPLIED = 0
+
+# Contador de chaves gravadas pelo processo, para a limpeza periódica
+_stored = itertools.count(1)
+
+def _fingerprint():
+    # Método, URL (com a query string) e corpo identificam a requisição original
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.full_path.encode(), request.get_data()):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _is_interrupted(row, now, config):
+    # Requisição original sem resposta gravada após IDEMPOTENCY_LOCK_SECONDS (ex.: processo encerrado)
+    return row.created_at < now - timedelta(seconds=config["IDEMPOTENCY_LOCK_SECONDS"])
+
+def _is_expired(row, now, config):
+    if row.created_at < now - timedelta(seconds=config["IDEMPOTENCY_TTL_SECONDS"]):
+        return True
+    # Uma reserva interrompida sem alterações confirmadas pode ser executada novamente
+    return row.status is None and _is_interrupted(row, now, config)
+
+def _release(key):
+    # Remove a reserva da chave, permitindo que o cliente repita a requisição. Uma
+    # chave cujas alterações já foram confirmadas não é liberada
+    db.session.rollback()
+    removed = db.session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status.is_(None))
+    ).rowcount
+    db.session.commit()
+    return removed > 0
+
+def _store(key, response):
+    # A rota já confirmou (ou desfez) suas alterações; o rollback descarta
+    # apenas o que ficou pendente na sessão antes de gravar a resposta
+    db.session.rollback()
+    db.session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status=response.status_code, body=response.get_data(), mimetype=response.mimetype)
+    )
+    db.session.commit()
+
+def _before_commit(session):
+    # Marca a chave como aplicada na mesma transação das alterações da rota: se o
+    # processo terminar antes de gravar a resposta, a requisição não é repetida
+    key = session.info.get("idempotency_key")
+    if key is not None:
+        session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.status.is_(None))
+            .values(status=APPLIED)
+        )
+
+def prune_idempotency_keys(ttl_seconds, max_keys):
+    """
+    Remove as chaves expiradas e, acima de `max_keys`, as mais antigas.
+
+    Args:
+        ttl_seconds (int): Tempo de retenção das chaves, em segundos
+        max_keys (int): Quantidade máxima de chaves mantidas
+
+    Returns:
+        int: Quantidade de chaves removidas
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+    removed = db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)).rowcount
+    # Maior id fora das `max_keys` chaves mais recentes (nulo se o limite não foi atingido)
+    boundary = (
+        select(IdempotencyKey.id).order_by(IdempotencyKey.id.desc()).offset(max_keys).limit(1).scalar_subquery()
+    )
+    removed += db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id <= boundary)).rowcount
+    db.session.commit()
+    return removed
+
+def idempotent(view):
+    """
+    Decorador para rotas POST/PUT que aceita o cabeçalho Idempotency-Key.
+
+    A primeira requisição com uma chave a reserva (status nulo) antes de executar
+    a rota. O commit da rota marca a chave como aplicada na mesma transação e, ao
+    final, o status e o corpo da resposta são gravados. Repetições com a mesma
+    chave recebem a resposta gravada, com o cabeçalho Idempotent-Replayed, sem
+    validações nem acesso às tabelas de domínio:
+
+    - Chave ainda em andamento: 409
+    - Chave aplicada cuja resposta não foi gravada (processo interrompido): 409,
+      sem executar a rota novamente
+    - Chave já usada com outro método, URL ou corpo: 422
+    - Respostas 5xx e exceções liberam a chave, para que a requisição seja
+      repetida, desde que a rota não tenha confirmado alterações
+
+    As chaves valem por IDEMPOTENCY_TTL_SECONDS e no máximo IDEMPOTENCY_MAX_KEYS
+    são mantidas; a limpeza é feita a cada IDEMPOTENCY_PRUNE_INTERVAL chaves gravadas.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > 255:
+            return jsonify({"error": "Invalid Idempotency-Key header"}), 400
+
+        config = current_app.config
+        fingerprint = _fingerprint()
+        now = datetime.utcnow()
+        row = IdempotencyKey.query.filter_by(key=key).first()
+        if row is not None and not _is_expired(row, now, config):
+            if row.status is None or (row.status == APPLIED and not _is_interrupted(row, now, config)):
+                return jsonify({"error": "A request with this Idempotency-Key is in progress"}), 409
+            if row.fingerprint != fingerprint:
+                current_app.logger.error("Idempotency-Key %s reused with a different request", key)
+                return jsonify({"error": "Idempotency-Key already used with a different request"}), 422
+            if row.status == APPLIED:
+                current_app.logger.error("Idempotency-Key %s was applied but its response was not stored", key)
+                return jsonify({
+                    "error": "The request with this Idempotency-Key was applied but its response was not stored"
+                }), 409
+            current_app.logger.info("Replaying response for Idempotency-Key %s", key)
+            response = current_app.response_class(row.body, status=row.status, mimetype=row.mimetype)
+            response.headers[REPLAYED_HEADER] = "true"
+            return response
+
+        # Reserva a chave; a restrição única garante um único vencedor entre
+        # requisições simultâneas
+        if row is not None:
+            db.session.delete(row)
+        db.session.add(IdempotencyKey(
+            key=key, method=request.method, path=request.path[:255], fingerprint=fingerprint, created_at=now
+        ))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "A request with this Idempotency-Key is in progress"}), 409
+
+        # Lida pelo gancho before_commit durante a execução da rota
+        db.session.info["idempotency_key"] = key
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            db.session.info.pop("idempotency_key", None)
+            _release(key)
+            raise
+        db.session.info.pop("idempotency_key", None)
+        if response.status_code >= 500 or response.is_streamed:
+            # Se a rota já confirmou alterações, a chave não é liberada: a resposta
+            # 5xx é guardada (respostas em stream não são guardadas)
+            if _release(key) or response.is_streamed:
+                return response
+
+        _store(key, response)
+        if next(_stored) % config["IDEMPOTENCY_PRUNE_INTERVAL"] == 0:
+            prune_idempotency_keys(config["IDEMPOTENCY_TTL_SECONDS"], config["IDEMPOTENCY_MAX_KEYS"])
+        return response
+
+    return wrapper
+
+def init_idempotency(app):
+    """
+    Registra o gancho da sessão que marca a chave Idempotency-Key como aplicada
+    na mesma transação das alterações da rota.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    if not event.contains(db.session, "before_commit", _before_commit):
+        event.listen(db.session, "before_commit", _before_commit)
@@ -0,0 +1,147 @@
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from app import db
+
+# Limites (em segundos) dos buckets do histograma de latência por rota
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class RouteMetrics:
+    """
+    Histogramas de latência e contadores de consultas por rota, seguros entre threads.
+
+    As chaves são (método, regra da rota), por exemplo ("GET", "/drivers/<int:driver_id>"),
+    de modo que a cardinalidade não depende dos IDs acessados.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, method, route, duration, queries, db_time):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = {
+                    "counts": [0] * len(self.buckets),
+                    "count": 0,
+                    "sum": 0.0,
+                    "queries": 0,
+                    "db_time": 0.0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    stats["counts"][i] += 1
+            stats["count"] += 1
+            stats["sum"] += duration
+            stats["queries"] += queries
+            stats["db_time"] += db_time
+
+    def render(self):
+        """
+        Exporta as métricas no formato texto do Prometheus.
+
+        Returns:
+            str: Histograma http_request_duration_seconds e contadores
+                 db_queries_total e db_query_duration_seconds_total por rota
+        """
+        with self._lock:
+            routes = {key: dict(stats, counts=list(stats["counts"])) for key, stats in self._routes.items()}
+
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in sorted(routes.items()):
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in zip(self.buckets, stats["counts"]):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats["sum"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats["count"]}')
+
+        lines += [
+            "# HELP db_queries_total SQL statements executed by route.",
+            "# TYPE db_queries_total counter",
+        ]
+        for (method, route), stats in sorted(routes.items()):
+            lines.append(f'db_queries_total{{method="{method}",route="{route}"}} {stats["queries"]}')
+
+        lines += [
+            "# HELP db_query_duration_seconds_total Time spent in SQL statements by route.",
+            "# TYPE db_query_duration_seconds_total counter",
+        ]
+        for (method, route), stats in sorted(routes.items()):
+            lines.append(f'db_query_duration_seconds_total{{method="{method}",route="{route}"}} {stats["db_time"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+# Registro global das métricas do processo
+route_metrics = RouteMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _handle_error(context):
+    # Consultas que falham não disparam after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+def _make_after_cursor_execute(app):
+    threshold = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        if has_request_context() and "db_queries" in g:
+            g.db_queries += 1
+            g.db_time += elapsed
+        if elapsed >= threshold:
+            app.logger.warning(
+                "Slow query (%.1f ms): %s parameters=%r", elapsed * 1000, statement, parameters
+            )
+
+    return _after_cursor_execute
+
+def _before_request():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0.0
+
+def _after_request(response):
+    if "request_started" not in g:
+        return response
+    duration = time.perf_counter() - g.request_started
+    response.headers["X-Query-Count"] = str(g.db_queries)
+    response.headers["Server-Timing"] = (
+        f'db;dur={g.db_time * 1000:.1f};desc="{g.db_queries} queries", app;dur={duration * 1000:.1f}'
+    )
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    route_metrics.observe(request.method, route, duration, g.db_queries, g.db_time)
+    return response
+
+def init_instrumentation(app):
+    """
+    Ativa a instrumentação de SQL por requisição, quando SQL_INSTRUMENTATION estiver ligado.
+
+    - Conta as consultas e o tempo gasto no banco em cada requisição, via eventos
+      do engine do SQLAlchemy, e os expõe nos cabeçalhos X-Query-Count e Server-Timing
+    - Registra em log (warning) as consultas acima de SLOW_QUERY_THRESHOLD_MS, com parâmetros
+    - Registra a rota /metrics com histogramas de latência por rota
+
+    Args:
+        app (Flask): Aplicação a instrumentar
+    """
+    if not app.config["SQL_INSTRUMENTATION"]:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _make_after_cursor_execute(app))
+    event.listen(engine, "handle_error", _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    from app.routes import metrics
+    app.register_blueprint(metrics.metrics_bp)
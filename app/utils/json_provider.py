@@ -0,0 +1,63 @@
+from flask.json.provider import DefaultJSONProvider
+
+# Dependência opcional: sem orjson, a aplicação usa o provedor padrão do Flask
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado em orjson, que codifica direto para bytes.
+
+    Mantém o comportamento do provedor padrão: chaves ordenadas (sort_keys),
+    indentação em modo debug e os mesmos conversores (default) para datas,
+    Decimal, UUID e dataclasses. A única diferença é que caracteres não ASCII
+    são emitidos em UTF-8, sem escapes \\uXXXX.
+    """
+
+    def _options(self, sort_keys, indent=False):
+        # Datas passam pelo conversor do Flask (formato HTTP), como no provedor padrão
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos específicos do módulo json (ex.: cls, separators) usam o provedor padrão
+        if set(kwargs) - {"default", "sort_keys", "indent"}:
+            return super().dumps(obj, **kwargs)
+        options = self._options(kwargs.get("sort_keys", self.sort_keys), bool(kwargs.get("indent")))
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        options = self._options(self.sort_keys, indent) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=options), mimetype=self.mimetype)
+
+# Provedores selecionáveis por JSON_PROVIDER
+JSON_PROVIDERS = ("auto", "orjson", "default")
+
+def init_json(app):
+    """
+    Escolhe o provedor JSON da aplicação conforme JSON_PROVIDER:
+    "auto" (orjson, se instalado), "orjson" ou "default" (módulo json da stdlib).
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    name = app.config["JSON_PROVIDER"]
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER inválido: {name}. Use um de: {', '.join(JSON_PROVIDERS)}")
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson requer o pacote orjson (pip install orjson)")
+    if name != "default" and orjson is not None:
+        app.json = OrjsonProvider(app)
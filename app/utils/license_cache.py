@@ -0,0 +1,209 @@
+import threading
+from collections import OrderedDict
+from sqlalchemy import event, select
+from app import db
+from app.models import Driver, Truck, CacheGeneration
+from app.utils.database import upsert
+
+# Nome do contador de geração (tabela cache_generation) deste cache
+GENERATION_NAME = "licenses"
+
+# Coluna de carteira de cada coleção
+_LICENSE_COLUMNS = {
+    "drivers": (Driver, Driver.license_type),
+    "trucks": (Truck, Truck.min_license_type),
+}
+
+class LicenseCache:
+    """
+    Cache LRU em memória, por processo, da carteira de motoristas e caminhões:
+    (coleção, id) -> classe de carteira, ou None para removidos logicamente. IDs
+    inexistentes não são guardados.
+
+    Coerência entre processos: as alterações de carteira e as remoções
+    incrementam, na mesma transação, o contador de geração gravado no banco. Cada
+    validação lê o contador na transação da escrita e, se ele mudou, descarta
+    todo o cache antes de comparar as carteiras. No próprio processo, as entradas
+    alteradas são descartadas logo após o commit.
+    """
+
+    def __init__(self, max_entries=0):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.configure(max_entries)
+
+    def configure(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._entries.clear()
+            self.generation = None
+            # Incrementado a cada invalidação: valores lidos do banco antes dela não são guardados
+            self._epoch = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def sync(self, generation):
+        # Descarta o cache se o contador de geração lido do banco mudou
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self._epoch += 1
+                self.generation = generation
+
+    def get(self, key):
+        # Retorna (encontrado, carteira, época) e conta o acerto ou a falta
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key], self._epoch
+            self.misses += 1
+            return False, None, self._epoch
+
+    def set(self, key, license_type, epoch):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = license_type
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys, generation):
+        # Após o commit de uma alteração: se o contador avançou apenas por ela,
+        # descarta somente as entradas alteradas; senão, todo o cache
+        with self._lock:
+            self._epoch += 1
+            if self.generation is not None and generation == self.generation + 1:
+                for key in keys:
+                    self._entries.pop(key, None)
+            else:
+                self._entries.clear()
+            self.generation = generation
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "generation": self.generation,
+            }
+
+# Estado do processo
+license_cache = LicenseCache()
+
+def _generation_table():
+    return CacheGeneration.__table__
+
+def _read_generation():
+    table = _generation_table()
+    return db.session.execute(
+        select(table.c.generation).where(table.c.name == GENERATION_NAME)
+    ).scalar() or 0
+
+def _load_license(collection, entity_id):
+    # Carteira lida do banco: None para removidos logicamente; False se não existe
+    model, column = _LICENSE_COLUMNS[collection]
+    row = db.session.execute(select(column, model.deleted_at).where(model.id == entity_id)).first()
+    if row is None:
+        return False
+    license_type, deleted_at = row
+    return None if deleted_at is not None else license_type
+
+def _get_license(collection, entity_id):
+    # Carteira lida do cache e, na falta, do banco
+    try:
+        entity_id = int(entity_id)
+    except (TypeError, ValueError):
+        return None
+    if not license_cache.enabled:
+        license_type = _load_license(collection, entity_id)
+        return None if license_type is False else license_type
+
+    key = (collection, entity_id)
+    found, license_type, epoch = license_cache.get(key)
+    if found:
+        return license_type
+    license_type = _load_license(collection, entity_id)
+    if license_type is False:
+        return None
+    license_cache.set(key, license_type, epoch)
+    return license_type
+
+def license_types(driver_id, truck_id):
+    """
+    Carteiras de um motorista e de um caminhão ativos, para validar uma
+    atribuição e registrar nela as classes contadas no rollup de utilização.
+
+    O contador de geração é lido na transação da escrita (uma consulta pela
+    chave primária): alterações confirmadas por outros processos descartam o
+    cache antes da comparação. As carteiras vêm do cache e, nas faltas, do banco.
+
+    Args:
+        driver_id (int): ID do motorista
+        truck_id (int): ID do caminhão
+
+    Returns:
+        tuple: (carteira do motorista, carteira mínima do caminhão); None para
+               uma entidade inexistente ou removida logicamente
+    """
+    if license_cache.enabled:
+        license_cache.sync(_read_generation())
+    return _get_license("drivers", driver_id), _get_license("trucks", truck_id)
+
+def invalidate_licenses(collection, *ids):
+    """
+    Marca a carteira de motoristas ou caminhões como alterada na transação atual
+    (mudança de carteira ou remoção).
+
+    O contador de geração é incrementado no commit, na mesma transação, e as
+    entradas são descartadas do cache do processo após o commit; em caso de
+    rollback, a marcação é descartada.
+
+    Args:
+        collection (str): "drivers" ou "trucks"
+        *ids (int): IDs alterados
+    """
+    db.session.info.setdefault("license_changes", set()).update((collection, entity_id) for entity_id in ids)
+
+def _before_commit(session):
+    if not session.info.get("license_changes"):
+        return
+    # Incrementa (ou cria) o contador e lê o novo valor em um único comando
+    table = _generation_table()
+    statement = upsert(session, table).values(name=GENERATION_NAME, generation=1)
+    session.info["license_generation"] = session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.name], set_={"generation": table.c.generation + 1}
+        ).returning(table.c.generation)
+    ).scalar()
+
+def _after_commit(session):
+    keys = session.info.pop("license_changes", None)
+    generation = session.info.pop("license_generation", None)
+    if keys and generation is not None:
+        license_cache.invalidate(keys, generation)
+
+def _after_rollback(session):
+    session.info.pop("license_changes", None)
+    session.info.pop("license_generation", None)
+
+def init_license_cache(app):
+    """
+    Configura o cache de carteiras (LICENSE_CACHE_SIZE entradas; 0 desativa) e
+    os ganchos da sessão que mantêm o contador de geração.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    license_cache.configure(app.config["LICENSE_CACHE_SIZE"])
+    if not event.contains(db.session, "before_commit", _before_commit):
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,181 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request, has_request_context
+from flask.logging import default_handler
+
+# Atributos padrão de um LogRecord; os demais (passados em extra= ou pelo filtro
+# da requisição) são os campos estruturados do JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Formato das linhas com LOG_FORMAT=text (o mesmo do handler padrão do Flask)
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada registro como uma linha JSON: horário, nível, logger, mensagem,
+    dados da requisição (método, rota, caminho e IDs da URL) e campos extra=.
+    Executado na thread do QueueListener, fora da requisição.
+    """
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+class RequestFilter(logging.Filter):
+    """
+    Aplicado na thread da requisição, antes de enfileirar o registro.
+
+    - Amostragem das requisições GET: para cada nível em `sampling`, apenas essa
+      fração das requisições mantém seus registros. O sorteio é feito uma vez por
+      requisição, de modo que os registros de uma requisição mantida ficam completos
+    - Anexa o método, a regra da rota, o caminho e os IDs da URL (view_args)
+    """
+
+    def __init__(self, sampling):
+        super().__init__()
+        self.sampling = sampling
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        if request.method == "GET":
+            rate = self.sampling.get(record.levelno, 1.0)
+            if rate < 1.0:
+                if "log_sample" not in g:
+                    g.log_sample = random.random()
+                if g.log_sample >= rate:
+                    return False
+        record.method = request.method
+        record.route = request.url_rule.rule if request.url_rule else None
+        record.path = request.path
+        if request.view_args:
+            record.ids = request.view_args
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Enfileira os registros sem formatá-los e sem bloquear: com a fila cheia, o
+    registro é descartado e contado em `dropped`.
+
+    A mensagem é montada (record.getMessage()) apenas na thread do listener, de
+    modo que os argumentos dos logs devem ser valores simples (IDs, textos,
+    datas), e não objetos que possam mudar ou exigir a sessão do banco.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self._dropped = itertools.count()
+        self.dropped = 0
+        self.listener = None
+
+    def prepare(self, record):
+        # O traceback é formatado aqui, enquanto os frames ainda existem
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped = next(self._dropped) + 1
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # No encerramento, aguarda espaço na fila: os registros pendentes são gravados
+        self.queue.put(self._sentinel)
+
+def _stop(handler):
+    if handler.listener is not None:
+        handler.listener.stop()
+        handler.listener = None
+
+def _restart_after_fork(handler):
+    # A thread do listener não existe no processo criado por fork (ex.: workers do
+    # gunicorn --preload): cada processo recria a sua fila e a sua thread
+    if handler.listener is not None:
+        handler.queue = queue.Queue(handler.queue.maxsize)
+        handler.listener = _Listener(handler.queue, *handler.listener.handlers)
+        handler.listener.start()
+
+def init_logging(app):
+    """
+    Configura o logger da aplicação para gravar em segundo plano.
+
+    Os registros de app.logger vão para uma fila limitada (LOG_QUEUE_SIZE) lida
+    por uma thread (QueueListener), que os formata (JSON ou texto, LOG_FORMAT) e
+    grava em stderr. A requisição apenas enfileira; com a fila cheia, o registro
+    é descartado. Nas requisições GET, LOG_GET_SAMPLING define a fração mantida
+    por nível, e LOG_ACCESS registra ao final de cada requisição o método, a
+    rota, o status e a duração.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    stream = logging.StreamHandler(sys.stderr)
+    if app.config["LOG_FORMAT"] == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    # O logger é compartilhado pelas aplicações criadas no mesmo processo (ex.:
+    # testes): a fila anterior é encerrada e substituída
+    for handler in list(app.logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            app.logger.removeHandler(handler)
+            _stop(handler)
+    app.logger.removeHandler(default_handler)
+
+    handler = DroppingQueueHandler(queue.Queue(app.config["LOG_QUEUE_SIZE"]))
+    handler.addFilter(RequestFilter({
+        logging.getLevelName(level): rate for level, rate in app.config["LOG_GET_SAMPLING"].items()
+    }))
+    handler.listener = _Listener(handler.queue, stream)
+    handler.listener.start()
+    atexit.register(_stop, handler)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: _restart_after_fork(handler))
+    app.logger.addHandler(handler)
+    app.logger.setLevel(app.config["LOG_LEVEL"])
+    app.extensions["log_handler"] = handler
+
+    if app.config["LOG_ACCESS"]:
+        access = app.logger.getChild("access")
+
+        @app.before_request
+        def _start_timer():
+            g.log_started = time.perf_counter()
+
+        @app.after_request
+        def _log_access(response):
+            if "log_started" in g and access.isEnabledFor(logging.INFO):
+                access.info(
+                    "%s %s %s", request.method, request.path, response.status_code,
+                    extra={
+                        "status": response.status_code,
+                        "duration_ms": round((time.perf_counter() - g.log_started) * 1000, 2),
+                    },
+                )
+            return response
@@ -0,0 +1,130 @@
+import base64
+import json
+from flask import current_app
+from sqlalchemy import tuple_
+from app import db
+
+def encode_cursor(values):
+    """
+    Gera um cursor opaco a partir dos valores da chave de ordenação do último item.
+
+    Args:
+        values (list): Valores da chave de ordenação (ex.: [id] ou ["2024-04-03", id])
+
+    Returns:
+        str: Cursor codificado em base64 seguro para URL
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    Decodifica um cursor gerado por encode_cursor.
+
+    Args:
+        cursor (str): Cursor recebido no parâmetro ?after=
+
+    Returns:
+        list: Valores da chave de ordenação, ou None se o cursor for inválido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+def parse_page_args(args, cursor_types=(int,)):
+    """
+    Lê os parâmetros de paginação ?limit= e ?after= da requisição.
+
+    Args:
+        args (MultiDict): Parâmetros da query string (request.args)
+        cursor_types (tuple): Conversores de cada valor do cursor, na ordem da
+                              chave de ordenação (ex.: (parse_date, int))
+
+    Returns:
+        tuple: (paginado, limit, after, erro) - paginado indica se o cliente pediu
+               paginação; after são os valores decodificados do cursor (ou None);
+               erro é uma mensagem quando algum parâmetro for inválido
+    """
+    if "limit" not in args and "after" not in args:
+        return False, None, None, None
+
+    max_limit = current_app.config["MAX_PAGE_SIZE"]
+    limit = args.get("limit", current_app.config["DEFAULT_PAGE_SIZE"], type=int)
+    if limit is None or limit < 1:
+        return True, None, None, "Invalid limit parameter"
+    limit = min(limit, max_limit)
+
+    after = None
+    if "after" in args:
+        values = decode_cursor(args["after"])
+        if values is None or len(values) != len(cursor_types):
+            return True, None, None, "Invalid cursor"
+        try:
+            after = [convert(value) for convert, value in zip(cursor_types, values)]
+        except (TypeError, ValueError):
+            return True, None, None, "Invalid cursor"
+        if any(value is None for value in after):
+            return True, None, None, "Invalid cursor"
+    return True, limit, after, None
+
+def keyset_page(statement, columns, after, limit):
+    """
+    Busca uma página usando paginação por chave (keyset), sem OFFSET.
+
+    A página começa logo após a chave `after` e é lida em ordem pelos índices
+    das colunas de ordenação, de modo que o custo de cada página é constante
+    independentemente da profundidade.
+
+    Args:
+        statement (Select): Consulta base (select() de colunas), já com os filtros aplicados
+        columns (list): Colunas da chave de ordenação (únicas em conjunto)
+        after (list): Valores da chave do último item da página anterior, ou None
+        limit (int): Quantidade máxima de itens na página
+
+    Returns:
+        tuple: (linhas, has_more) - linhas da página e se existem itens seguintes
+    """
+    if after is not None:
+        statement = statement.where(tuple_(*columns) > tuple(after))
+    rows = db.session.execute(statement.order_by(*columns).limit(limit + 1)).all()
+    return rows[:limit], len(rows) > limit
+
+def merge_pages(pages, key, limit):
+    """
+    Intercala páginas de fontes disjuntas lidas com a mesma chave de ordenação.
+
+    Cada fonte é paginada com keyset_page a partir do mesmo cursor; a página
+    resultante contém os `limit` menores itens entre todas elas.
+
+    Args:
+        pages (list): Resultados (itens, has_more) de keyset_page para cada fonte
+        key (callable): Extrai de um item a chave de ordenação (comparável)
+        limit (int): Quantidade máxima de itens na página
+
+    Returns:
+        tuple: (itens, has_more)
+    """
+    items = sorted((item for page, _ in pages for item in page), key=key)
+    has_more = len(items) > limit or any(more for _, more in pages)
+    return items[:limit], has_more
+
+def page_body(items, has_more, key, serialize):
+    """
+    Monta o corpo da resposta paginada.
+
+    Args:
+        items (list): Itens da página
+        has_more (bool): Se existem itens após esta página
+        key (callable): Extrai de um item os valores da chave de ordenação (serializáveis em JSON)
+        serialize (callable): Converte um item em dicionário
+
+    Returns:
+        dict: {"items": [...], "next": cursor da próxima página ou None}
+    """
+    return {
+        "items": [serialize(item) for item in items],
+        "next": encode_cursor(key(items[-1])) if has_more else None,
+    }
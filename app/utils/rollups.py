@@ -0,0 +1,213 @@
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import event, func, inspect, insert, literal, select, union_all
+from sqlalchemy.orm.util import identity_key
+from app import db
+from app.models import Driver, Truck, Assignment, ArchivedAssignment, LicenseUtilization
+from app.utils.database import upsert
+
+# Linhas gravadas por comando no rollup (limita a quantidade de parâmetros)
+APPLY_CHUNK_SIZE = 500
+
+def _days(start, end):
+    # Dias do período [start, end]; cada dia de uma atribuição conta no rollup
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+def _deltas(session):
+    # (data, classe de carteira) -> [variação de trucks, variação de drivers]
+    return session.info.setdefault("utilization_deltas", defaultdict(lambda: [0, 0]))
+
+def _previous(obj, name):
+    # Valor da coluna antes das alterações pendentes do objeto
+    history = inspect(obj).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, name)
+
+def _licenses(session, driver_ids, truck_ids):
+    # Carteira de cada motorista e caminhão, preferindo os objetos já carregados na
+    # sessão (que refletem alterações ainda não gravadas) e consultando os demais
+    # em uma única consulta
+    licenses, statements = {}, []
+    for model, column, ids in (
+        (Driver, Driver.license_type, driver_ids),
+        (Truck, Truck.min_license_type, truck_ids),
+    ):
+        found, missing = {}, []
+        for entity_id in ids:
+            obj = session.identity_map.get(identity_key(model, entity_id))
+            if obj is not None:
+                found[entity_id] = getattr(obj, column.key)
+            else:
+                missing.append(entity_id)
+        licenses[model] = found
+        if missing:
+            statements.append(
+                select(literal(model.__name__).label("model"), model.id, column.label("license_type"))
+                .where(model.id.in_(missing))
+            )
+    if statements:
+        models = {"Driver": Driver, "Truck": Truck}
+        statement = statements[0] if len(statements) == 1 else union_all(*statements)
+        for name, entity_id, license_type in session.execute(statement):
+            licenses[models[name]][entity_id] = license_type
+    return licenses[Driver], licenses[Truck]
+
+def _before_flush(session, flush_context, instances):
+    # Cada atribuição é contada nas classes de carteira registradas nela ao ser
+    # gravada (driver_license e truck_license). Quem grava ou troca o motorista ou
+    # o caminhão registra também a carteira já lida na validação (cache de
+    # carteiras, lotes e planejamento de escalas), sem nova consulta; apenas as
+    # que faltarem são lidas, de uma vez. Uma mudança de carteira não altera as
+    # atribuições já gravadas nem o rollup
+    new = [obj for obj in session.new if isinstance(obj, Assignment)]
+    dirty = [obj for obj in session.dirty if isinstance(obj, Assignment)]
+    pending = [
+        (obj, name, key)
+        for obj in new + dirty
+        for name, key in (("driver_license", "driver_id"), ("truck_license", "truck_id"))
+        if getattr(obj, name) is None
+    ]
+    if pending:
+        drivers, trucks = _licenses(
+            session,
+            {obj.driver_id for obj, name, _ in pending if name == "driver_license"},
+            {obj.truck_id for obj, name, _ in pending if name == "truck_license"},
+        )
+        for obj, name, key in pending:
+            setattr(obj, name, (drivers if name == "driver_license" else trucks)[getattr(obj, key)])
+
+    columns = ("date", "end_date", "driver_license", "truck_license")
+    changes = []  # (sinal, início, fim, classe do motorista, classe do caminhão)
+    for obj in new:
+        # Sem end_date, o padrão da coluna (o dia de início) ainda não foi aplicado
+        changes.append((1, obj.date, obj.end_date or obj.date, obj.driver_license, obj.truck_license))
+    for obj in session.deleted:
+        if isinstance(obj, Assignment):
+            changes.append((-1, *(_previous(obj, name) for name in columns)))
+    for obj in dirty:
+        old = tuple(_previous(obj, name) for name in columns)
+        new_values = tuple(getattr(obj, name) for name in columns)
+        if old != new_values:
+            changes.append((-1, *old))
+            changes.append((1, *new_values))
+
+    deltas = _deltas(session)
+    for sign, start, end, driver_license, truck_license in changes:
+        for day in _days(start, end):
+            deltas[(day, truck_license)][0] += sign
+            deltas[(day, driver_license)][1] += sign
+
+def discount_assignments(model, *criteria):
+    """
+    Desconta do rollup as atribuições que serão removidas por um DELETE em massa
+    (fora da sessão), como na remoção de motoristas e caminhões.
+
+    Deve ser chamada antes do DELETE, na mesma transação.
+
+    Args:
+        model: Assignment ou ArchivedAssignment
+        *criteria: Condições do DELETE (ex.: Assignment.driver_id == 1)
+    """
+    deltas = _deltas(db.session)
+    for slot, column in ((0, model.truck_license), (1, model.driver_license)):
+        statement = (
+            select(model.date, model.end_date, column, func.count())
+            .where(*criteria)
+            .group_by(model.date, model.end_date, column)
+        )
+        for start, end, license_type, count in db.session.execute(statement):
+            for day in _days(start, end):
+                deltas[(day, license_type)][slot] -= count
+
+def _apply(session, deltas):
+    # Aplica as variações com INSERT ... ON CONFLICT DO UPDATE, em lotes: as linhas
+    # ainda inexistentes são criadas no mesmo comando, sem a corrida entre UPDATE
+    # e INSERT de transações concorrentes. A ordem fixa das linhas evita deadlocks
+    table = LicenseUtilization.__table__
+    rows = [
+        {"date": day, "license_type": license_type, "trucks": trucks, "drivers": drivers}
+        for (day, license_type), (trucks, drivers) in sorted(deltas.items())
+        if trucks or drivers
+    ]
+    for start in range(0, len(rows), APPLY_CHUNK_SIZE):
+        statement = upsert(session, table).values(rows[start:start + APPLY_CHUNK_SIZE])
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.date, table.c.license_type],
+            set_={
+                "trucks": table.c.trucks + statement.excluded.trucks,
+                "drivers": table.c.drivers + statement.excluded.drivers,
+            },
+        ))
+
+def _before_commit(session):
+    # O flush registra as variações ainda pendentes antes de aplicá-las
+    session.flush()
+    deltas = session.info.pop("utilization_deltas", None)
+    if deltas:
+        _apply(session, deltas)
+
+def _after_rollback(session):
+    session.info.pop("utilization_deltas", None)
+
+def utilization_rows(connection):
+    """
+    Calcula todo o rollup a partir das atribuições ativas e arquivadas, pelas
+    classes de carteira registradas em cada uma (ou, nas ainda sem registro, pelas
+    carteiras atuais). Custo proporcional ao total de atribuições.
+
+    Args:
+        connection: Sessão ou conexão onde as consultas são executadas
+
+    Returns:
+        list: Linhas (date, license_type, trucks, drivers) da tabela do rollup
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for model in (Assignment, ArchivedAssignment):
+        for slot, model_key, entity, recorded, current in (
+            (0, model.truck_id, Truck, model.truck_license, Truck.min_license_type),
+            (1, model.driver_id, Driver, model.driver_license, Driver.license_type),
+        ):
+            column = func.coalesce(recorded, current)
+            statement = (
+                select(model.date, model.end_date, column, func.count())
+                .join(entity, entity.id == model_key)
+                .group_by(model.date, model.end_date, column)
+            )
+            for start, end, license_type, count in connection.execute(statement):
+                for day in _days(start, end):
+                    totals[(day, license_type)][slot] += count
+    return [
+        {"date": day, "license_type": license_type, "trucks": trucks, "drivers": drivers}
+        for (day, license_type), (trucks, drivers) in sorted(totals.items())
+    ]
+
+def rebuild_utilization():
+    """
+    Recalcula todo o rollup a partir das atribuições ativas e arquivadas
+    (correção). Custo proporcional ao total de atribuições.
+
+    Returns:
+        int: Quantidade de linhas (dia e classe) gravadas
+    """
+    table = LicenseUtilization.__table__
+    db.session.execute(table.delete())
+    rows = utilization_rows(db.session)
+    if rows:
+        db.session.execute(insert(table), rows)
+    db.session.commit()
+    return len(rows)
+
+def init_rollups(app):
+    """
+    Registra os ganchos da sessão que mantêm o rollup de utilização: as variações
+    das atribuições criadas, alteradas e removidas são acumuladas a cada flush e
+    gravadas na mesma transação, antes do commit.
+
+    Args:
+        app (Flask): Aplicação a configurar
+    """
+    if not event.contains(db.session, "before_flush", _before_flush):
+        event.listen(db.session, "before_flush", _before_flush)
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
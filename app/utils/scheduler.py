@@ -0,0 +1,72 @@
+from datetime import timedelta
+from app.utils.helpers import LICENSE_ORDER
+
+def date_range(date_from, date_to):
+    """
+    Gera todas as datas do intervalo, inclusive.
+
+    Exemplo:
+        >>> list(date_range(date(2024, 4, 1), date(2024, 4, 3)))
+        [datetime.date(2024, 4, 1), datetime.date(2024, 4, 2), datetime.date(2024, 4, 3)]
+    """
+    for offset in range((date_to - date_from).days + 1):
+        yield date_from + timedelta(days=offset)
+
+def plan_schedule(days, trucks, drivers, busy_drivers, busy_trucks):
+    """
+    Monta um plano de atribuições sem conflitos, casando motoristas e caminhões dia a dia.
+
+    A compatibilidade entre motorista e caminhão é aninhada: um motorista de nível r
+    pode dirigir qualquer caminhão que exija nível <= r. Nesse grafo bipartido,
+    atender primeiro os caminhões mais exigentes, cada um com o motorista livre de
+    menor nível suficiente, produz um emparelhamento máximo (argumento de troca: o
+    conjunto de motoristas aptos de um caminhão contém o de qualquer caminhão mais
+    exigente) e, entre os emparelhamentos máximos, mantém livres os motoristas de
+    nível mais alto. Dentro de um mesmo nível, o motorista com menos dias no plano é
+    escolhido primeiro, distribuindo a carga.
+
+    O custo é O(dias * (M log M + N)) para M motoristas e N caminhões, sem tentativas.
+
+    Args:
+        days (iterable): Datas a planejar
+        trucks (list): Pares (truck_id, min_license_type) que precisam de cobertura
+        drivers (list): Pares (driver_id, license_type) disponíveis para o plano
+        busy_drivers (set): Pares (driver_id, date) já ocupados
+        busy_trucks (set): Pares (truck_id, date) já cobertos
+
+    Returns:
+        tuple: (plano, descobertos) - plano é uma lista de (date, driver_id, truck_id);
+               descobertos lista os (date, truck_id) sem motorista compatível livre
+    """
+    max_rank = max(LICENSE_ORDER.values())
+    ranked_drivers = [(LICENSE_ORDER.get(license, 0), driver_id) for driver_id, license in drivers]
+    # Caminhões mais exigentes primeiro
+    ranked_trucks = sorted(
+        ((LICENSE_ORDER.get(license, 0), truck_id) for truck_id, license in trucks),
+        key=lambda truck: (-truck[0], truck[1]),
+    )
+    load = {driver_id: 0 for _, driver_id in ranked_drivers}
+
+    plan, uncovered = [], []
+    for day in days:
+        # Motoristas livres no dia, agrupados por nível e ordenados pela carga no plano;
+        # cada lista é consumida do fim (pop) para custo O(1)
+        buckets = [[] for _ in range(max_rank + 1)]
+        for rank, driver_id in ranked_drivers:
+            if (driver_id, day) not in busy_drivers:
+                buckets[rank].append(driver_id)
+        for bucket in buckets:
+            bucket.sort(key=lambda driver_id: (load[driver_id], driver_id), reverse=True)
+
+        for rank, truck_id in ranked_trucks:
+            if (truck_id, day) in busy_trucks:
+                continue
+            for level in range(max(rank, 1), max_rank + 1):
+                if buckets[level]:
+                    driver_id = buckets[level].pop()
+                    load[driver_id] += 1
+                    plan.append((day, driver_id, truck_id))
+                    break
+            else:
+                uncovered.append((day, truck_id))
+    return plan, uncovered
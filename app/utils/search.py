@@ -0,0 +1,97 @@
+from flask import current_app
+from sqlalchemy import Integer, func, inspect, literal, literal_column, table, tuple_
+from app import db
+from app.models.search_index import build_search_indexes, supports_search_index
+
+# Tamanho mínimo do termo para a busca pelo índice trigram; termos menores
+# buscam pelo início do texto, no índice de lower(coluna)
+TRIGRAM_MIN_LENGTH = 3
+
+# Maior caractere Unicode: limite superior da faixa de textos com um prefixo
+_MAX_CHAR = "\U0010ffff"
+
+def _has_search_index(index):
+    # Verificado uma vez por aplicação: bancos sem suporte ao tokenizador trigram
+    # ou criados antes do índice (até rebuild-search-index) usam LIKE
+    available = current_app.extensions.setdefault("search_indexes", {})
+    if index not in available:
+        available[index] = supports_search_index(db.engine.dialect) and inspect(db.engine).has_table(index)
+    return available[index]
+
+def search_page(statement, model, column, index, term, after, limit):
+    """
+    Uma página da busca parcial por `term` em uma listagem, sem diferenciar
+    maiúsculas e ordenada por relevância:
+
+    1. Textos que começam pelo termo (o igual ao termo primeiro), em ordem
+       alfabética: uma faixa do índice de lower(coluna), lida já ordenada
+    2. Textos que contêm o termo em outra posição, pelo id: no SQLite, lidos do
+       índice trigram (FTS5) em ordem de id; nos demais bancos, com LIKE
+
+    Cada grupo é lido com LIMIT a partir do cursor, sem ordenar todos os
+    resultados, de modo que termos frequentes custam o mesmo que termos raros.
+    Termos com menos de TRIGRAM_MIN_LENGTH caracteres buscam apenas o início.
+
+    Args:
+        statement (Select): Listagem (select() das colunas do modelo), já filtrada
+        model: Driver ou Truck
+        column: Coluna buscada (ex.: Driver.name)
+        index (str): Nome do índice de busca da coluna
+        term (str): Texto buscado
+        after (list): Cursor [grupo, texto, id] do último item da página anterior, ou None
+        limit (int): Quantidade máxima de itens na página
+
+    Returns:
+        tuple: (linhas, has_more) - as linhas trazem as colunas "search_group" e
+               "search_key", que com o id formam o cursor (ver search_cursor)
+    """
+    term = term.strip().lower()
+    value = func.lower(column)
+    group, after_key, after_id = after or (0, None, None)
+    rows = []
+
+    if group == 0:
+        page = statement.add_columns(literal(0).label("search_group"), value.label("search_key")).where(
+            value >= term, value < term + _MAX_CHAR
+        )
+        if after is not None:
+            page = page.where(tuple_(value, model.id) > (after_key, after_id))
+        rows = db.session.execute(page.order_by(value, model.id).limit(limit + 1)).all()
+
+    if len(rows) <= limit and len(term) >= TRIGRAM_MIN_LENGTH:
+        page = statement.add_columns(literal(1).label("search_group"), literal("").label("search_key")).where(
+            ~value.startswith(term, autoescape=True)
+        )
+        if _has_search_index(index):
+            # O FTS5 devolve as linhas em ordem de rowid (o id), de modo que a
+            # junção é percorrida em ordem e interrompida pelo LIMIT. O termo vai
+            # entre aspas, como frase literal, sem a sintaxe de consulta do FTS5
+            key = literal_column(f"{index}.rowid", Integer)
+            page = page.join(table(index), key == model.id).where(
+                literal_column(index).op("MATCH")('"' + term.replace('"', '""') + '"')
+            )
+        else:
+            page = page.where(value.contains(term, autoescape=True))
+            key = model.id
+        if group == 1:
+            page = page.where(key > after_id)
+        rows += db.session.execute(page.order_by(key).limit(limit + 1 - len(rows))).all()
+
+    return rows[:limit], len(rows) > limit
+
+def search_cursor(row):
+    # Valores do cursor de search_page para uma linha da página
+    return [row.search_group, row.search_key, row.id]
+
+def rebuild_search_indexes():
+    """
+    Cria os índices de busca ausentes (ex.: em um banco anterior a eles) e os
+    reconstrói a partir das tabelas de motoristas e caminhões.
+
+    Returns:
+        list: Nomes dos índices reconstruídos (vazia se o banco não tem suporte)
+    """
+    indexes = build_search_indexes(db.session.connection())
+    db.session.commit()
+    current_app.extensions.pop("search_indexes", None)
+    return indexes
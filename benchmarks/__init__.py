@@ -0,0 +1,2 @@
+# Benchmarks de desempenho da API. Cada módulo pode ser executado com
+# `python -m benchmarks.<modulo>` a partir da raiz do projeto.
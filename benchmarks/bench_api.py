@@ -0,0 +1,140 @@
+"""
+Benchmark dos endpoints de motoristas, caminhões e atribuições.
+
+Para cada escala, gera uma frota determinística (benchmarks.datagen), grava em um
+banco SQLite novo e executa os cenários de benchmarks.scenarios em processo, com
+o test client do Flask e um único cliente sequencial. Reporta as latências p50,
+p95 e p99, a vazão e a média de consultas SQL por requisição (X-Query-Count).
+
+O cache de respostas fica desativado para medir o custo real de cada rota; use
+--cache para medi-lo ativado. Com --json, os resultados são gravados em arquivo
+para comparação entre execuções.
+
+Uso:
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --scales small,medium --iterations 100 --json results.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+
+from config import get_config
+from benchmarks.datagen import generate_fleet, populate
+from benchmarks.scenarios import SCENARIOS, ScenarioContext
+
+# Escalas: (motoristas, caminhões, atribuições)
+SCALES = {
+    "small": (100, 100, 2000),
+    "medium": (1000, 1000, 20000),
+    "large": (5000, 5000, 100000),
+}
+
+def percentile(values, p):
+    # Percentil pelo método nearest-rank sobre valores ordenados
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+def build_app(path, profile, cache):
+    from app import create_app
+
+    app = create_app(type("BenchConfig", (get_config(profile),), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "AUTO_MIGRATE": True,
+        "SQL_INSTRUMENTATION": True,
+        "SLOW_QUERY_THRESHOLD_MS": float("inf"),
+        "RESPONSE_CACHE_SIZE": 256 if cache else 0,
+    }))
+    # Os erros esperados (conflitos, validações) não devem poluir o relatório no terminal
+    app.logger.setLevel(logging.CRITICAL)
+    return app
+
+def run_scenario(client, ctx, scenario, iterations, max_seconds):
+    """
+    Executa um cenário até `iterations` requisições ou `max_seconds` segundos.
+
+    Returns:
+        dict: Latências ordenadas (s), consultas por requisição e status inesperados
+    """
+    durations, queries, unexpected = [], [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request = scenario["build"](ctx)
+        if request is None:
+            break
+        method, url, body = request
+        before = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        durations.append(time.perf_counter() - before)
+        queries.append(int(response.headers.get("X-Query-Count", 0)))
+        if response.status_code not in scenario["expect"]:
+            unexpected += 1
+        if time.perf_counter() - started > max_seconds:
+            break
+    durations.sort()
+    return {"durations": durations, "queries": queries, "unexpected": unexpected}
+
+def run_scale(name, profile, cache, iterations, max_seconds, seed):
+    from app import db
+
+    drivers, trucks, assignments = SCALES[name]
+    fleet = generate_fleet(drivers, trucks, assignments, seed=seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), profile, cache)
+        with app.app_context():
+            ids = populate(db, fleet)
+        ctx = ScenarioContext(fleet, ids, seed=seed)
+        client = app.test_client()
+        for scenario in SCENARIOS:
+            stats = run_scenario(client, ctx, scenario, iterations, max_seconds)
+            durations = stats["durations"]
+            if not durations:
+                continue
+            results.append({
+                "scale": name,
+                "scenario": scenario["name"],
+                "requests": len(durations),
+                "p50_ms": percentile(durations, 50) * 1000,
+                "p95_ms": percentile(durations, 95) * 1000,
+                "p99_ms": percentile(durations, 99) * 1000,
+                "throughput_rps": len(durations) / sum(durations),
+                "queries_per_request": sum(stats["queries"]) / len(stats["queries"]),
+                "unexpected_status": stats["unexpected"],
+            })
+        with app.app_context():
+            db.engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"Escalas separadas por vírgula: {', '.join(SCALES)}")
+    parser.add_argument("--profile", default="sqlite", help="Perfil de configuração (config.CONFIG_PROFILES)")
+    parser.add_argument("--iterations", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Tempo máximo por cenário")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="Mantém o cache de respostas ativado")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = []
+    header = (f"{'scale':>7} {'scenario':<28} {'reqs':>5} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'req/s':>8} {'queries':>8} {'unexpected':>10}")
+    for name in args.scales.split(","):
+        drivers, trucks, assignments = SCALES[name]
+        print(f"\n{name}: {drivers} drivers, {trucks} trucks, {assignments} assignments")
+        print(header)
+        for row in run_scale(name, args.profile, args.cache, args.iterations, args.max_seconds, args.seed):
+            print(f"{row['scale']:>7} {row['scenario']:<28} {row['requests']:>5} {row['p50_ms']:>8.2f} "
+                  f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['throughput_rps']:>8.1f} "
+                  f"{row['queries_per_request']:>8.1f} {row['unexpected_status']:>10}")
+            results.append(row)
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main()
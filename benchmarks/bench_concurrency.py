@@ -0,0 +1,108 @@
+"""
+Benchmark de leituras e escritas concorrentes por perfil de banco de dados.
+
+Para cada perfil, cria um banco novo em arquivo, popula motoristas e caminhões e
+executa, por alguns segundos, threads leitoras (GET /drivers/<id> e
+GET /assignments?limit=) em paralelo com threads escritoras (POST /drivers/ e
+PUT /drivers/<id>). Reporta a vazão de leituras e escritas e os erros (ex.:
+"database is locked").
+
+O perfil postgresql usa DATABASE_URL e só é executado se informado em --profiles.
+
+Uso:
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --profiles development,sqlite --readers 8 --writers 2 --seconds 5
+    DATABASE_URL=postgresql://localhost/trucks_bench python -m benchmarks.bench_concurrency --profiles postgresql
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from config import get_config
+
+def build_app(profile, path):
+    from app import create_app, db
+    from app.models import Driver, Truck, Assignment
+
+    overrides = {"RESPONSE_CACHE_SIZE": 0, "SQL_INSTRUMENTATION": False, "AUTO_MIGRATE": True}
+    if profile != "postgresql":
+        overrides["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    app = create_app(type("BenchConfig", (get_config(profile),), overrides))
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        drivers = [Driver(name=f"Driver {i}", license_type="E") for i in range(500)]
+        trucks = [Truck(plate=f"BEN{i:04d}", min_license_type="C") for i in range(500)]
+        db.session.add_all(drivers + trucks)
+        db.session.flush()
+        start = date(2024, 1, 1)
+        db.session.add_all(
+            Assignment(driver_id=driver.id, truck_id=truck.id, date=start + timedelta(days=day))
+            for day in range(10)
+            for driver, truck in zip(drivers, trucks)
+        )
+        db.session.commit()
+    return app
+
+def worker(app, kind, stop, counters, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    done = errors = 0
+    while not stop.is_set():
+        if kind == "read":
+            if rng.random() < 0.5:
+                response = client.get(f"/drivers/{rng.randint(1, 500)}")
+            else:
+                response = client.get("/assignments/?limit=50")
+        elif rng.random() < 0.5:
+            response = client.post("/drivers/", json={"name": f"New {seed}-{done}", "license_type": "D"})
+        else:
+            response = client.put(f"/drivers/{rng.randint(1, 500)}", json={"name": f"Renamed {done}"})
+        if response.status_code < 400:
+            done += 1
+        else:
+            errors += 1
+    with counters["lock"]:
+        counters[kind] += done
+        counters["errors"] += errors
+
+def run(profile, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(profile, os.path.join(tmp, "bench.db"))
+        counters = {"lock": threading.Lock(), "read": 0, "write": 0, "errors": 0}
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=worker, args=(app, kind, stop, counters, seed))
+            for seed, kind in enumerate(["read"] * readers + ["write"] * writers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+    return counters["read"] / seconds, counters["write"] / seconds, counters["errors"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", default="development,sqlite")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'readers':>8} {'writers':>8} {'reads/s':>9} {'writes/s':>9} {'errors':>7}")
+    for profile in args.profiles.split(","):
+        reads, writes, errors = run(profile, args.readers, args.writers, args.seconds)
+        print(f"{profile:>12} {args.readers:>8} {args.writers:>8} {reads:>9.1f} {writes:>9.1f} {errors:>7}")
+
+if __name__ == "__main__":
+    main()
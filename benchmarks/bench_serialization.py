@@ -0,0 +1,87 @@
+"""
+Benchmark da serialização das listagens de atribuições.
+
+Gera uma frota com 100 mil atribuições (benchmarks.datagen) e compara, para a
+listagem com motorista e caminhão incorporados, os caminhos:
+
+- orm: Assignment.query com joinedload, to_dict() por instância
+- select: assignment_rows_select(), Assignment.serialize_row() por linha
+
+cada um codificado com o provedor JSON padrão do Flask (stdlib) e com orjson
+(quando instalado). Reporta o tempo da consulta, da montagem dos dicionários
+e da codificação, e o tempo total da requisição GET /assignments/.
+
+Uso:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --assignments 20000 --repeat 5
+"""
+import argparse
+import time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import joinedload
+
+from config import get_config
+from benchmarks.datagen import generate_fleet, populate
+
+def best_of(repeat, func):
+    # Menor tempo entre as repetições, em milissegundos, e o resultado da última
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=1000)
+    parser.add_argument("--trucks", type=int, default=1000)
+    parser.add_argument("--assignments", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.models import Assignment
+    from app.utils.helpers import assignment_rows_select
+    from app.utils.json_provider import OrjsonProvider, orjson
+
+    app = create_app(type("BenchConfig", (get_config("development"),), {
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "RESPONSE_CACHE_SIZE": 0,
+    }))
+    providers = {"stdlib": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+
+    with app.app_context():
+        populate(db, generate_fleet(args.drivers, args.trucks, args.assignments))
+
+        paths = {
+            "orm": (
+                lambda: Assignment.query.options(joinedload(Assignment.driver), joinedload(Assignment.truck)).all(),
+                lambda items: [assignment.to_dict() for assignment in items],
+            ),
+            "select": (
+                lambda: db.session.execute(assignment_rows_select(Assignment, ("driver", "truck"))).all(),
+                lambda rows: [Assignment.serialize_row(row) for row in rows],
+            ),
+        }
+
+        print(f"{args.assignments} assignments, best of {args.repeat} (ms)")
+        print(f"{'path':>7} {'encoder':>8} {'query':>8} {'dicts':>8} {'encode':>8} {'total':>8} {'bytes':>10}")
+        for path, (fetch, build) in paths.items():
+            fetch_ms, items = best_of(args.repeat, lambda: (db.session.expunge_all(), fetch())[1])
+            build_ms, payload = best_of(args.repeat, lambda: build(items))
+            for name, provider in providers.items():
+                encode_ms, body = best_of(args.repeat, lambda: provider.response(payload).get_data())
+                total = fetch_ms + build_ms + encode_ms
+                print(f"{path:>7} {name:>8} {fetch_ms:>8.1f} {build_ms:>8.1f} {encode_ms:>8.1f} {total:>8.1f} {len(body):>10}")
+
+    # Requisição completa com o provedor configurado na aplicação
+    client = app.test_client()
+    request_ms, response = best_of(args.repeat, lambda: client.get("/assignments/"))
+    print(f"\nGET /assignments/ ({type(app.json).__name__}): {request_ms:.1f} ms, {len(response.data)} bytes")
+
+if __name__ == "__main__":
+    main()
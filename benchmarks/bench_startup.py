@@ -0,0 +1,113 @@
+"""
+Benchmark do tempo de inicialização da aplicação.
+
+Cada medição é feita em um processo Python novo (sem módulos já carregados),
+como a inicialização de um worker:
+
+- import: importação do pacote app (Flask, SQLAlchemy e extensões)
+- create_app (migrated): create_app() com o banco já na versão atual (apenas
+  a verificação da versão do esquema)
+- create_app (empty): create_app() com um banco vazio (criação das tabelas)
+- forked first request: com a aplicação pré-carregada no processo pai (como no
+  gunicorn --preload), o tempo do fork até a primeira resposta do processo filho
+
+Reporta a mediana e o máximo das execuções e as consultas SQL feitas por
+create_app().
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+def measure(scenario, path):
+    # Executado no processo filho: devolve (segundos, consultas SQL)
+    started = time.perf_counter()
+    import app
+    if scenario == "import":
+        return time.perf_counter() - started, 0
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from config import get_config
+
+    queries = []
+    event.listen(Engine, "before_cursor_execute", lambda *args: queries.append(1))
+    config = type("BenchConfig", (get_config("sqlite"),), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "AUTO_MIGRATE": True,
+        "LOG_LEVEL": "WARNING",
+    })
+    started = time.perf_counter()
+    application = app.create_app(config)
+    elapsed = time.perf_counter() - started
+    if scenario != "fork":
+        return elapsed, len(queries)
+
+    read, write = os.pipe()
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        status = application.test_client().get("/drivers/?limit=1").status_code
+        os.write(write, json.dumps([time.perf_counter() - started, status]).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    elapsed, status = json.loads(os.read(read, 1024))
+    if status != 200:
+        raise RuntimeError(f"Forked worker answered {status}")
+    return elapsed, 0
+
+def run(scenario, runs):
+    # Executa o cenário em `runs` processos novos
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        if scenario in ("migrated", "fork"):
+            # Banco migrado antes das medições
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "empty", "--db", path],
+                           check=True, capture_output=True)
+        for number in range(runs):
+            if scenario == "empty":
+                path = os.path.join(tmp, f"startup-{number}.db")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", scenario, "--db", path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+SCENARIOS = {
+    "import": "import",
+    "migrated": "create_app (migrated)",
+    "empty": "create_app (empty)",
+    "fork": "forked first request",
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Processos por cenário")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.db)))
+        return
+
+    print(f"{'scenario':<24} {'median ms':>10} {'max ms':>8} {'queries':>8}")
+    for scenario, label in SCENARIOS.items():
+        if scenario == "fork" and not hasattr(os, "fork"):
+            continue
+        results = run(scenario, args.runs)
+        durations = [elapsed * 1000 for elapsed, _ in results]
+        print(f"{label:<24} {statistics.median(durations):>10.1f} {max(durations):>8.1f} {results[-1][1]:>8}")
+
+if __name__ == "__main__":
+    main()
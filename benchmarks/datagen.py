@@ -0,0 +1,107 @@
+"""
+Gerador determinístico de frotas sintéticas para os benchmarks.
+
+A mesma semente produz sempre os mesmos motoristas, caminhões e atribuições, de
+modo que execuções em momentos diferentes sejam comparáveis. As atribuições são
+válidas: carteira compatível e, no máximo, uma por motorista e por caminhão em
+cada dia.
+"""
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app.utils.helpers import LICENSE_ORDER
+from app.utils.scheduler import plan_schedule
+
+LICENSES = list(LICENSE_ORDER)
+# Distribuição aproximada das carteiras na frota (motoristas) e das exigências (caminhões)
+DRIVER_WEIGHTS = [5, 20, 30, 25, 20]
+TRUCK_WEIGHTS = [5, 25, 35, 20, 15]
+# Fração dos motoristas e caminhões escalados em um dia típico
+DAILY_SHARE = 0.7
+START_DATE = date(2024, 1, 1)
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo", "Isabela", "João"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Rodrigues", "Almeida", "Nunes"]
+
+def generate_fleet(drivers, trucks, assignments, seed=42, start=START_DATE):
+    """
+    Gera uma frota sintética.
+
+    Args:
+        drivers (int): Quantidade de motoristas
+        trucks (int): Quantidade de caminhões
+        assignments (int): Quantidade de atribuições, distribuídas em dias consecutivos a partir de `start`
+        seed (int): Semente do gerador
+
+    Returns:
+        dict: drivers e trucks (listas de dicionários com as colunas) e assignments,
+              lista de (índice do motorista, índice do caminhão, data)
+    """
+    rng = random.Random(seed)
+    driver_rows = [
+        {
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+            "license_type": rng.choices(LICENSES, DRIVER_WEIGHTS)[0],
+        }
+        for i in range(drivers)
+    ]
+    truck_rows = [
+        {
+            "plate": f"{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}{i:05d}",
+            "min_license_type": rng.choices(LICENSES, TRUCK_WEIGHTS)[0],
+        }
+        for i in range(trucks)
+    ]
+
+    fleet_drivers = [(i, row["license_type"]) for i, row in enumerate(driver_rows)]
+    fleet_trucks = [(i, row["min_license_type"]) for i, row in enumerate(truck_rows)]
+    assignment_rows = []
+    day = start
+    # Interrompe se a frota não tiver nenhum par compatível
+    idle_days = 0
+    while len(assignment_rows) < assignments and idle_days < 30:
+        # A cada dia, apenas parte da frota trabalha
+        available = [driver for driver in fleet_drivers if rng.random() < DAILY_SHARE]
+        needed = [truck for truck in fleet_trucks if rng.random() < DAILY_SHARE]
+        plan, _ = plan_schedule([day], needed, available, set(), set())
+        idle_days = 0 if plan else idle_days + 1
+        assignment_rows.extend((driver, truck, planned) for planned, driver, truck in plan)
+        day += timedelta(days=1)
+
+    return {
+        "drivers": driver_rows,
+        "trucks": truck_rows,
+        "assignments": assignment_rows[:assignments],
+    }
+
+def populate(db, fleet, batch_size=5000):
+    """
+    Grava a frota em um banco vazio com INSERTs em lote.
+
+    Returns:
+        dict: IDs gravados - drivers e trucks na ordem da frota, assignments na ordem de inserção
+    """
+    from app.models import Driver, Truck, Assignment
+
+    def insert_all(model, rows):
+        for offset in range(0, len(rows), batch_size):
+            db.session.execute(insert(model), rows[offset:offset + batch_size])
+        return [id_ for (id_,) in db.session.query(model.id).order_by(model.id)]
+
+    driver_ids = insert_all(Driver, fleet["drivers"])
+    truck_ids = insert_all(Truck, fleet["trucks"])
+    # Classes de carteira registradas nas atribuições, como as rotas gravam
+    assignment_ids = insert_all(Assignment, [
+        {
+            "driver_id": driver_ids[driver],
+            "truck_id": truck_ids[truck],
+            "date": day,
+            "driver_license": fleet["drivers"][driver]["license_type"],
+            "truck_license": fleet["trucks"][truck]["min_license_type"],
+        }
+        for driver, truck, day in fleet["assignments"]
+    ])
+    db.session.commit()
+    return {"drivers": driver_ids, "trucks": truck_ids, "assignments": assignment_ids}
@@ -0,0 +1,202 @@
+"""
+Cenários de requisição dos benchmarks da API (drivers, trucks e assignments).
+
+Cada cenário monta uma requisição (método, URL e corpo JSON) a partir do
+contexto da execução e declara os status esperados. Os cenários de leitura vêm
+antes dos de escrita, as mudanças de carteira depois das novas atribuições e as
+remoções por último, para que cada cenário encontre a frota no estado esperado.
+Um cenário que retorna None esgotou suas entidades e é encerrado.
+"""
+import random
+from datetime import timedelta
+
+from app.utils.scheduler import plan_schedule
+from benchmarks.datagen import LICENSES, START_DATE
+
+SCENARIOS = []
+
+def scenario(name, expect=(200,)):
+    # Registra um cenário na ordem de execução
+    def decorator(build):
+        SCENARIOS.append({"name": name, "build": build, "expect": frozenset(expect)})
+        return build
+
+    return decorator
+
+class ScenarioContext:
+    """
+    Estado compartilhado pelos cenários de uma execução: IDs da frota gravada,
+    sementes e reservas de IDs para remoções, que não podem se repetir.
+    """
+
+    def __init__(self, fleet, ids, seed=42):
+        self.rng = random.Random(seed)
+        self.fleet = fleet
+        self.driver_ids = ids["drivers"]
+        self.truck_ids = ids["trucks"]
+        self.assignment_ids = ids["assignments"]
+        self.counter = 0
+
+        assigned = fleet["assignments"]
+        self.first_day = assigned[0][2] if assigned else None
+        self.last_day = assigned[-1][2] if assigned else None
+        # Pares (motorista, caminhão, data) existentes, para criar conflitos
+        self.existing = [
+            (self.driver_ids[driver], self.truck_ids[truck], day) for driver, truck, day in assigned
+        ]
+
+        # Pares compatíveis e distintos para novas atribuições, em datas após a frota
+        drivers = [(driver_id, row["license_type"]) for driver_id, row in zip(self.driver_ids, fleet["drivers"])]
+        trucks = [(truck_id, row["min_license_type"]) for truck_id, row in zip(self.truck_ids, fleet["trucks"])]
+        plan, _ = plan_schedule([None], trucks, drivers, set(), set())
+        self.free_pairs = [(driver_id, truck_id) for _, driver_id, truck_id in plan]
+        self.free_start = (self.last_day or START_DATE) + timedelta(days=1)
+
+        # Remoções: atribuições avulsas primeiro; motoristas e caminhões com
+        # atribuições, para exercitar a remoção em cascata
+        self.deletable_assignments = self._shuffled(self.assignment_ids[::2])
+        self.deletable_drivers = self._shuffled({driver_id for driver_id, _, _ in self.existing[1::2]})
+        self.deletable_trucks = self._shuffled({truck_id for _, truck_id, _ in self.existing[1::2]})
+
+    def _shuffled(self, ids):
+        ids = sorted(ids)
+        self.rng.shuffle(ids)
+        return ids
+
+    def take(self, pool):
+        # Próximo ID reservado para remoção; None encerra o cenário
+        return pool.pop() if pool else None
+
+    def next(self):
+        self.counter += 1
+        return self.counter
+
+# Leituras
+
+@scenario("drivers.list")
+def drivers_list(ctx):
+    return "GET", "/drivers/", None
+
+@scenario("drivers.list_page")
+def drivers_list_page(ctx):
+    return "GET", "/drivers/?limit=100", None
+
+@scenario("drivers.detail")
+def drivers_detail(ctx):
+    return "GET", f"/drivers/{ctx.rng.choice(ctx.driver_ids)}", None
+
+@scenario("drivers.search")
+def drivers_search(ctx):
+    # Busca de digitação: início de um nome ou sobrenome da frota, com a classe opcional
+    row = ctx.rng.choice(ctx.fleet["drivers"])
+    word = ctx.rng.choice(row["name"].split()[:2])
+    license_filter = f"&license_type={row['license_type']}" if ctx.rng.random() < 0.5 else ""
+    return "GET", f"/drivers/?q={word[:ctx.rng.randint(2, len(word))]}&limit=10{license_filter}", None
+
+@scenario("trucks.list")
+def trucks_list(ctx):
+    return "GET", "/trucks/", None
+
+@scenario("trucks.list_page")
+def trucks_list_page(ctx):
+    return "GET", "/trucks/?limit=100", None
+
+@scenario("trucks.detail")
+def trucks_detail(ctx):
+    return "GET", f"/trucks/{ctx.rng.choice(ctx.truck_ids)}", None
+
+@scenario("trucks.search")
+def trucks_search(ctx):
+    # Busca de digitação por um trecho da placa
+    plate = ctx.rng.choice(ctx.fleet["trucks"])["plate"]
+    start = ctx.rng.randint(0, len(plate) - 3)
+    return "GET", f"/trucks/?plate={plate[start:start + ctx.rng.randint(3, 5)]}&limit=10", None
+
+@scenario("assignments.list")
+def assignments_list(ctx):
+    return "GET", "/assignments/", None
+
+@scenario("assignments.list_page")
+def assignments_list_page(ctx):
+    return "GET", "/assignments/?limit=100", None
+
+@scenario("assignments.list_week")
+def assignments_list_week(ctx):
+    # Uma semana aleatória dentro do período da frota, sem expandir as relações
+    span = (ctx.last_day - ctx.first_day).days if ctx.first_day else 0
+    start = (ctx.first_day or START_DATE) + timedelta(days=ctx.rng.randint(0, max(span - 6, 0)))
+    end = start + timedelta(days=6)
+    return "GET", f"/assignments/?from={start.isoformat()}&to={end.isoformat()}&expand=none&limit=500", None
+
+@scenario("assignments.detail")
+def assignments_detail(ctx):
+    return "GET", f"/assignments/{ctx.rng.choice(ctx.assignment_ids)}", None
+
+# Escritas
+
+@scenario("drivers.create", expect=(201,))
+def drivers_create(ctx):
+    return "POST", "/drivers/", {"name": f"Bench Driver {ctx.next()}", "license_type": ctx.rng.choice(LICENSES)}
+
+@scenario("drivers.update_name")
+def drivers_update_name(ctx):
+    return "PUT", f"/drivers/{ctx.rng.choice(ctx.driver_ids)}", {"name": f"Renamed {ctx.next()}"}
+
+@scenario("trucks.create", expect=(201,))
+def trucks_create(ctx):
+    return "POST", "/trucks/", {"plate": f"BENCH{ctx.next():06d}", "min_license_type": ctx.rng.choice(LICENSES)}
+
+@scenario("trucks.create_conflict", expect=(400,))
+def trucks_create_conflict(ctx):
+    # Placa já cadastrada
+    plate = ctx.rng.choice(ctx.fleet["trucks"])["plate"]
+    return "POST", "/trucks/", {"plate": plate, "min_license_type": "C"}
+
+@scenario("assignments.create", expect=(201,))
+def assignments_create(ctx):
+    # Cada iteração usa um par compatível livre; ao esgotar os pares, avança um dia
+    index = ctx.next()
+    driver_id, truck_id = ctx.free_pairs[index % len(ctx.free_pairs)]
+    day = ctx.free_start + timedelta(days=index // len(ctx.free_pairs))
+    return "POST", "/assignments/", {"driver_id": driver_id, "truck_id": truck_id, "date": day.isoformat()}
+
+@scenario("assignments.create_conflict", expect=(400,))
+def assignments_create_conflict(ctx):
+    # O motorista já tem atribuição na data (restrição única)
+    driver_id, truck_id, day = ctx.rng.choice(ctx.existing)
+    return "POST", "/assignments/", {"driver_id": driver_id, "truck_id": truck_id, "date": day.isoformat()}
+
+@scenario("assignments.update")
+def assignments_update(ctx):
+    # Regrava a atribuição com os mesmos dados: validação da carteira e commit
+    return "PUT", f"/assignments/{ctx.rng.choice(ctx.assignment_ids)}", {}
+
+@scenario("drivers.update_license", expect=(200, 400))
+def drivers_update_license(ctx):
+    # Revalida as atribuições do motorista (validate_assignments); rebaixar a
+    # carteira pode ser recusado com 400
+    driver_id, _, _ = ctx.rng.choice(ctx.existing)
+    return "PUT", f"/drivers/{driver_id}", {"license_type": ctx.rng.choice(LICENSES)}
+
+@scenario("trucks.update_license", expect=(200, 400))
+def trucks_update_license(ctx):
+    _, truck_id, _ = ctx.rng.choice(ctx.existing)
+    return "PUT", f"/trucks/{truck_id}", {"min_license_type": ctx.rng.choice(LICENSES)}
+
+# Remoções
+
+@scenario("assignments.delete")
+def assignments_delete(ctx):
+    entity_id = ctx.take(ctx.deletable_assignments)
+    return entity_id and ("DELETE", f"/assignments/{entity_id}", None)
+
+@scenario("drivers.delete")
+def drivers_delete(ctx):
+    # Remove também as atribuições do motorista (cascata)
+    entity_id = ctx.take(ctx.deletable_drivers)
+    return entity_id and ("DELETE", f"/drivers/{entity_id}", None)
+
+@scenario("trucks.delete")
+def trucks_delete(ctx):
+    entity_id = ctx.take(ctx.deletable_trucks)
+    return entity_id and ("DELETE", f"/trucks/{entity_id}", None)
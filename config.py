@@ -9,7 +9,12 @@ class Config:
     - Fácil extensão para outras configurações
     """
     # Configuração do SQLite para desenvolvimento
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///crud.db'
+    # DATABASE_URL permite apontar para outro banco sem alterar o código
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///crud.db'
+    
+    # PRAGMAs aplicados a cada nova conexão SQLite. foreign_keys ativa as chaves
+    # estrangeiras (desligadas por padrão no SQLite), necessárias para o ON DELETE CASCADE
+    SQLITE_PRAGMAS = {'foreign_keys': 'ON'}
     
     # Desativa o rastreamento de modificações do SQLAlchemy
     # Melhora a performance e reduz o uso de memória
@@ -17,4 +22,162 @@ class Config:
     
     # Chave secreta para sessões e tokens
     # Em produção, usar uma chave forte e mantenha-a em variável de ambiente
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'chave-secreta-padrao' 
\ No newline at end of file
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'chave-secreta-padrao' 
+    
+    # Migrações do esquema na inicialização: com o banco desatualizado, aplica as
+    # migrações pendentes (AUTO_MIGRATE) ou apenas registra o erro e responde 503
+    # até a execução de `flask upgrade-db`. Desligado nos perfis de produção
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Paginação por cursor (?limit=&after=) das listagens
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+    
+    # Quantidade máxima de itens aceita pelas rotas em lote (/bulk)
+    BULK_MAX_ITEMS = 1000
+    
+    # Quantidade de linhas lidas do banco por lote nas exportações em streaming
+    EXPORT_BATCH_SIZE = 1000
+    
+    # Quantidade máxima de dias planejados por requisição em /schedule
+    SCHEDULE_MAX_DAYS = 92
+    
+    # Quantidade máxima de dias por relatório de utilização (/reports)
+    REPORT_MAX_DAYS = 731
+    
+    # Duração máxima, em dias, de uma atribuição (date a end_date). Limita a faixa
+    # do índice lida nas buscas por intervalo; não reduzir enquanto houver
+    # atribuições mais longas gravadas
+    MAX_ASSIGNMENT_DAYS = int(os.environ.get('MAX_ASSIGNMENT_DAYS', 31))
+    
+    # Logs da aplicação: gravados por uma thread em segundo plano a partir de uma
+    # fila limitada (LOG_QUEUE_SIZE registros); com a fila cheia, os registros são
+    # descartados em vez de bloquear a requisição. LOG_FORMAT: json ou text
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    
+    # Fração das requisições GET cujos logs de cada nível são mantidos (níveis
+    # ausentes: todas). Avisos e erros não são amostrados
+    LOG_GET_SAMPLING = {
+        'DEBUG': float(os.environ.get('LOG_GET_DEBUG_SAMPLE_RATE', 0.01)),
+        'INFO': float(os.environ.get('LOG_GET_INFO_SAMPLE_RATE', 0.1)),
+    }
+    
+    # Registro de acesso (método, rota, IDs, status e duração) ao final de cada requisição
+    LOG_ACCESS = os.environ.get('LOG_ACCESS', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Instrumentação de SQL por requisição (cabeçalhos X-Query-Count/Server-Timing,
+    # log de consultas lentas e rota /metrics). Desativada por padrão
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+    
+    # Consultas mais lentas que este limite (em milissegundos) são registradas em log
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    
+    # Quantidade máxima de respostas serializadas mantidas no cache em memória
+    # (por processo; as versões das coleções são compartilhadas pelo banco).
+    # 0 desativa o cache e as ETags/respostas 304
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+    
+    # Cache em memória (por processo) do nível de carteira de motoristas e
+    # caminhões, usado na validação das atribuições: até LICENSE_CACHE_SIZE
+    # entradas (LRU; 0 desativa). Alterações feitas por outros processos são
+    # percebidas pelo contador de geração, lido a cada validação
+    LICENSE_CACHE_SIZE = int(os.environ.get('LICENSE_CACHE_SIZE', 10000))
+    
+    # Feed de alterações (/events): tamanho do buffer em memória para reenvio,
+    # intervalo dos heartbeats, intervalo de leitura do change log (alterações de
+    # outros processos), sequências relidas abaixo da maior já enviada (commits
+    # fora de ordem), duração máxima de cada conexão e limite de assinantes
+    EVENTS_BUFFER_SIZE = 1000
+    EVENTS_HEARTBEAT_SECONDS = 15
+    EVENTS_POLL_SECONDS = 2
+    EVENTS_REORDER_WINDOW = 100
+    EVENTS_MAX_STREAM_SECONDS = 300
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 100))
+    
+    # Arquivamento: atribuições com mais de ARCHIVE_HORIZON_DAYS dias são movidas
+    # para assignment_archive, em uma transação, com comandos de até
+    # ARCHIVE_BATCH_SIZE linhas
+    ARCHIVE_HORIZON_DAYS = int(os.environ.get('ARCHIVE_HORIZON_DAYS', 365))
+    ARCHIVE_BATCH_SIZE = 5000
+    
+    # Provedor JSON das respostas: "auto" usa orjson quando instalado,
+    # "orjson" exige o pacote e "default" usa o módulo json da biblioteca padrão
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Compressão das respostas (gzip e, com o pacote brotli instalado, br).
+    # Corpos menores que COMPRESSION_MIN_SIZE bytes são enviados sem compressão
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    
+    # Idempotency-Key em POST/PUT: respostas guardadas por IDEMPOTENCY_TTL_SECONDS
+    # (padrão 24 h), no máximo IDEMPOTENCY_MAX_KEYS chaves, com limpeza a cada
+    # IDEMPOTENCY_PRUNE_INTERVAL chaves gravadas. Reservas de requisições
+    # interrompidas são liberadas após IDEMPOTENCY_LOCK_SECONDS
+    IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 100000))
+    IDEMPOTENCY_PRUNE_INTERVAL = 100
+    IDEMPOTENCY_LOCK_SECONDS = 60
+
+class SQLiteConfig(Config):
+    """
+    Perfil de produção com SQLite.
+    - WAL: leitores não bloqueiam o escritor e vice-versa
+    - synchronous=NORMAL: sem fsync a cada commit (seguro com WAL; apenas os
+      últimos commits podem ser perdidos em uma queda de energia)
+    - busy_timeout: escritores concorrentes aguardam o lock em vez de falhar
+    - mmap_size e cache_size: leituras servidas da memória
+    """
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        # 256 MB mapeados em memória
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),
+        # Valor negativo é em KiB: 64 MB de cache de páginas por conexão
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    }
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '').lower() in ('1', 'true', 'yes')
+
+class PostgreSQLConfig(Config):
+    """
+    Perfil de produção com PostgreSQL (requer o driver psycopg2).
+    O pool mantém conexões abertas entre as requisições; pre_ping descarta
+    conexões encerradas pelo servidor e recycle as renova antes dos timeouts
+    de rede e de proxies (ex.: PgBouncer).
+    """
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'postgresql://localhost/trucks'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '').lower() in ('1', 'true', 'yes')
+
+# Perfis selecionáveis pela variável de ambiente APP_CONFIG
+CONFIG_PROFILES = {
+    'development': Config,
+    'sqlite': SQLiteConfig,
+    'postgresql': PostgreSQLConfig,
+}
+
+def get_config(name=None):
+    """
+    Retorna a classe de configuração do perfil informado ou, por padrão, de APP_CONFIG.
+
+    Args:
+        name (str, optional): Nome do perfil (development, sqlite ou postgresql)
+
+    Returns:
+        type: Classe de configuração
+    """
+    name = name or os.environ.get('APP_CONFIG') or 'development'
+    if name not in CONFIG_PROFILES:
+        raise ValueError(f"Perfil de configuração inválido: {name}. Use um de: {', '.join(CONFIG_PROFILES)}")
+    return CONFIG_PROFILES[name]